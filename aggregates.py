@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+from datetime import date
+from typing import Iterable, List, Optional, Tuple
+from encoding import category_codes, category_lookup
+from frame_cache import FrameCache
+from instrumentation import instrumented
+
+
+@instrumented()
+def daily_category_totals(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reduces rows to their revenue, quantity and row count per (date, category).
+
+    Rows without a category are kept as a group of their own, so the totals
+    over all categories match the row-level KPIs.
+
+    Args:
+        df: DataFrame containing date, category, price and quantity data
+
+    Returns:
+        DataFrame with date, category, revenue, quantity and rows columns
+    """
+    values = pd.DataFrame({'revenue': df['price'] * df['quantity'], 'quantity': df['quantity']})
+    return values.groupby([df['date'], df['category']], observed=True, dropna=False).agg(
+        revenue=('revenue', 'sum'),
+        quantity=('quantity', 'sum'),
+        rows=('quantity', 'size'),
+    ).reset_index()
+
+
+def combine_totals(parts: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Merges daily_category_totals of disjoint row sets, e.g. of the chunks of one file.
+
+    Args:
+        parts: Results of daily_category_totals
+
+    Returns:
+        The totals of all rows, as daily_category_totals of their union would give
+    """
+    parts = list(parts)
+    if len(parts) == 1:
+        return parts[0]
+    combined = pd.concat(parts, ignore_index=True)
+    return combined.groupby(['date', 'category'], observed=True, dropna=False)[
+        ['revenue', 'quantity', 'rows']].sum().reset_index()
+
+
+class SalesAggregate:
+    """
+    Exact date x category totals of a dataset.
+
+    Every date range and category selection of the dashboard is a union of
+    (date, category) groups, so the KPIs and daily series of any filter state
+    are sums over at most days x categories groups instead of the raw rows.
+    """
+
+    def __init__(self, totals: pd.DataFrame):
+        self.dates = totals['date'].to_numpy()
+        self.category_codes, self.category_index = category_codes(totals['category'])
+        self.revenue = totals['revenue'].to_numpy(dtype=float)
+        self.quantity = totals['quantity'].to_numpy()
+        self.rows = totals['rows'].to_numpy()
+        self.n_rows = int(self.rows.sum())
+
+    def nbytes(self) -> int:
+        """Returns the memory used by the aggregate arrays."""
+        return int(self.dates.nbytes + self.category_codes.nbytes + self.category_index.memory_usage(deep=True)
+                   + self.revenue.nbytes + self.quantity.nbytes + self.rows.nbytes)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'SalesAggregate':
+        """Builds the aggregate of a loaded frame."""
+        return cls(daily_category_totals(df))
+
+    def select(self, start: Optional[date] = None, end: Optional[date] = None,
+               categories: Optional[List[str]] = None) -> np.ndarray:
+        """Selects the groups of a filter state like pipeline.filter_data selects rows."""
+        mask = np.ones(len(self.dates), dtype=bool)
+        if start is not None:
+            mask &= self.dates >= np.datetime64(pd.to_datetime(start))
+        if end is not None:
+            mask &= self.dates <= np.datetime64(pd.to_datetime(end))
+        if categories:
+            mask &= category_lookup(self.category_index, categories)[self.category_codes]
+        return mask
+
+    def kpis(self, start: Optional[date] = None, end: Optional[date] = None,
+             categories: Optional[List[str]] = None) -> Tuple[float, float, int, float]:
+        """Same values as analysis.calculate_sales_kpis on the filtered rows."""
+        mask = self.select(start, end, categories)
+        total_revenue = float(self.revenue[mask].sum())
+        total_quantity = int(self.quantity[mask].sum())
+        unique_dates = len(np.unique(self.dates[mask]))
+        if unique_dates == 0:
+            return total_revenue, 0.0, total_quantity, 0.0
+        return total_revenue, total_revenue / unique_dates, total_quantity, total_quantity / unique_dates
+
+    def daily(self, start: Optional[date] = None, end: Optional[date] = None,
+              categories: Optional[List[str]] = None) -> pd.DataFrame:
+        """Daily revenue and quantity of the filtered rows, as drawn by the trend charts."""
+        mask = self.select(start, end, categories)
+        unique_dates, inverse = np.unique(self.dates[mask], return_inverse=True)
+        return pd.DataFrame({
+            'date': unique_dates,
+            'revenue': np.bincount(inverse, weights=self.revenue[mask], minlength=len(unique_dates)),
+            'quantity': np.bincount(inverse, weights=self.quantity[mask], minlength=len(unique_dates)),
+        })
+
+
+_aggregates: FrameCache[SalesAggregate] = FrameCache(SalesAggregate.from_frame)
+
+
+def get_sales_aggregate(df: pd.DataFrame) -> SalesAggregate:
+    """
+    Returns the aggregate of a frame, building it once per frame object.
+
+    Args:
+        df: DataFrame containing date, category, price and quantity data
+
+    Returns:
+        SalesAggregate of the frame
+    """
+    return _aggregates.get(df)
+
+
+def set_sales_aggregate(df: pd.DataFrame, aggregate: SalesAggregate) -> None:
+    """Caches an aggregate built while the frame was loaded, e.g. from its chunks."""
+    _aggregates.put(df, aggregate)
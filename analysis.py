@@ -1,8 +1,10 @@
 import pandas as pd
 from datetime import date
 from typing import Tuple
+from instrumentation import instrumented
 
 
+@instrumented()
 def calculate_sales_kpis(df: pd.DataFrame) -> Tuple[float, float, int, float]:
     """
     Calculates key performance indicators for sales data.
@@ -37,6 +39,7 @@ def calculate_sales_kpis(df: pd.DataFrame) -> Tuple[float, float, int, float]:
     return total_revenue, avg_daily_revenue, total_quantity, avg_daily_quantity
 
 
+@instrumented()
 def get_filtered_data(
     df: pd.DataFrame, start_date: date, end_date: date
 ) -> pd.DataFrame:
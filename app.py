@@ -1,5 +1,9 @@
+import logging
 import streamlit as st
 
+# Logging is configured here, at the entry point; modules only create their loggers
+logging.basicConfig(level=logging.INFO)
+
 # Set page config
 st.set_page_config(
     page_title="Анализатор Продаж - Главная",
@@ -28,6 +32,7 @@ if 'page' not in st.session_state:
 st.subheader("Быстрые ссылки:")
 st.page_link("pages/home.py", label="Анализ продаж", icon="📊")
 st.page_link("pages/info.py", label="Информация и справка", icon="ℹ️")
+st.page_link("pages/admin.py", label="Хранилище данных", icon="🗄️")
 
 st.divider()
 
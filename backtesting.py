@@ -0,0 +1,246 @@
+import pandas as pd
+import numpy as np
+from typing import List, Optional, Sequence, Tuple
+from forecasting import FORECAST_MODELS, build_series_matrix
+
+
+def _linear_backtest(
+    values: np.ndarray, cutoffs: np.ndarray, horizon: int, window: Optional[int]
+) -> np.ndarray:
+    """
+    Linear-trend forecasts from every cutoff using prefix sums instead of refitting.
+
+    The normal equations of a straight-line fit only need sum(y) and sum(t * y) over
+    the training window, so every fit is O(1) after one cumulative-sum pass.
+    """
+    n_obs = values.shape[0]
+    t = np.arange(n_obs, dtype=float)
+    prefix_y = np.vstack([np.zeros(values.shape[1]), np.cumsum(values, axis=0)])
+    prefix_ty = np.vstack([np.zeros(values.shape[1]), np.cumsum(t[:, None] * values, axis=0)])
+
+    ends = cutoffs
+    starts = np.zeros_like(cutoffs) if window is None else np.maximum(cutoffs - window, 0)
+    n = (ends - starts).astype(float)
+
+    # Fit in local coordinates x = t - start so that x runs over 0..n-1
+    sum_y = prefix_y[ends] - prefix_y[starts]
+    sum_xy = (prefix_ty[ends] - prefix_ty[starts]) - starts[:, None] * sum_y
+    sum_x = n * (n - 1) / 2
+    sum_xx = (n - 1) * n * (2 * n - 1) / 6
+
+    denominator = n * sum_xx - sum_x ** 2
+    slope = (n[:, None] * sum_xy - sum_x[:, None] * sum_y) / denominator[:, None]
+    intercept = (sum_y - slope * sum_x[:, None]) / n[:, None]
+
+    steps = np.arange(1, horizon + 1, dtype=float)
+    x_future = (n - 1)[:, None] + steps[None, :]
+    return intercept[:, None, :] + slope[:, None, :] * x_future[:, :, None]
+
+
+def _seasonal_naive_backtest(
+    values: np.ndarray, cutoffs: np.ndarray, horizon: int, season_length: int
+) -> np.ndarray:
+    """Seasonal naive forecasts from every cutoff by fancy indexing."""
+    steps = np.arange(horizon)
+    source = cutoffs[:, None] - season_length + steps[None, :] % season_length
+    return values[source]
+
+
+def _holt_winters_backtest(
+    values: np.ndarray,
+    cutoffs: np.ndarray,
+    horizon: int,
+    season_length: int,
+    alpha: float,
+    beta: float,
+    gamma: float,
+) -> np.ndarray:
+    """
+    Holt-Winters forecasts from every cutoff out of a single smoothing pass.
+
+    With fixed smoothing parameters the state after t observations does not depend on
+    later data, so one pass that snapshots the state at each cutoff replaces refitting.
+    """
+    n_obs, n_series = values.shape
+    m = season_length
+
+    level = values[:m].mean(axis=0)
+    trend = (values[m:2 * m].mean(axis=0) - level) / m
+    seasonal = values[:m] - level
+
+    levels = np.empty((n_obs + 1, n_series))
+    trends = np.empty((n_obs + 1, n_series))
+    seasonals = np.empty((n_obs + 1, m, n_series))
+    levels[m], trends[m], seasonals[m] = level, trend, seasonal
+
+    for t in range(m, n_obs):
+        season = seasonal[t % m].copy()
+        previous_level = level
+        level = alpha * (values[t] - season) + (1 - alpha) * (level + trend)
+        trend = beta * (level - previous_level) + (1 - beta) * trend
+        seasonal[t % m] = gamma * (values[t] - level) + (1 - gamma) * season
+        levels[t + 1], trends[t + 1], seasonals[t + 1] = level, trend, seasonal
+
+    steps = np.arange(1, horizon + 1)
+    season_idx = (cutoffs[:, None] + steps[None, :] - 1) % m
+    season_values = seasonals[cutoffs[:, None], season_idx]
+    return (
+        levels[cutoffs][:, None, :]
+        + steps[None, :, None] * trends[cutoffs][:, None, :]
+        + season_values
+    )
+
+
+def rolling_origin_forecasts(
+    values: np.ndarray,
+    model: str = 'linear',
+    horizon: int = 7,
+    min_train: int = 14,
+    window: Optional[int] = None,
+    season_length: int = 7,
+    alpha: float = 0.3,
+    beta: float = 0.05,
+    gamma: float = 0.1,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Produces forecasts from every cutoff for every column of a (time, series) matrix.
+
+    A cutoff ``c`` means the model is trained on observations ``0..c-1`` and forecasts
+    ``c..c+horizon-1``. Targets beyond the end of the data are NaN in ``actuals``.
+
+    Args:
+        values: Matrix of observations, one column per series
+        model: One of 'linear', 'seasonal_naive' or 'holt_winters'
+        horizon: Number of periods forecast from each cutoff
+        min_train: Smallest training size to evaluate
+        window: Rolling training window for the linear model, None for expanding
+        season_length: Seasonal period for the seasonal models
+        alpha: Level smoothing factor for Holt-Winters
+        beta: Trend smoothing factor for Holt-Winters
+        gamma: Seasonal smoothing factor for Holt-Winters
+
+    Returns:
+        A tuple containing:
+        - Cutoffs of shape (n_cutoffs,)
+        - Forecasts of shape (n_cutoffs, horizon, n_series)
+        - Actuals of the same shape
+
+    Raises:
+        ValueError: For an unknown model or a linear window shorter than 2 observations
+    """
+    values = np.asarray(values, dtype=float)
+    if values.ndim == 1:
+        values = values[:, None]
+    n_obs = values.shape[0]
+
+    if model == 'linear':
+        if window is not None and window < 2:
+            raise ValueError("Окно линейного тренда должно содержать минимум 2 наблюдения")
+        first_cutoff = max(min_train, 2)
+    elif model == 'seasonal_naive':
+        first_cutoff = max(min_train, season_length)
+    elif model == 'holt_winters':
+        first_cutoff = max(min_train, 2 * season_length)
+    else:
+        raise ValueError(f"Неизвестная модель прогноза: {model}")
+
+    cutoffs = np.arange(first_cutoff, n_obs)
+    if len(cutoffs) == 0:
+        empty = np.empty((0, horizon, values.shape[1]))
+        return cutoffs, empty, empty.copy()
+
+    if model == 'linear':
+        forecasts = _linear_backtest(values, cutoffs, horizon, window)
+    elif model == 'seasonal_naive':
+        forecasts = _seasonal_naive_backtest(values, cutoffs, horizon, season_length)
+    else:
+        forecasts = _holt_winters_backtest(values, cutoffs, horizon, season_length, alpha, beta, gamma)
+
+    padded = np.vstack([values, np.full((horizon, values.shape[1]), np.nan)])
+    targets = cutoffs[:, None] + np.arange(horizon)[None, :]
+    actuals = padded[targets]
+
+    return cutoffs, forecasts, actuals
+
+
+def horizon_errors(forecasts: np.ndarray, actuals: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Computes MAPE and RMSE per horizon and series over all cutoffs.
+
+    Targets outside the data are skipped, and zero actuals are excluded from MAPE.
+
+    Args:
+        forecasts: Array of shape (n_cutoffs, horizon, n_series)
+        actuals: Array of the same shape, NaN where no target exists
+
+    Returns:
+        A tuple of (mape, rmse, count) arrays of shape (horizon, n_series); MAPE is in percent
+    """
+    errors = forecasts - actuals
+    valid = ~np.isnan(actuals)
+    count = valid.sum(axis=0)
+
+    squared = np.where(valid, errors ** 2, 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rmse = np.sqrt(squared.sum(axis=0) / count)
+
+        nonzero = valid & (actuals != 0)
+        ape = np.where(nonzero, np.abs(errors) / np.where(nonzero, np.abs(actuals), 1.0), 0.0)
+        mape = 100 * ape.sum(axis=0) / nonzero.sum(axis=0)
+
+    return mape, rmse, count
+
+
+def backtest(
+    df: pd.DataFrame,
+    models: Sequence[str] = FORECAST_MODELS,
+    value_cols: Optional[List[str]] = None,
+    horizon: int = 7,
+    min_train: int = 14,
+    window: Optional[int] = None,
+    include_total: bool = True,
+) -> pd.DataFrame:
+    """
+    Evaluates forecasting models over all cutoffs and categories.
+
+    Args:
+        df: DataFrame containing date, category, price and quantity data
+        models: Models to evaluate
+        value_cols: Columns to forecast; defaults to ['revenue', 'quantity']
+        horizon: Number of days forecast from each cutoff
+        min_train: Smallest number of training days
+        window: Rolling training window for the linear model, None for expanding
+        include_total: Whether to also evaluate the sum over categories
+
+    Returns:
+        Long DataFrame with columns model, metric, category, horizon, mape, rmse, n
+    """
+    if value_cols is None:
+        value_cols = ['revenue', 'quantity']
+
+    data = df
+    if 'revenue' in value_cols and 'revenue' not in df.columns:
+        data = df.assign(revenue=df['price'] * df['quantity'])
+
+    _, labels, matrix = build_series_matrix(data, value_cols, include_total)
+    metrics = [value_col for value_col, _ in labels]
+    categories = [category for _, category in labels]
+
+    frames = []
+    for model in models:
+        _, forecasts, actuals = rolling_origin_forecasts(
+            matrix, model=model, horizon=horizon, min_train=min_train, window=window
+        )
+        mape, rmse, count = horizon_errors(forecasts, actuals)
+
+        frames.append(pd.DataFrame({
+            'model': model,
+            'metric': np.tile(metrics, horizon),
+            'category': np.tile(categories, horizon),
+            'horizon': np.repeat(np.arange(1, horizon + 1), len(labels)),
+            'mape': mape.ravel(),
+            'rmse': rmse.ravel(),
+            'n': count.ravel(),
+        }))
+
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Headless batch reports: python -m batch_report "shops/*.csv" --output-dir reports
+
+Runs loading, KPIs, process_data and chart export for every input file in
+parallel worker processes, without importing Streamlit.
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import PurePath
+from typing import Dict, List, Optional
+
+
+REQUIRED_COLUMNS = ['date', 'category', 'price', 'quantity']
+
+# Charts exported for every file: output name -> chart type of the dashboard
+REPORT_CHARTS = {
+    'revenue_trend': "Динамика выручки по дням",
+    'quantity_trend': "Динамика количества продаж по дням",
+    'forecast': "Прогноз выручки и количества",
+    'correlation': "Корреляционная матрица показателей",
+}
+
+# Written next to the reports by run_batch
+SUMMARY_NAME = 'summary'
+
+
+def expand_inputs(patterns: List[str]) -> List[str]:
+    """
+    Expands file names and glob patterns into a sorted, de-duplicated list of files.
+
+    Args:
+        patterns: File paths or glob patterns (recursive '**' is supported)
+
+    Returns:
+        List of existing file paths
+    """
+    files = set()
+    for pattern in patterns:
+        matches = glob.glob(pattern, recursive=True)
+        if not matches and os.path.isfile(pattern):
+            matches = [pattern]
+        files.update(match for match in matches if os.path.isfile(match))
+    return sorted(files)
+
+
+def _report_name(relative_path: str) -> str:
+    """Relative input path without its data and compression suffixes, with '/' separators."""
+    from data_loader import CSV_SUFFIXES, EXCEL_SUFFIXES, PARQUET_SUFFIXES
+    from compression import COMPRESSED_SUFFIXES
+
+    path = PurePath(relative_path)
+    data_suffixes = CSV_SUFFIXES + EXCEL_SUFFIXES + PARQUET_SUFFIXES + COMPRESSED_SUFFIXES
+    while path.suffix.lower() in data_suffixes and path.stem:
+        path = path.with_suffix('')
+    return path.as_posix()
+
+
+def report_names(files: List[str]) -> Dict[str, str]:
+    """
+    Gives every input file a unique report name.
+
+    The name is the path relative to the common directory of all inputs,
+    without the data and compression suffixes, so shops/a/sales.csv and
+    shops/b/sales.csv.gz become a/sales and b/sales.
+
+    Args:
+        files: Input files
+
+    Returns:
+        Dictionary mapping each file to its report name
+
+    Raises:
+        ValueError: If two inputs would get the same name, or one the name of the summary
+    """
+    if not files:
+        return {}
+    absolute = {path: os.path.abspath(path) for path in files}
+    root = os.path.commonpath([os.path.dirname(path) for path in absolute.values()])
+
+    names = {}
+    owners = {SUMMARY_NAME: None}
+    for path in files:
+        name = _report_name(os.path.relpath(absolute[path], root))
+        if name.lower() in owners:
+            other = owners[name.lower()]
+            if other is None:
+                raise ValueError(f"Имя отчета {name} совпадает с именем сводки: {path}")
+            raise ValueError(f"Файлы {other} и {path} дают одинаковое имя отчета: {name}")
+        owners[name.lower()] = path
+        names[path] = name
+    return names
+
+
+def build_report(file_path: str, output_dir: str, export_charts: bool = True,
+                 report_name: Optional[str] = None) -> Dict:
+    """
+    Produces the JSON (and optionally HTML chart) report of a single file.
+
+    Runs in a worker process; all imports are local so workers load only what they use.
+
+    Args:
+        file_path: Input CSV or Excel file
+        output_dir: Directory receiving <report name>.json and chart HTML files
+        export_charts: Whether to export charts as HTML
+        report_name: Name from report_names, the file name without its suffixes if None
+
+    Returns:
+        Summary of the report (also written to the JSON file)
+    """
+    from analysis import calculate_sales_kpis
+    from data_loader import load_data_file
+    from refactored_function import process_data
+
+    started = time.perf_counter()
+    timings = {}
+    if report_name is None:
+        report_name = _report_name(os.path.basename(file_path))
+    base_path = os.path.join(output_dir, *report_name.split('/'))
+    os.makedirs(os.path.dirname(base_path), exist_ok=True)
+    report = {'file': file_path, 'status': 'ok'}
+
+    stage_started = time.perf_counter()
+    df = load_data_file(file_path)
+    timings['load'] = time.perf_counter() - stage_started
+
+    if df is None or df.empty:
+        report.update(status='error', error="Не удалось загрузить данные", rows=0)
+    else:
+        missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+        report['rows'] = int(len(df))
+        if missing_columns:
+            report.update(status='error', error=f"Отсутствуют колонки: {', '.join(missing_columns)}")
+        else:
+            stage_started = time.perf_counter()
+            total_revenue, avg_daily_revenue, total_quantity, avg_daily_quantity = calculate_sales_kpis(df)
+            timings['kpis'] = time.perf_counter() - stage_started
+
+            stage_started = time.perf_counter()
+            processed = process_data(df)
+            timings['process_data'] = time.perf_counter() - stage_started
+
+            category_revenue = processed.groupby('category', observed=True)['revenue'].sum()
+            report.update(
+                date_range=[str(df['date'].min().date()), str(df['date'].max().date())],
+                categories=int(df['category'].nunique()),
+                kpis={
+                    'total_revenue': total_revenue,
+                    'avg_daily_revenue': avg_daily_revenue,
+                    'total_quantity': total_quantity,
+                    'avg_daily_quantity': avg_daily_quantity,
+                },
+                processed_rows=int(len(processed)),
+                top_categories={
+                    str(category): float(revenue)
+                    for category, revenue in category_revenue.nlargest(10).items()
+                },
+            )
+
+            if export_charts:
+                from pipeline import build_chart
+
+                stage_started = time.perf_counter()
+                charts = {}
+                for name, chart_type in REPORT_CHARTS.items():
+                    chart_path = f"{base_path}.{name}.html"
+                    build_chart(chart_type, df, []).write_html(chart_path, include_plotlyjs='cdn')
+                    charts[name] = chart_path
+                report['charts'] = charts
+                timings['charts'] = time.perf_counter() - stage_started
+
+    timings['total'] = time.perf_counter() - started
+    report['timings'] = timings
+
+    with open(f"{base_path}.json", 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    return report
+
+
+def run_batch(files: List[str], output_dir: str, workers: Optional[int] = None,
+              export_charts: bool = True) -> Dict:
+    """
+    Builds reports for all files in parallel worker processes.
+
+    Args:
+        files: Input files
+        output_dir: Report directory (created if missing)
+        workers: Number of worker processes, defaults to the CPU count
+        export_charts: Whether to export charts as HTML
+
+    Returns:
+        Throughput summary (also written to summary.json)
+
+    Raises:
+        ValueError: If two inputs would write the same report (see report_names)
+    """
+    names = report_names(files)
+    os.makedirs(output_dir, exist_ok=True)
+    started = time.perf_counter()
+    reports = []
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(build_report, path, output_dir, export_charts, names[path]): path for path in files}
+        for future in as_completed(futures):
+            try:
+                reports.append(future.result())
+            except Exception as e:
+                reports.append({'file': futures[future], 'status': 'error', 'error': str(e), 'rows': 0})
+
+    elapsed = time.perf_counter() - started
+    total_rows = sum(report.get('rows', 0) for report in reports)
+    summary = {
+        'files': len(files),
+        'succeeded': sum(report['status'] == 'ok' for report in reports),
+        'failed': [report['file'] for report in reports if report['status'] != 'ok'],
+        'rows': total_rows,
+        'seconds': elapsed,
+        'files_per_second': len(files) / elapsed if elapsed > 0 else 0.0,
+        'rows_per_second': total_rows / elapsed if elapsed > 0 else 0.0,
+    }
+
+    with open(os.path.join(output_dir, f"{SUMMARY_NAME}.json"), 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Пакетная генерация отчетов без Streamlit")
+    parser.add_argument('inputs', nargs='+', help="Файлы или glob-шаблоны (CSV/Excel)")
+    parser.add_argument('--output-dir', default='reports', help="Каталог для отчетов")
+    parser.add_argument('--workers', type=int, default=None, help="Число процессов")
+    parser.add_argument('--no-charts', action='store_true', help="Не экспортировать графики в HTML")
+    args = parser.parse_args(argv)
+
+    files = expand_inputs(args.inputs)
+    if not files:
+        print("Файлы не найдены", file=sys.stderr)
+        return 1
+
+    try:
+        summary = run_batch(files, args.output_dir, args.workers, export_charts=not args.no_charts)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(f"Файлов: {summary['files']}, успешно: {summary['succeeded']}, "
+          f"строк: {summary['rows']:,}, время: {summary['seconds']:.2f} с, "
+          f"{summary['rows_per_second']:,.0f} строк/с")
+    for path in summary['failed']:
+        print(f"  Ошибка: {path}", file=sys.stderr)
+
+    return 0 if not summary['failed'] else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
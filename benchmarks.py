@@ -0,0 +1,595 @@
+#!/usr/bin/env python3
+"""
+Benchmarks of the data paths.
+
+    python -m benchmarks suite --sizes 10000 100000 1000000 --baseline benchmark_baseline.json
+    python -m benchmarks category-filter --rows 50000000
+    python -m benchmarks import-time
+    python -m benchmarks decompression --rows 1000000
+
+The suite times every dashboard stage (loaders, filtering, KPIs, each chart and
+both process_data implementations) at several sizes, records wall time,
+throughput and peak memory, and compares them with a JSON baseline. The
+micro-benchmarks build their own synthetic data, time the old and the new
+implementation of a stage (best of several runs) and check they agree.
+import-time checks the cold import time of the headless modules against budgets.
+decompression reports the throughput of every codec accepted for CSV uploads.
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from date_parsing import parse_dates
+from encoding import category_codes, category_mask
+from generate_sales_data import write_sales_file
+from row_index import RowIndex
+
+
+def best_of(func: Callable[[], object], repeat: int = 3) -> float:
+    """Returns the fastest wall time of several runs of func, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def bench_category_filter(n_rows: int = 50_000_000, n_categories: int = 10_000, n_selected: int = 10,
+                          repeat: int = 3, seed: int = 0) -> Dict[str, float]:
+    """
+    Times category filtering and grouping on strings versus dictionary codes.
+
+    Args:
+        n_rows: Number of rows
+        n_categories: Number of distinct categories
+        n_selected: Number of selected categories
+        repeat: Runs per measurement
+        seed: Random seed
+
+    Returns:
+        Dictionary of timings in seconds
+    """
+    rng = np.random.default_rng(seed)
+    names = np.array([f"Категория {i:05d}" for i in range(n_categories)], dtype=object)
+    codes = rng.integers(0, n_categories, n_rows)
+    strings = pd.Series(names[codes])
+    encoded = pd.Series(pd.Categorical.from_codes(codes, categories=names))
+    values = pd.Series(rng.random(n_rows))
+    selected = list(rng.choice(names, n_selected, replace=False))
+
+    if not np.array_equal(strings.isin(selected).to_numpy(), category_mask(encoded, selected)):
+        raise AssertionError("category_mask disagrees with isin")
+
+    category_codes_array, _ = category_codes(encoded)
+    return {
+        'filter_isin_strings': best_of(lambda: strings.isin(selected), repeat),
+        'filter_isin_categorical': best_of(lambda: encoded.isin(selected), repeat),
+        'filter_code_lookup': best_of(lambda: category_mask(encoded, selected), repeat),
+        'groupby_strings': best_of(lambda: values.groupby(strings).sum(), repeat),
+        'groupby_codes': best_of(lambda: values.groupby(encoded, observed=True).sum(), repeat),
+        'bincount_codes': best_of(
+            lambda: np.bincount(category_codes_array, weights=values.to_numpy(), minlength=n_categories), repeat
+        ),
+    }
+
+
+def bench_row_index(n_rows: int = 10_000_000, n_categories: int = 5_000, n_selected: int = 3,
+                    window_days: int = 90, repeat: int = 3, seed: int = 0) -> Dict[str, float]:
+    """
+    Times a combined date window and category selection: masks versus the row index.
+
+    Args:
+        n_rows: Number of rows (sorted by date over three years)
+        n_categories: Number of distinct categories
+        n_selected: Number of selected categories
+        window_days: Length of the date window
+        repeat: Runs per measurement
+        seed: Random seed
+
+    Returns:
+        Dictionary of timings in seconds
+    """
+    rng = np.random.default_rng(seed)
+    names = np.array([f"Категория {i:05d}" for i in range(n_categories)], dtype=object)
+    dates = np.sort(np.datetime64('2022-01-01') + rng.integers(0, 3 * 365, n_rows).astype('timedelta64[D]'))
+    df = pd.DataFrame({
+        'date': dates,
+        'category': pd.Categorical.from_codes(rng.integers(0, n_categories, n_rows), categories=names),
+        'price': rng.random(n_rows),
+    })
+    selected = list(rng.choice(names, n_selected, replace=False))
+    start = pd.Timestamp('2023-03-01').date()
+    end = (pd.Timestamp('2023-03-01') + pd.Timedelta(days=window_days)).date()
+
+    def masks() -> pd.DataFrame:
+        mask = (df['date'] >= pd.Timestamp(start)) & (df['date'] <= pd.Timestamp(end))
+        return df[mask.to_numpy() & category_mask(df['category'], selected)]
+
+    started = time.perf_counter()
+    index = RowIndex(df)
+    build_seconds = time.perf_counter() - started
+
+    if not masks().index.equals(index.select(df, start, end, selected).index):
+        raise AssertionError("RowIndex disagrees with the masks")
+
+    return {
+        'index_build': build_seconds,
+        'filter_masks': best_of(masks, repeat),
+        'filter_row_index': best_of(lambda: index.select(df, start, end, selected), repeat),
+        'date_only_masks': best_of(
+            lambda: df[(df['date'] >= pd.Timestamp(start)) & (df['date'] <= pd.Timestamp(end))], repeat
+        ),
+        'date_only_row_index': best_of(lambda: index.select(df, start, end), repeat),
+    }
+
+
+def bench_date_parsing(n_rows: int = 10_000_000, n_dates: int = 1_000, repeat: int = 3,
+                       seed: int = 0) -> Dict[str, float]:
+    """
+    Times date parsing of a loader column: per-row pd.to_datetime versus parse_dates.
+
+    Args:
+        n_rows: Number of rows
+        n_dates: Number of distinct date strings
+        repeat: Runs per measurement
+        seed: Random seed
+
+    Returns:
+        Dictionary of timings in seconds
+    """
+    rng = np.random.default_rng(seed)
+    distinct = pd.date_range('2022-01-01', periods=n_dates).strftime('%Y-%m-%d').to_numpy()
+    values = pd.Series(distinct[rng.integers(0, n_dates, n_rows)])
+
+    if not parse_dates(values).equals(pd.to_datetime(values, errors='coerce')):
+        raise AssertionError("parse_dates disagrees with pd.to_datetime")
+
+    return {
+        'to_datetime_rows': best_of(lambda: pd.to_datetime(values, errors='coerce'), repeat),
+        'parse_dates_unique': best_of(lambda: parse_dates(values), repeat),
+    }
+
+
+SUITE_SIZES = (10_000, 100_000, 1_000_000)
+DEFAULT_BASELINE = 'benchmark_baseline.json'
+DEFAULT_THRESHOLD = 0.25
+
+# Timings below this are dominated by noise and never count as regressions
+MIN_REGRESSION_SECONDS = 0.01
+
+
+class BenchmarkUpload(io.BytesIO):
+    """In-memory stand-in for a Streamlit UploadedFile holding CSV bytes."""
+
+    def __init__(self, data: bytes, name: str = 'benchmark.csv'):
+        super().__init__(data)
+        self.name = name
+        self.type = 'text/csv'
+
+
+CODEC_NAMES = {'gzip': 'sales.csv.gz', 'zstd': 'sales.csv.zst', 'zip': 'sales.zip'}
+
+
+def available_codecs() -> List[str]:
+    """Returns the codecs usable here; zstd needs the optional zstandard package."""
+    codecs = ['gzip', 'zip']
+    try:
+        import zstandard  # noqa: F401
+        codecs.append('zstd')
+    except ImportError:
+        pass
+    return codecs
+
+
+def compress_csv(data: bytes, codec: str) -> bytes:
+    """Compresses CSV bytes into a .gz, .zst or .zip file as exported by the upstream systems."""
+    if codec == 'gzip':
+        import gzip
+        return gzip.compress(data, compresslevel=6)
+    if codec == 'zstd':
+        import zstandard
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    if codec == 'zip':
+        import zipfile
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr('sales.csv', data)
+        return buffer.getvalue()
+    raise ValueError(f"Неизвестный формат сжатия: {codec}")
+
+
+def bench_decompression(n_rows: int = 1_000_000, codecs: Optional[List[str]] = None,
+                        repeat: int = 3) -> Dict[str, Dict[str, float]]:
+    """
+    Times the upload of the same CSV uncompressed and compressed with every codec.
+
+    Args:
+        n_rows: Number of rows
+        codecs: Codecs to measure, all available ones by default
+        repeat: Runs per measurement
+
+    Returns:
+        Dictionary mapping 'csv' and each codec to compressed_mb, the decompression
+        throughput mb_per_second (uncompressed MB/s, 0 for 'csv') and load_seconds
+        of load_uploaded_data
+    """
+    from compression import decompressed_stream
+    from data_loader import load_uploaded_data
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'sales.csv')
+        write_sales_file(path, n_rows)
+        with open(path, 'rb') as f:
+            data = f.read()
+
+    results = {'csv': {
+        'compressed_mb': len(data) / 2 ** 20,
+        'mb_per_second': 0.0,
+        'load_seconds': best_of(lambda: load_uploaded_data(BenchmarkUpload(data)), repeat),
+    }}
+    for codec in codecs or available_codecs():
+        compressed = compress_csv(data, codec)
+
+        def drain():
+            with decompressed_stream(io.BytesIO(compressed), codec) as stream:
+                while stream.read(1 << 20):
+                    pass
+
+        results[codec] = {
+            'compressed_mb': len(compressed) / 2 ** 20,
+            'mb_per_second': len(data) / 2 ** 20 / best_of(drain, repeat),
+            'load_seconds': best_of(
+                lambda: load_uploaded_data(BenchmarkUpload(compressed, name=CODEC_NAMES[codec])), repeat),
+        }
+    return results
+
+
+def suite_cases() -> List[Tuple[str, Callable[[Dict[str, Any]], object]]]:
+    """
+    Returns the (name, function) pairs of the suite; functions receive the prepared context.
+
+    The context holds 'csv_path', 'csv_bytes', 'df' (the loaded frame), 'start',
+    'end' and 'category'.
+    """
+    from aggregates import SalesAggregate, daily_category_totals
+    from analysis import calculate_sales_kpis, get_filtered_data
+    from data_loader import load_data_from_path, load_uploaded_data
+    import complex_function
+    import plotting
+    import refactored_function
+
+    return [
+        ('load_data_from_path', lambda ctx: load_data_from_path(ctx['csv_path'])),
+        ('load_uploaded_data', lambda ctx: load_uploaded_data(BenchmarkUpload(ctx['csv_bytes']))),
+        ('get_filtered_data', lambda ctx: get_filtered_data(ctx['df'], ctx['start'], ctx['end'])),
+        ('calculate_sales_kpis', lambda ctx: calculate_sales_kpis(ctx['df'])),
+        ('daily_category_totals', lambda ctx: daily_category_totals(ctx['df'])),
+        ('create_revenue_trend_plot', lambda ctx: plotting.create_revenue_trend_plot(ctx['df'])),
+        ('create_quantity_trend_plot', lambda ctx: plotting.create_quantity_trend_plot(ctx['df'])),
+        ('create_forecast_plot', lambda ctx: plotting.create_forecast_plot(ctx['df'])),
+        ('create_category_filter_plot', lambda ctx: plotting.create_category_filter_plot(ctx['df'], ctx['category'])),
+        ('create_correlation_heatmap', lambda ctx: plotting.create_correlation_heatmap(ctx['df'])),
+        ('create_category_small_multiples', lambda ctx: plotting.create_category_small_multiples(ctx['df'])),
+        ('create_distribution_plot', lambda ctx: plotting.create_distribution_plot(ctx['df'])),
+        ('create_daily_totals_plot',
+         lambda ctx: plotting.create_daily_totals_plot(SalesAggregate.from_frame(ctx['df']).daily())),
+        ('process_data_refactored', lambda ctx: refactored_function.process_data(ctx['df'])),
+        # The legacy implementation adds a revenue column to its input
+        ('process_data_legacy', lambda ctx: complex_function.process_data(ctx['df'].copy())),
+    ]
+
+
+def measure(func: Callable[[], object], repeat: int = 3) -> Tuple[float, float]:
+    """
+    Returns the best wall time and the peak traced memory of func.
+
+    Memory is traced in a separate run so that tracemalloc does not slow the timed runs.
+
+    Args:
+        func: Zero-argument function
+        repeat: Timed runs
+
+    Returns:
+        Tuple of (seconds, peak bytes)
+    """
+    seconds = best_of(func, repeat)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return seconds, peak
+
+
+def run_suite(sizes=SUITE_SIZES, cases: Optional[List[str]] = None, repeat: int = 3,
+              seed: int = 0, progress: Optional[Callable[[str], None]] = None) -> Dict[str, Dict]:
+    """
+    Runs the benchmark suite.
+
+    Args:
+        sizes: Row counts to run every case at
+        cases: Names of the cases to run, all if None
+        repeat: Timed runs per measurement
+        seed: Random seed of the generated data
+        progress: Optional callback receiving one line per finished measurement
+
+    Returns:
+        Dictionary "case@rows" -> {case, rows, seconds, rows_per_second, peak_mb}
+    """
+    from data_loader import load_data_from_path
+
+    selected = [(name, func) for name, func in suite_cases() if cases is None or name in cases]
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n_rows in sizes:
+            csv_path = os.path.join(tmp_dir, f"sales_{n_rows}.csv")
+            write_sales_file(csv_path, n_rows, n_categories=50, n_days=730, seed=seed)
+            with open(csv_path, 'rb') as f:
+                csv_bytes = f.read()
+            df = load_data_from_path(csv_path)
+            dates = df['date'].sort_values().unique()
+            context = {
+                'csv_path': csv_path,
+                'csv_bytes': csv_bytes,
+                'df': df,
+                'start': pd.Timestamp(dates[len(dates) // 4]).date(),
+                'end': pd.Timestamp(dates[3 * len(dates) // 4]).date(),
+                'category': df['category'].iloc[0],
+            }
+
+            for name, func in selected:
+                seconds, peak = measure(lambda: func(context), repeat)
+                results[f"{name}@{n_rows}"] = {
+                    'case': name,
+                    'rows': n_rows,
+                    'seconds': seconds,
+                    'rows_per_second': n_rows / seconds if seconds > 0 else 0.0,
+                    'peak_mb': peak / 2 ** 20,
+                }
+                if progress is not None:
+                    progress(f"  {name:<32} {n_rows:>10,} строк  {seconds * 1000:10.1f} ms  "
+                             f"{n_rows / seconds if seconds > 0 else 0:14,.0f} строк/с  {peak / 2 ** 20:8.1f} МБ")
+
+    return results
+
+
+def compare_with_baseline(results: Dict[str, Dict], baseline: Dict[str, Dict],
+                          threshold: float = DEFAULT_THRESHOLD,
+                          min_seconds: float = MIN_REGRESSION_SECONDS) -> List[str]:
+    """
+    Lists the measurements that got slower or bigger than the baseline beyond the threshold.
+
+    Args:
+        results: Output of run_suite
+        baseline: Results stored in the baseline file
+        threshold: Allowed relative increase (0.25 = 25%)
+        min_seconds: Absolute slowdown below which time changes are ignored
+
+    Returns:
+        Human-readable descriptions of the regressions (empty if none)
+    """
+    regressions = []
+    for key, result in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        slower = result['seconds'] - reference['seconds']
+        if result['seconds'] > reference['seconds'] * (1 + threshold) and slower > min_seconds:
+            regressions.append(f"{key}: время {reference['seconds'] * 1000:.1f} -> {result['seconds'] * 1000:.1f} ms")
+        if result['peak_mb'] > reference['peak_mb'] * (1 + threshold) and result['peak_mb'] - reference['peak_mb'] > 1:
+            regressions.append(f"{key}: память {reference['peak_mb']:.1f} -> {result['peak_mb']:.1f} МБ")
+    return regressions
+
+
+def load_baseline(path: str) -> Optional[Dict[str, Dict]]:
+    """Returns the results stored in a baseline file, or None if it does not exist."""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)['results']
+
+
+def save_baseline(path: str, results: Dict[str, Dict]) -> None:
+    """Writes results together with the environment they were measured in."""
+    document = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+        },
+        'results': results,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(document, f, ensure_ascii=False, indent=2)
+
+
+# Cold import budgets in seconds, measured with numpy and pandas already imported;
+# plotly.express alone takes about 0.2 s, streamlit about 0.5 s
+IMPORT_BUDGETS = {
+    'analysis': 0.05,
+    'data_loader': 0.08,
+    'refactored_function': 0.05,
+    'pipeline': 0.12,
+    'prewarm': 0.12,
+    'query_service': 0.12,
+}
+
+# Modules the headless modules above must not import
+HEAVY_MODULES = ('plotly', 'streamlit')
+
+
+def measure_import_time(module: str, preload: Tuple[str, ...] = ('numpy', 'pandas'),
+                        repeat: int = 3) -> Tuple[float, List[str]]:
+    """
+    Measures the cold import time of a module in fresh interpreters.
+
+    Args:
+        module: Module to import
+        preload: Modules imported before the clock starts
+        repeat: Interpreters started, the fastest import counts
+
+    Returns:
+        Tuple of (seconds, HEAVY_MODULES loaded by the import)
+    """
+    code = '\n'.join(
+        ['import sys, time'] + [f'import {name}' for name in preload] + [
+            'started = time.perf_counter()',
+            f'import {module}',
+            'print(time.perf_counter() - started)',
+            f"print(','.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))",
+        ]
+    )
+    timings = []
+    loaded: List[str] = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, '-c', code], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.splitlines()
+        timings.append(float(output[0]))
+        loaded = [name for name in output[1].split(',') if name]
+    return min(timings), loaded
+
+
+def check_import_budgets(budgets: Optional[Dict[str, float]] = None,
+                         repeat: int = 3) -> Tuple[Dict[str, float], List[str]]:
+    """
+    Measures every budgeted module and reports the ones over budget or importing heavy modules.
+
+    Args:
+        budgets: Seconds allowed per module (default IMPORT_BUDGETS)
+        repeat: Interpreters started per module
+
+    Returns:
+        Tuple of (seconds per module, violation descriptions)
+    """
+    if budgets is None:
+        budgets = IMPORT_BUDGETS
+    timings = {}
+    violations = []
+    for module, budget in budgets.items():
+        seconds, loaded = measure_import_time(module, repeat=repeat)
+        timings[module] = seconds
+        if seconds > budget:
+            violations.append(f"{module}: {seconds * 1000:.0f} ms > {budget * 1000:.0f} ms")
+        if loaded:
+            violations.append(f"{module}: imports {', '.join(loaded)}")
+    return timings, violations
+
+
+def print_timings(title: str, timings: Dict[str, float]) -> None:
+    """Prints a timing table."""
+    print(title)
+    width = max(len(name) for name in timings)
+    for name, seconds in timings.items():
+        print(f"  {name:<{width}}  {seconds * 1000:10.1f} ms")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Бенчмарки обработки данных")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    suite_parser = subparsers.add_parser('suite', help="Полный набор бенчмарков с базовой линией")
+    suite_parser.add_argument('--sizes', type=int, nargs='+', default=list(SUITE_SIZES), help="Размеры данных (строк)")
+    suite_parser.add_argument('--cases', nargs='+', default=None, help="Запускать только эти сценарии")
+    suite_parser.add_argument('--repeat', type=int, default=3, help="Число повторов")
+    suite_parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="JSON-файл базовой линии")
+    suite_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                              help="Допустимое относительное ухудшение (0.25 = 25%%)")
+    suite_parser.add_argument('--update-baseline', action='store_true', help="Записать результаты как базовую линию")
+    suite_parser.add_argument('--output', default=None, help="Сохранить результаты в JSON")
+
+    category_parser = subparsers.add_parser('category-filter', help="Фильтрация и группировка по категориям")
+    category_parser.add_argument('--rows', type=int, default=50_000_000, help="Число строк")
+    category_parser.add_argument('--categories', type=int, default=10_000, help="Число категорий")
+    category_parser.add_argument('--selected', type=int, default=10, help="Число выбранных категорий")
+    category_parser.add_argument('--repeat', type=int, default=3, help="Число повторов")
+
+    index_parser = subparsers.add_parser('row-index', help="Фильтр по датам и категориям через индекс строк")
+    index_parser.add_argument('--rows', type=int, default=10_000_000, help="Число строк")
+    index_parser.add_argument('--categories', type=int, default=5_000, help="Число категорий")
+    index_parser.add_argument('--selected', type=int, default=3, help="Число выбранных категорий")
+    index_parser.add_argument('--repeat', type=int, default=3, help="Число повторов")
+
+    dates_parser = subparsers.add_parser('date-parsing', help="Разбор дат при загрузке")
+    dates_parser.add_argument('--rows', type=int, default=10_000_000, help="Число строк")
+    dates_parser.add_argument('--dates', type=int, default=1_000, help="Число различных дат")
+    dates_parser.add_argument('--repeat', type=int, default=3, help="Число повторов")
+
+    import_parser = subparsers.add_parser('import-time', help="Время холодного импорта модулей")
+    import_parser.add_argument('--repeat', type=int, default=3, help="Число повторов")
+
+    decompression_parser = subparsers.add_parser('decompression', help="Скорость распаковки сжатых CSV")
+    decompression_parser.add_argument('--rows', type=int, default=1_000_000, help="Число строк")
+    decompression_parser.add_argument('--codecs', nargs='+', default=None, choices=sorted(CODEC_NAMES),
+                                      help="Форматы сжатия (по умолчанию все доступные)")
+    decompression_parser.add_argument('--repeat', type=int, default=3, help="Число повторов")
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'suite':
+        print(f"suite: {', '.join(f'{size:,}' for size in args.sizes)} строк")
+        results = run_suite(args.sizes, args.cases, args.repeat, progress=print)
+        if args.output:
+            save_baseline(args.output, results)
+        if args.update_baseline:
+            save_baseline(args.baseline, results)
+            print(f"Базовая линия записана: {args.baseline}")
+            return 0
+
+        baseline = load_baseline(args.baseline)
+        if baseline is None:
+            print(f"Базовая линия {args.baseline} не найдена; запустите с --update-baseline")
+            return 0
+        regressions = compare_with_baseline(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"  Регрессия: {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"Регрессий нет (порог {args.threshold:.0%})")
+    elif args.command == 'category-filter':
+        timings = bench_category_filter(args.rows, args.categories, args.selected, args.repeat)
+        print_timings(f"category-filter: {args.rows:,} строк, {args.categories:,} категорий", timings)
+    elif args.command == 'row-index':
+        timings = bench_row_index(args.rows, args.categories, args.selected, repeat=args.repeat)
+        print_timings(f"row-index: {args.rows:,} строк, {args.selected} из {args.categories:,} категорий", timings)
+    elif args.command == 'date-parsing':
+        timings = bench_date_parsing(args.rows, args.dates, args.repeat)
+        print_timings(f"date-parsing: {args.rows:,} строк, {args.dates:,} различных дат", timings)
+    elif args.command == 'import-time':
+        timings, violations = check_import_budgets(repeat=args.repeat)
+        print_timings("import-time (numpy и pandas уже импортированы)", timings)
+        for violation in violations:
+            print(f"  Превышение: {violation}", file=sys.stderr)
+        if violations:
+            return 1
+    elif args.command == 'decompression':
+        results = bench_decompression(args.rows, args.codecs, args.repeat)
+        print(f"decompression: {args.rows:,} строк")
+        print(f"  {'формат':<6}  {'размер, МБ':>10}  {'распаковка, МБ/с':>16}  {'загрузка, с':>11}")
+        for codec, values in results.items():
+            speed = f"{values['mb_per_second']:.0f}" if codec != 'csv' else '-'
+            print(f"  {codec:<6}  {values['compressed_mb']:10.1f}  {speed:>16}  {values['load_seconds']:11.2f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+import logging
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+from instrumentation import instrumented
+
+
+logger = logging.getLogger(__name__)
+
+# Always dictionary-encoded, whatever their cardinality
+CATEGORY_COLUMNS = ('category',)
+
+# Kept at float64: revenue is price * quantity, and float32 products would change the KPIs
+EXACT_COLUMNS = ('price',)
+
+# Narrowest integer type: int8/int16 columns would silently wrap in later arithmetic
+# (e.g. quantity.sum() or quantity * 1000 on numpy arrays), while int32 holds any realistic total
+MIN_INTEGER_DTYPE = np.int32
+
+# Maximum absolute error accepted when a float column is stored as float32
+DEFAULT_FLOAT_TOLERANCES = {'bounce_rate': 1e-6}
+
+
+class CompactionReport(NamedTuple):
+    """Memory footprint of a frame before and after compaction."""
+    bytes_before: int
+    bytes_after: int
+    columns: Dict[str, Tuple[str, str]]
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_before - self.bytes_after
+
+    @property
+    def ratio(self) -> float:
+        return self.bytes_before / self.bytes_after if self.bytes_after else 1.0
+
+
+def _compact_float(values: pd.Series, tolerance: float) -> pd.Series:
+    """Returns the column as float32 if that stays within the tolerance, else unchanged."""
+    original = values.to_numpy(dtype=np.float64)
+    narrowed = original.astype(np.float32)
+    with np.errstate(invalid='ignore', over='ignore'):
+        error = np.abs(narrowed.astype(np.float64) - original)
+    both_nan = np.isnan(original) & np.isnan(narrowed)
+    if np.all(both_nan | (error <= tolerance)):
+        return pd.Series(narrowed, index=values.index, name=values.name)
+    return values
+
+
+def compact_frame(
+    df: pd.DataFrame,
+    float_tolerances: Optional[Dict[str, float]] = None,
+    category_columns: Iterable[str] = CATEGORY_COLUMNS,
+    exact_columns: Iterable[str] = EXACT_COLUMNS,
+    max_category_ratio: float = 0.5,
+) -> Tuple[pd.DataFrame, CompactionReport]:
+    """
+    Shrinks the dtypes of a loaded frame without changing its values.
+
+    String columns become pandas categoricals (the category column always, others
+    when at most max_category_ratio of their values are distinct), integers are
+    downcast to the smallest signed type holding their range, but never below
+    MIN_INTEGER_DTYPE, and floats become
+    float32 when the round trip is exact or within the column's tolerance.
+
+    Args:
+        df: Loaded DataFrame
+        float_tolerances: Maximum absolute float32 error per column (default DEFAULT_FLOAT_TOLERANCES)
+        category_columns: Columns always converted to categorical
+        exact_columns: Float columns never narrowed
+        max_category_ratio: Highest distinct/total ratio for converting other string columns
+
+    Returns:
+        Tuple of (compacted DataFrame, CompactionReport)
+    """
+    if float_tolerances is None:
+        float_tolerances = DEFAULT_FLOAT_TOLERANCES
+    category_columns = set(category_columns)
+    exact_columns = set(exact_columns)
+
+    bytes_before = int(df.memory_usage(index=True, deep=True).sum())
+    compacted = {}
+    changes = {}
+
+    for column in df.columns:
+        values = df[column]
+        dtype = values.dtype
+        new_values = values
+
+        if isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_bool_dtype(dtype):
+            pass
+        elif pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype):
+            if column in category_columns or (
+                len(values) and values.nunique(dropna=False) <= max_category_ratio * len(values)
+            ):
+                new_values = values.astype('category')
+        elif pd.api.types.is_integer_dtype(dtype) and isinstance(dtype, np.dtype):
+            new_values = pd.to_numeric(values, downcast='integer')
+            if new_values.dtype.itemsize < np.dtype(MIN_INTEGER_DTYPE).itemsize:
+                new_values = new_values.astype(MIN_INTEGER_DTYPE) if dtype.itemsize > 4 else values
+        elif pd.api.types.is_float_dtype(dtype) and isinstance(dtype, np.dtype) and dtype.itemsize > 4:
+            if column not in exact_columns:
+                new_values = _compact_float(values, float_tolerances.get(column, 0.0))
+
+        if new_values.dtype != dtype:
+            changes[column] = (str(dtype), str(new_values.dtype))
+        compacted[column] = new_values
+
+    result = pd.DataFrame(compacted, index=df.index)
+    bytes_after = int(result.memory_usage(index=True, deep=True).sum())
+    return result, CompactionReport(bytes_before, bytes_after, changes)
+
+
+@instrumented()
+def compact_loaded_frame(df: Optional[pd.DataFrame]) -> Optional[pd.DataFrame]:
+    """
+    Compacts a frame returned by a loader and logs the bytes saved.
+
+    Args:
+        df: Loaded DataFrame or None
+
+    Returns:
+        Compacted DataFrame, or None if df is None
+    """
+    if df is None:
+        return None
+    df, report = compact_frame(df)
+    logger.info(
+        "Compaction: %.1f MB -> %.1f MB (%.1fx, %.1f MB saved)",
+        report.bytes_before / 2 ** 20, report.bytes_after / 2 ** 20, report.ratio, report.bytes_saved / 2 ** 20
+    )
+    return df
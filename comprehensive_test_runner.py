@@ -34,7 +34,8 @@ def run_performance_tests():
     print("\nRunning Performance Tests...")
     perf_tester = TestPerformanceScenarios()
     tests = [
-        # Skip the large dataset test as it might take too long
+        # Skip the large dataset test as it might take too long; timings are covered by
+        # `python -m benchmarks suite`
         perf_tester.test_calculate_sales_kpis_many_unique_dates,
         perf_tester.test_get_filtered_data_large_date_range,
         perf_tester.test_calculate_sales_kpis_zero_quantities
@@ -0,0 +1,147 @@
+import gzip
+import io
+import logging
+import os
+import threading
+import time
+import zipfile
+from contextlib import contextmanager
+from pathlib import PurePath
+from typing import BinaryIO, Dict, Iterator, Optional
+
+
+logger = logging.getLogger(__name__)
+
+# Codec of a compressed CSV, chosen by the last suffix of the file name
+CODEC_SUFFIXES = {'.gz': 'gzip', '.gzip': 'gzip', '.zst': 'zstd', '.zstd': 'zstd', '.zip': 'zip'}
+COMPRESSED_SUFFIXES = tuple(CODEC_SUFFIXES)
+
+
+def compression_codec(name: str) -> Optional[str]:
+    """Returns the codec of a compressed file name ('gzip', 'zstd' or 'zip'), or None."""
+    return CODEC_SUFFIXES.get(PurePath(name or '').suffix.lower())
+
+
+class _MeteredReader(io.RawIOBase):
+    """Read-only stream passing reads through while counting bytes and time spent reading."""
+
+    def __init__(self, stream: BinaryIO):
+        super().__init__()
+        self._stream = stream
+        self.bytes_read = 0
+        self.seconds = 0.0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        started = time.perf_counter()
+        data = self._stream.read(len(buffer))
+        self.seconds += time.perf_counter() - started
+        size = len(data)
+        buffer[:size] = data
+        self.bytes_read += size
+        return size
+
+
+def _source_size(source: BinaryIO) -> int:
+    """Returns the total size of an uploaded file or an open file."""
+    if hasattr(source, 'getbuffer'):
+        with source.getbuffer() as view:
+            return view.nbytes
+    return os.fstat(source.fileno()).st_size
+
+
+def _csv_member(archive: zipfile.ZipFile) -> zipfile.ZipInfo:
+    """Returns the CSV file of a zip archive, or its only file."""
+    members = [member for member in archive.infolist() if not member.is_dir()]
+    csv_members = [member for member in members if member.filename.lower().endswith('.csv')]
+    if csv_members:
+        return csv_members[0]
+    if len(members) == 1:
+        return members[0]
+    raise ValueError("Архив должен содержать CSV файл")
+
+
+@contextmanager
+def _open_codec(source: BinaryIO, codec: str) -> Iterator[BinaryIO]:
+    if codec == 'gzip':
+        with gzip.GzipFile(fileobj=source, mode='rb') as stream:
+            yield stream
+    elif codec == 'zstd':
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ImportError("Для файлов .zst требуется пакет zstandard") from e
+        with zstandard.ZstdDecompressor().stream_reader(source, read_across_frames=True, closefd=False) as stream:
+            yield stream
+    elif codec == 'zip':
+        with zipfile.ZipFile(source) as archive, archive.open(_csv_member(archive)) as stream:
+            yield stream
+    else:
+        raise ValueError(f"Неизвестный формат сжатия: {codec}")
+
+
+@contextmanager
+def decompressed_stream(source: BinaryIO, codec: str) -> Iterator[BinaryIO]:
+    """
+    Opens a compressed file as a stream of its uncompressed bytes.
+
+    The data is decompressed block by block as the reader (typically
+    pd.read_csv) asks for it, so the uncompressed file is never held in memory
+    or written to disk. The throughput is recorded per codec when the stream
+    is closed.
+
+    Args:
+        source: Binary file object of the compressed data, left open
+        codec: 'gzip', 'zstd' or 'zip' (the first CSV file of the archive)
+
+    Yields:
+        Binary stream of the uncompressed data
+
+    Raises:
+        ImportError: For zstd without the zstandard package installed
+        ValueError: For an unknown codec or an archive without a CSV file
+    """
+    compressed_bytes = _source_size(source)
+    with _open_codec(source, codec) as stream:
+        reader = _MeteredReader(stream)
+        try:
+            yield reader
+        finally:
+            record_decompression(codec, compressed_bytes, reader.bytes_read, reader.seconds)
+
+
+_throughput: Dict[str, Dict[str, float]] = {}
+_throughput_lock = threading.Lock()
+
+
+def record_decompression(codec: str, compressed_bytes: int, uncompressed_bytes: int, seconds: float) -> None:
+    """Logs a decompressed file and adds it to the per-codec totals."""
+    logger.info(
+        "Decompression (%s): %.1f MB -> %.1f MB in %.2f s (%.0f MB/s)",
+        codec, compressed_bytes / 2 ** 20, uncompressed_bytes / 2 ** 20, seconds,
+        uncompressed_bytes / 2 ** 20 / seconds if seconds > 0 else 0.0
+    )
+    with _throughput_lock:
+        totals = _throughput.setdefault(codec, {'files': 0, 'compressed_bytes': 0, 'bytes': 0, 'seconds': 0.0})
+        totals['files'] += 1
+        totals['compressed_bytes'] += compressed_bytes
+        totals['bytes'] += uncompressed_bytes
+        totals['seconds'] += seconds
+
+
+def decompression_throughput() -> Dict[str, Dict[str, float]]:
+    """
+    Returns the decompression totals of this process per codec.
+
+    Returns:
+        Dictionary mapping codec to files, compressed_bytes, bytes (uncompressed),
+        seconds spent decompressing, mb_per_second (uncompressed) and ratio
+    """
+    with _throughput_lock:
+        totals = {codec: dict(values) for codec, values in _throughput.items()}
+    for values in totals.values():
+        values['mb_per_second'] = values['bytes'] / 2 ** 20 / values['seconds'] if values['seconds'] > 0 else 0.0
+        values['ratio'] = values['bytes'] / values['compressed_bytes'] if values['compressed_bytes'] else 0.0
+    return totals
@@ -0,0 +1,216 @@
+import pandas as pd
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+
+class CovarianceAccumulator:
+    """
+    Mergeable running mean and co-moment matrix (Welford / Chan et al. update).
+
+    Accumulators built over separate chunks or partitions can be merged in any
+    order and give the same result as a single pass over all rows.
+    """
+
+    def __init__(self, n_columns: int):
+        self.count = 0
+        self.mean = np.zeros(n_columns)
+        self.comoment = np.zeros((n_columns, n_columns))
+
+    def update(self, values: np.ndarray) -> "CovarianceAccumulator":
+        """
+        Adds a block of observations; rows containing NaN are skipped.
+
+        Args:
+            values: Array of shape (n_rows, n_columns)
+
+        Returns:
+            The accumulator itself
+        """
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values).any(axis=1)]
+        if len(values) == 0:
+            return self
+
+        block = CovarianceAccumulator(values.shape[1])
+        block.count = len(values)
+        block.mean = values.mean(axis=0)
+        centered = values - block.mean
+        block.comoment = centered.T @ centered
+
+        return self.merge(block)
+
+    def merge(self, other: "CovarianceAccumulator") -> "CovarianceAccumulator":
+        """
+        Merges another accumulator into this one.
+
+        Args:
+            other: Accumulator over a disjoint set of rows
+
+        Returns:
+            The accumulator itself
+        """
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count = other.count
+            self.mean = other.mean.copy()
+            self.comoment = other.comoment.copy()
+            return self
+
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.comoment = self.comoment + other.comoment + np.outer(delta, delta) * (self.count * other.count / total)
+        self.mean = self.mean + delta * (other.count / total)
+        self.count = total
+        return self
+
+    def covariance(self) -> np.ndarray:
+        """Returns the sample covariance matrix (NaN with fewer than 2 rows)."""
+        if self.count < 2:
+            return np.full_like(self.comoment, np.nan)
+        return self.comoment / (self.count - 1)
+
+    def correlation(self) -> np.ndarray:
+        """Returns the Pearson correlation matrix; constant columns yield NaN."""
+        covariance = self.covariance()
+        std = np.sqrt(np.diag(covariance))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = covariance / np.outer(std, std)
+        return np.clip(corr, -1.0, 1.0)
+
+
+def numeric_columns(df: pd.DataFrame) -> List[str]:
+    """
+    Returns every numeric column of the frame, plus the derived 'revenue' column.
+
+    Args:
+        df: DataFrame to inspect
+
+    Returns:
+        List of column names
+    """
+    columns = [
+        col for col in df.columns
+        if pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col])
+    ]
+    if 'revenue' not in columns and {'price', 'quantity'}.issubset(columns):
+        columns.append('revenue')
+    return columns
+
+
+def _block_values(df: pd.DataFrame, columns: List[str], start: int, stop: int) -> np.ndarray:
+    """Extracts rows [start, stop) of the given columns as a float block without copying the frame."""
+    block = np.empty((stop - start, len(columns)))
+    for j, col in enumerate(columns):
+        if col == 'revenue' and 'revenue' not in df.columns:
+            price = df['price'].iloc[start:stop].to_numpy(dtype=float, na_value=np.nan)
+            quantity = df['quantity'].iloc[start:stop].to_numpy(dtype=float, na_value=np.nan)
+            block[:, j] = price * quantity
+        else:
+            block[:, j] = df[col].iloc[start:stop].to_numpy(dtype=float, na_value=np.nan)
+    return block
+
+
+def accumulate_covariance(
+    df: pd.DataFrame, columns: List[str], start: int = 0, stop: Optional[int] = None, chunk_size: int = 100_000
+) -> CovarianceAccumulator:
+    """
+    Accumulates co-moments over a row range of the frame, one chunk at a time.
+
+    Args:
+        df: DataFrame containing the columns
+        columns: Columns to include ('revenue' may be derived from price and quantity)
+        start: First row of the range
+        stop: End of the range (exclusive), defaults to the end of the frame
+        chunk_size: Number of rows materialized at once
+
+    Returns:
+        CovarianceAccumulator over the range
+    """
+    if stop is None:
+        stop = len(df)
+
+    accumulator = CovarianceAccumulator(len(columns))
+    for chunk_start in range(start, stop, chunk_size):
+        chunk_stop = min(chunk_start + chunk_size, stop)
+        accumulator.update(_block_values(df, columns, chunk_start, chunk_stop))
+    return accumulator
+
+
+def correlation_matrix(
+    df: pd.DataFrame, columns: Optional[List[str]] = None, chunk_size: int = 100_000, n_workers: int = 1
+) -> pd.DataFrame:
+    """
+    Computes the correlation matrix of all numeric columns chunk-wise.
+
+    With several workers the frame is split into contiguous partitions that are
+    accumulated in parallel and merged.
+
+    Args:
+        df: DataFrame to analyze
+        columns: Columns to include, defaults to numeric_columns(df)
+        chunk_size: Number of rows materialized at once per worker
+        n_workers: Number of worker threads
+
+    Returns:
+        Correlation matrix as a DataFrame indexed by column name
+    """
+    if columns is None:
+        columns = numeric_columns(df)
+
+    n_rows = len(df)
+    if n_workers <= 1 or n_rows <= chunk_size:
+        accumulator = accumulate_covariance(df, columns, chunk_size=chunk_size)
+    else:
+        bounds = np.linspace(0, n_rows, n_workers + 1).astype(int)
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            partials = executor.map(
+                lambda i: accumulate_covariance(df, columns, bounds[i], bounds[i + 1], chunk_size),
+                range(n_workers)
+            )
+            accumulator = CovarianceAccumulator(len(columns))
+            for partial in partials:
+                accumulator.merge(partial)
+
+    return pd.DataFrame(accumulator.correlation(), index=columns, columns=columns)
+
+
+def correlation_by_category(
+    df: pd.DataFrame, columns: Optional[List[str]] = None, chunk_size: int = 100_000
+) -> Dict[str, pd.DataFrame]:
+    """
+    Computes a correlation matrix for every category in one chunked pass.
+
+    Args:
+        df: DataFrame containing a 'category' column
+        columns: Columns to include, defaults to numeric_columns(df)
+        chunk_size: Number of rows materialized at once
+
+    Returns:
+        Dictionary mapping category to its correlation matrix
+    """
+    if columns is None:
+        columns = numeric_columns(df)
+
+    codes, categories = pd.factorize(df['category'], sort=True)
+    accumulators = [CovarianceAccumulator(len(columns)) for _ in range(len(categories))]
+
+    for chunk_start in range(0, len(df), chunk_size):
+        chunk_stop = min(chunk_start + chunk_size, len(df))
+        block = _block_values(df, columns, chunk_start, chunk_stop)
+        chunk_codes = codes[chunk_start:chunk_stop]
+
+        # Sort the block by category code once, then update each category's slice
+        order = np.argsort(chunk_codes, kind='stable')
+        sorted_codes = chunk_codes[order]
+        present, starts = np.unique(sorted_codes, return_index=True)
+        ends = np.append(starts[1:], len(sorted_codes))
+        for code, first, last in zip(present, starts, ends):
+            if code >= 0:
+                accumulators[code].update(block[order[first:last]])
+
+    return {
+        str(category): pd.DataFrame(accumulator.correlation(), index=columns, columns=columns)
+        for category, accumulator in zip(categories, accumulators)
+    }
@@ -1,9 +1,45 @@
-import streamlit as st
+import logging
+import sys
 import pandas as pd
 from pathlib import Path
 from typing import Optional
+from compaction import compact_loaded_frame
+from compression import COMPRESSED_SUFFIXES, compression_codec, decompressed_stream
+from date_parsing import parse_dates
+from instrumentation import instrumented, stage
 
 
+logger = logging.getLogger(__name__)
+
+CSV_SUFFIXES = ('.csv',)
+EXCEL_SUFFIXES = ('.xlsx', '.xls')
+PARQUET_SUFFIXES = ('.parquet',)
+
+
+def _notify(level: str, message: str) -> None:
+    """
+    Shows a message on the Streamlit page when called from one, otherwise logs it.
+
+    Streamlit is never imported here, so headless callers do not pay for it.
+
+    Args:
+        level: 'warning' or 'error'
+        message: Message text
+    """
+    st = sys.modules.get('streamlit')
+    if st is not None:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        if get_script_run_ctx(suppress_warning=True) is not None:
+            getattr(st, level)(message)
+            return
+
+    if level == 'error':
+        logger.error(message)
+    else:
+        logger.warning(message)
+
+
+@instrumented()
 def standardize_column_names(df: pd.DataFrame) -> pd.DataFrame:
     """
     Standardizes column names to English equivalents if they are in Russian or other formats.
@@ -50,6 +86,7 @@ def standardize_column_names(df: pd.DataFrame) -> pd.DataFrame:
     return df.rename(columns=rename_dict)
 
 
+@instrumented()
 def transform_sales_to_traffic(df: pd.DataFrame) -> pd.DataFrame:
     """
     Transforms sales data into web traffic metrics where possible.
@@ -101,13 +138,16 @@ def transform_sales_to_traffic(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-@st.cache_data
+@instrumented()
 def load_data_from_path(file_path: str = "synthetic_traffic.csv") -> Optional[pd.DataFrame]:
     """
-    Loads and caches data from a CSV file at a specific path.
+    Loads data from a CSV file at a specific path.
+
+    Caching is left to the caller (the dashboard keeps the result in the shared dataset store).
 
     Args:
-        file_path: Path to the CSV file. Defaults to 'synthetic_traffic.csv'.
+        file_path: Path to the CSV file, optionally compressed (.gz, .zst, .zip).
+            Defaults to 'synthetic_traffic.csv'.
 
     Returns:
         pandas DataFrame with loaded data or None if file cannot be loaded.
@@ -120,18 +160,25 @@ def load_data_from_path(file_path: str = "synthetic_traffic.csv") -> Optional[pd
     # Try loading from CSV first
     if csv_path.exists():
         try:
-            df = pd.read_csv(csv_path)
+            codec = compression_codec(csv_path.name)
+            with stage('data_loader.read_csv'):
+                if codec is None:
+                    df = pd.read_csv(csv_path)
+                else:
+                    with open(csv_path, 'rb') as f, decompressed_stream(f, codec) as stream:
+                        df = pd.read_csv(stream)
         except Exception as e:
-            st.warning(f"Ошибка при чтении CSV файла: {str(e)}")
+            _notify('warning', f"Ошибка при чтении CSV файла: {str(e)}")
             # If CSV fails, try Excel file
             pass
 
     # If CSV doesn't exist or failed, try Excel file
     if df is None and excel_path.exists():
         try:
-            df = pd.read_excel(excel_path)
+            with stage('data_loader.read_excel'):
+                df = pd.read_excel(excel_path)
         except Exception as e:
-            st.warning(f"Ошибка при чтении Excel файла: {str(e)}")
+            _notify('warning', f"Ошибка при чтении Excel файла: {str(e)}")
             return None
     elif df is None:
         # File doesn't exist but this is OK for the demo
@@ -145,9 +192,9 @@ def load_data_from_path(file_path: str = "synthetic_traffic.csv") -> Optional[pd
         # Convert date column to datetime - handle multiple possible names
         date_cols = [col for col in df.columns if 'date' in col.lower()]
         if date_cols:
-            df['date'] = pd.to_datetime(df[date_cols[0]], errors='coerce')
+            df['date'] = parse_dates(df[date_cols[0]])
         else:
-            st.error("Колонка 'date' не найдена в данных.")
+            _notify('error', "Колонка 'date' не найдена в данных.")
             return None
 
         # Remove rows with invalid dates
@@ -159,13 +206,70 @@ def load_data_from_path(file_path: str = "synthetic_traffic.csv") -> Optional[pd
         # Sort by date to ensure chronological order
         df = df.sort_values('date').reset_index(drop=True)
 
-    return df
+    # Shrink dtypes (categorical categories, narrow numbers) without changing values
+    return compact_loaded_frame(df)
+
+
+@instrumented()
+def prepare_loaded_chunk(df: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """
+    Standardizes column names, parses the date column and drops rows without a date.
+
+    Every step works row by row, so preparing the chunks of a file one at a time
+    gives the same rows as preparing the whole file.
+
+    Args:
+        df: Raw DataFrame (a whole file or one chunk of it)
+
+    Returns:
+        Prepared DataFrame or None if there is no date column.
+    """
+    # Standardize column names
+    df = standardize_column_names(df)
+
+    # Convert date column to datetime - handle multiple possible names
+    date_cols = [col for col in df.columns if 'date' in col.lower() or '─рЄр' in col]
+    if not date_cols:
+        _notify('error', "Колонка 'date' не найдена в данных.")
+        return None
+    df['date'] = parse_dates(df[date_cols[0]])
+
+    # Remove rows with invalid dates
+    return df.dropna(subset=['date'])
+
+
+@instrumented()
+def finish_loaded_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Completes a prepared frame: traffic metrics, date order and compact dtypes.
+
+    These steps need every row at once (medians, sorting), so they run after
+    all chunks have been prepared.
+
+    Args:
+        df: DataFrame returned by prepare_loaded_chunk (or the concatenation of its chunks)
 
+    Returns:
+        DataFrame ready for the dashboard
+    """
+    # Transform data to have traffic metrics
+    df = transform_sales_to_traffic(df)
+
+    # Sort by date to ensure chronological order
+    df = df.sort_values('date').reset_index(drop=True)
+
+    # Shrink dtypes (categorical categories, narrow numbers) without changing values
+    return compact_loaded_frame(df)
 
+
+@instrumented()
 def load_uploaded_data(uploaded_file) -> Optional[pd.DataFrame]:
     """
     Loads data from an uploaded file (CSV or Excel).
 
+    CSV files compressed with gzip, zstd or zip are decompressed on the fly
+    while parsing; the codec is chosen by the file name.
+
     Args:
         uploaded_file: Streamlit uploaded file object
 
@@ -177,35 +281,68 @@ def load_uploaded_data(uploaded_file) -> Optional[pd.DataFrame]:
 
     try:
         # Check file type and load accordingly
-        if uploaded_file.type == "text/csv":
-            df = pd.read_csv(uploaded_file)
+        codec = compression_codec(getattr(uploaded_file, 'name', ''))
+        if codec is not None:
+            with stage('data_loader.read_csv'), decompressed_stream(uploaded_file, codec) as stream:
+                df = pd.read_csv(stream)
+        elif uploaded_file.type == "text/csv":
+            with stage('data_loader.read_csv'):
+                df = pd.read_csv(uploaded_file)
         elif uploaded_file.type in ["application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
                                    "application/vnd.ms-excel"]:
-            df = pd.read_excel(uploaded_file)
+            with stage('data_loader.read_excel'):
+                df = pd.read_excel(uploaded_file)
         else:
-            st.error("Поддерживаются только CSV и Excel файлы")
+            _notify('error', "Поддерживаются только CSV и Excel файлы")
             return None
 
-        # Standardize column names
-        df = standardize_column_names(df)
-
-        # Convert date column to datetime - handle multiple possible names
-        date_cols = [col for col in df.columns if 'date' in col.lower() or '─рЄр' in col]
-        if date_cols:
-            df['date'] = pd.to_datetime(df[date_cols[0]], errors='coerce')
-            # Remove rows with invalid dates
-            df = df.dropna(subset=['date'])
-        else:
-            st.error("Колонка 'date' не найдена в данных.")
+        df = prepare_loaded_chunk(df)
+        if df is None:
             return None
+        return finish_loaded_frame(df)
+    except Exception as e:
+        _notify('error', f"Ошибка при загрузке файла: {str(e)}")
+        return None
 
-        # Transform data to have traffic metrics
-        df = transform_sales_to_traffic(df)
 
-        # Sort by date to ensure chronological order
-        df = df.sort_values('date').reset_index(drop=True)
+@instrumented()
+def load_data_file(file_path: str) -> Optional[pd.DataFrame]:
+    """
+    Loads a CSV, Excel or Parquet file chosen by its extension, without any fallback file.
+
+    Args:
+        file_path: Path to a .csv, .xlsx, .xls or .parquet file, or a CSV compressed
+            as .gz, .zst or .zip
 
-        return df
+    Returns:
+        pandas DataFrame with loaded data or None if file cannot be loaded.
+    """
+    path = Path(file_path)
+    suffix = path.suffix.lower()
+
+    try:
+        if suffix in CSV_SUFFIXES:
+            with stage('data_loader.read_csv'):
+                df = pd.read_csv(path)
+        elif suffix in COMPRESSED_SUFFIXES:
+            with stage('data_loader.read_csv'), open(path, 'rb') as f, \
+                    decompressed_stream(f, compression_codec(path.name)) as stream:
+                df = pd.read_csv(stream)
+        elif suffix in EXCEL_SUFFIXES:
+            with stage('data_loader.read_excel'):
+                df = pd.read_excel(path)
+        elif suffix in PARQUET_SUFFIXES:
+            # Requires pyarrow; a missing engine is reported like any other read error
+            with stage('data_loader.read_parquet'):
+                df = pd.read_parquet(path)
+        else:
+            _notify('error', "Поддерживаются только CSV, Excel и Parquet файлы")
+            return None
     except Exception as e:
-        st.error(f"Ошибка при загрузке файла: {str(e)}")
-        return None
\ No newline at end of file
+        _notify('error', f"Ошибка при загрузке файла: {str(e)}")
+        return None
+
+    df = prepare_loaded_chunk(df)
+    if df is None:
+        return None
+    return finish_loaded_frame(df)
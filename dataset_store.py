@@ -0,0 +1,256 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+import pandas as pd
+from frame_cache import derived_nbytes
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUDGET_MB = 1024
+BUDGET_ENV_VAR = 'DATASET_STORE_BUDGET_MB'
+
+# Set to 1 to allow changing the budget and clearing the store from the admin page
+ADMIN_ENV_VAR = 'DATASET_STORE_ADMIN'
+
+# Number of (path, size, mtime) file hashes remembered
+FILE_HASH_MEMO_SIZE = 256
+
+
+def content_hash(data: bytes) -> str:
+    """Returns the content hash used to deduplicate datasets."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+_file_hashes: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+_file_hashes_lock = threading.Lock()
+
+
+def file_content_hash(file_path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Hashes a file's content in chunks; the result is memoized per path, size and mtime.
+
+    The memo is shared by all sessions and keeps the FILE_HASH_MEMO_SIZE most
+    recently used files.
+
+    Args:
+        file_path: Path to the file
+        chunk_size: Bytes read at once
+
+    Returns:
+        Hex digest of the file content
+    """
+    stat = os.stat(file_path)
+    memo_key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+    with _file_hashes_lock:
+        cached = _file_hashes.get(memo_key)
+        if cached is not None:
+            _file_hashes.move_to_end(memo_key)
+            return cached
+
+    # Hashing runs outside the lock; concurrent misses on one file just hash it twice
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    with _file_hashes_lock:
+        _file_hashes[memo_key] = digest.hexdigest()
+        while len(_file_hashes) > FILE_HASH_MEMO_SIZE:
+            _file_hashes.popitem(last=False)
+    return digest.hexdigest()
+
+
+def frame_nbytes(df: Optional[pd.DataFrame]) -> int:
+    """Returns the deep memory footprint of a frame in bytes."""
+    if df is None:
+        return 0
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class _Entry:
+    def __init__(self, name: str):
+        self.name = name
+        self.df: Optional[pd.DataFrame] = None
+        self.nbytes = 0
+        self.sessions = set()
+        self.hits = 0
+        self.loaded_at = time.time()
+        self.last_access = self.loaded_at
+        self.ready = threading.Event()
+
+    def footprint(self) -> int:
+        """Returns the memory of the frame and of the structures derived from it (row index, aggregates)."""
+        if self.df is None:
+            return 0
+        return self.nbytes + derived_nbytes(self.df)
+
+
+class DatasetStore:
+    """
+    Process-wide registry of loaded datasets shared by all sessions.
+
+    Datasets are keyed by content hash, so identical uploads from different
+    sessions are held once. Entries are evicted least-recently-used once the
+    total footprint, including the row indexes and aggregates cached for the
+    frames, exceeds the memory budget. Stored frames are shared and
+    must be treated as read-only.
+    """
+
+    def __init__(self, budget_bytes: int = DEFAULT_BUDGET_MB * 1024 * 1024):
+        self.budget_bytes = budget_bytes
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get_or_load(self, key: str, loader: Callable[[], Optional[pd.DataFrame]], name: str = '',
+                    session_id: Optional[str] = None) -> Optional[pd.DataFrame]:
+        """
+        Returns the dataset for a content hash, loading it at most once.
+
+        Concurrent requests for the same key wait for the first loader instead of
+        parsing the same file again.
+
+        Args:
+            key: Content hash of the dataset
+            loader: Zero-argument function loading the frame
+            name: Display name (e.g. file name) for the admin view
+            session_id: Session using the dataset, for the admin view
+
+        Returns:
+            The shared DataFrame, or None if loading failed
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            owner = entry is None
+            if owner:
+                entry = _Entry(name)
+                self._entries[key] = entry
+            else:
+                self._entries.move_to_end(key)
+                entry.hits += 1
+            entry.last_access = time.time()
+            if session_id is not None:
+                entry.sessions.add(session_id)
+
+        if not owner:
+            entry.ready.wait()
+            return entry.df
+
+        try:
+            df = loader()
+        except Exception:
+            with self._lock:
+                self._entries.pop(key, None)
+            entry.ready.set()
+            raise
+
+        with self._lock:
+            entry.df = df
+            entry.nbytes = frame_nbytes(df)
+            if df is None:
+                # Failed loads are not kept so that a later attempt can retry
+                self._entries.pop(key, None)
+            self._evict(keep=key)
+        entry.ready.set()
+        return df
+
+    def get(self, key: str, session_id: Optional[str] = None) -> Optional[pd.DataFrame]:
+        """
+        Returns a dataset that is already loaded, without loading or waiting for it.
+
+        Args:
+            key: Content hash of the dataset
+            session_id: Session using the dataset, for the admin view
+
+        Returns:
+            The shared DataFrame, or None if it is not loaded (yet)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not entry.ready.is_set():
+                return None
+            self._entries.move_to_end(key)
+            entry.hits += 1
+            entry.last_access = time.time()
+            if session_id is not None:
+                entry.sessions.add(session_id)
+            return entry.df
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        """Drops least recently used datasets until the budget is met (lock held)."""
+        while self.used_bytes() > self.budget_bytes:
+            victim = next((k for k, e in self._entries.items() if k != keep and e.ready.is_set()), None)
+            if victim is None:
+                break
+            entry = self._entries.pop(victim)
+            self.evictions += 1
+            logger.info("Dataset %s (%s, %.1f MB) evicted", victim[:8], entry.name, entry.footprint() / 2 ** 20)
+
+    def used_bytes(self) -> int:
+        """Returns the total footprint of all stored datasets and their derived structures."""
+        return sum(entry.footprint() for entry in self._entries.values())
+
+    def set_budget(self, budget_bytes: int) -> None:
+        """Changes the memory budget and evicts if necessary."""
+        with self._lock:
+            self.budget_bytes = budget_bytes
+            self._evict()
+
+    def remove(self, key: str) -> None:
+        """Drops a dataset from the store."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drops every dataset."""
+        with self._lock:
+            self._entries.clear()
+
+    def usage(self) -> List[Dict]:
+        """
+        Describes every stored dataset, most recently used first.
+
+        Returns:
+            List of dictionaries with key, name, rows, bytes, sessions, hits and timestamps
+        """
+        with self._lock:
+            return [
+                {
+                    'key': key,
+                    'name': entry.name,
+                    'rows': 0 if entry.df is None else len(entry.df),
+                    'bytes': entry.footprint(),
+                    'sessions': len(entry.sessions),
+                    'hits': entry.hits,
+                    'loaded_at': entry.loaded_at,
+                    'last_access': entry.last_access,
+                }
+                for key, entry in reversed(self._entries.items())
+            ]
+
+
+_store: Optional[DatasetStore] = None
+_store_lock = threading.Lock()
+
+
+def get_dataset_store() -> DatasetStore:
+    """
+    Returns the process-wide dataset store, created on first use.
+
+    The budget is read from the DATASET_STORE_BUDGET_MB environment variable.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            budget_mb = float(os.environ.get(BUDGET_ENV_VAR, DEFAULT_BUDGET_MB))
+            _store = DatasetStore(int(budget_mb * 1024 * 1024))
+        return _store
+
+
+def admin_controls_enabled() -> bool:
+    """Returns whether the admin page may change the shared store (DATASET_STORE_ADMIN=1)."""
+    return os.environ.get(ADMIN_ENV_VAR, '').strip().lower() in ('1', 'true', 'yes')
@@ -0,0 +1,71 @@
+import logging
+import pandas as pd
+from typing import Optional
+from instrumentation import instrumented
+
+try:
+    from pandas.tseries.api import guess_datetime_format
+except ImportError:  # pandas < 2.2
+    from pandas._libs.tslibs.parsing import guess_datetime_format
+
+
+logger = logging.getLogger(__name__)
+
+
+def detect_date_format(uniques: pd.Index) -> Optional[str]:
+    """
+    Detects the strptime format of a column from its first non-missing value.
+
+    This is the value pandas itself infers the format from, so parsing with the
+    detected format gives the same result as pd.to_datetime(errors='coerce').
+
+    Args:
+        uniques: Distinct values of the column
+
+    Returns:
+        Format string, or None if the values are not strings or no format is recognized
+    """
+    first = next((value for value in uniques if isinstance(value, str) and value.strip()), None)
+    if first is None:
+        return None
+    return guess_datetime_format(first)
+
+
+@instrumented()
+def parse_dates(values: pd.Series) -> pd.Series:
+    """
+    Converts a column to datetimes, parsing every distinct value only once.
+
+    Sales files repeat a few thousand date strings over millions of rows, so the
+    column is factorized, the distinct strings are parsed with the strict parser
+    of the detected format and the results are mapped back through the codes.
+    Invalid values become NaT, as with pd.to_datetime(errors='coerce').
+
+    Args:
+        values: Date column as read from the file
+
+    Returns:
+        Datetime column aligned with values
+    """
+    if pd.api.types.is_datetime64_any_dtype(values.dtype):
+        return values
+
+    codes, uniques = pd.factorize(values)
+    uniques = pd.Index(uniques)
+    date_format = detect_date_format(uniques)
+
+    parsed = None
+    if date_format is not None:
+        try:
+            parsed = pd.to_datetime(uniques, format=date_format, errors='coerce')
+        except (ValueError, TypeError):
+            parsed = None
+    if parsed is None:
+        date_format = None
+        parsed = pd.to_datetime(uniques, errors='coerce')
+
+    logger.debug("Parsed %d distinct dates of %d rows (format %s)", len(uniques), len(values), date_format)
+
+    # Code -1 (missing value) becomes NaT
+    result = pd.api.extensions.take(parsed.array, codes, allow_fill=True)
+    return pd.Series(result, index=values.index, name=values.name)
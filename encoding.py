@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+from typing import Iterable, Tuple
+
+
+def category_codes(values: pd.Series) -> Tuple[np.ndarray, pd.Index]:
+    """
+    Returns the dictionary encoding of a category column.
+
+    Categorical columns (as produced by the loaders) are used as they are; any
+    other column is factorized once.
+
+    Args:
+        values: Category column
+
+    Returns:
+        Tuple of (integer codes with -1 for missing values, categories)
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), values.cat.categories
+    codes, categories = pd.factorize(values)
+    return codes, pd.Index(categories)
+
+
+def category_lookup(categories: pd.Index, selected: Iterable) -> np.ndarray:
+    """
+    Builds the boolean lookup table of selected categories, indexed by code.
+
+    The table has one extra trailing False entry so that code -1 (missing) maps to it.
+
+    Args:
+        categories: Categories of the encoding
+        selected: Selected category values
+
+    Returns:
+        Boolean array of length len(categories) + 1
+    """
+    lookup = np.zeros(len(categories) + 1, dtype=bool)
+    positions = categories.get_indexer(pd.Index(list(selected)))
+    lookup[positions[positions >= 0]] = True
+    return lookup
+
+
+def category_mask(values: pd.Series, selected: Iterable) -> np.ndarray:
+    """
+    Returns the row mask of a category selection, equivalent to values.isin(selected).
+
+    Only categorical columns (as produced by the loaders) benefit: their codes
+    turn the filter into one array gather per row instead of hashing every
+    string. Any other column would need a full factorize pass per call, which
+    costs as much as isin itself, so it is filtered with isin.
+
+    Args:
+        values: Category column
+        selected: Selected category values
+
+    Returns:
+        Boolean numpy array aligned with values
+    """
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        return values.isin(list(selected)).to_numpy()
+    codes, categories = category_codes(values)
+    return category_lookup(categories, selected)[codes]
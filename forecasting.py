@@ -0,0 +1,265 @@
+import pandas as pd
+import numpy as np
+from statistics import NormalDist
+from typing import List, NamedTuple, Optional, Tuple
+
+
+TOTAL_SERIES = '__total__'
+FORECAST_MODELS = ('linear', 'seasonal_naive', 'holt_winters')
+
+
+class ForecastResult(NamedTuple):
+    """
+    Forecasts for a batch of series sharing one date axis.
+
+    All arrays are laid out as (time, series): column ``k`` belongs to ``series[k]``.
+    """
+    dates: pd.DatetimeIndex
+    series: List[str]
+    history: np.ndarray
+    fitted: np.ndarray
+    forecast_dates: pd.DatetimeIndex
+    mean: np.ndarray
+    lower: np.ndarray
+    upper: np.ndarray
+
+    def column(self, name: str) -> int:
+        """Returns the column index of the series with the given name."""
+        return self.series.index(name)
+
+
+def build_series_matrix(
+    df: pd.DataFrame, value_cols: List[str], include_total: bool = True
+) -> Tuple[pd.DatetimeIndex, List[Tuple[str, str]], np.ndarray]:
+    """
+    Builds the date x series matrix for every category from a single groupby pass.
+
+    Dates are the distinct dates present in the data (as in the aggregate chart),
+    and category/date combinations without sales are filled with zero. Rows
+    without a category are only part of the totals.
+
+    Args:
+        df: DataFrame containing date, category and the value columns
+        value_cols: Columns to aggregate, e.g. ['revenue', 'quantity']
+        include_total: Whether to append a total column per value column
+
+    Returns:
+        A tuple containing:
+        - Sorted distinct dates (the time axis)
+        - (value column, category) labels for every matrix column
+        - Matrix of shape (len(dates), len(labels))
+    """
+    # Rows without a category get no series of their own but still count in the totals
+    grouped = df.groupby(['date', 'category'], observed=True, dropna=False)[value_cols].sum()
+    wide = grouped.unstack('category', fill_value=0).sort_index()
+    has_category = wide.columns.get_level_values('category').notna()
+
+    dates = pd.DatetimeIndex(wide.index)
+    labels = [(value_col, str(category)) for value_col, category in wide.columns[has_category]]
+    matrix = wide.loc[:, has_category].to_numpy(dtype=float)
+
+    if include_total:
+        totals = [wide[value_col].to_numpy(dtype=float).sum(axis=1) for value_col in value_cols]
+        matrix = np.column_stack([matrix] + totals) if len(labels) else np.column_stack(totals)
+        labels += [(value_col, TOTAL_SERIES) for value_col in value_cols]
+
+    return dates, labels, matrix
+
+
+def _linear_trend(values: np.ndarray, horizon: int, z: float) -> Tuple[np.ndarray, ...]:
+    """Fits a linear trend to every column with one matrix least-squares solve."""
+    n_obs = values.shape[0]
+    design = np.column_stack([np.ones(n_obs), np.arange(n_obs, dtype=float)])
+    coeffs, _, _, _ = np.linalg.lstsq(design, values, rcond=None)
+    fitted = design @ coeffs
+
+    future = np.column_stack([np.ones(horizon), np.arange(n_obs, n_obs + horizon, dtype=float)])
+    mean = future @ coeffs
+
+    # Prediction interval of ordinary least squares, shared leverage for all columns
+    dof = max(n_obs - 2, 1)
+    sigma = np.sqrt(((values - fitted) ** 2).sum(axis=0) / dof)
+    xtx_inv = np.linalg.pinv(design.T @ design)
+    leverage = np.einsum('ij,jk,ik->i', future, xtx_inv, future)
+    spread = z * np.sqrt(1.0 + leverage)[:, None] * sigma[None, :]
+
+    return fitted, mean, mean - spread, mean + spread
+
+
+def _seasonal_naive(
+    values: np.ndarray, horizon: int, z: float, season_length: int
+) -> Tuple[np.ndarray, ...]:
+    """Repeats the last observed season for every column."""
+    n_obs = values.shape[0]
+    fitted = np.full_like(values, np.nan)
+    fitted[season_length:] = values[:-season_length]
+
+    steps = np.arange(horizon)
+    mean = values[n_obs - season_length + steps % season_length]
+
+    residuals = values[season_length:] - values[:-season_length]
+    sigma = np.sqrt((residuals ** 2).mean(axis=0)) if len(residuals) else np.zeros(values.shape[1])
+    spread = z * np.sqrt(steps // season_length + 1.0)[:, None] * sigma[None, :]
+
+    return fitted, mean, mean - spread, mean + spread
+
+
+def _holt_winters(
+    values: np.ndarray,
+    horizon: int,
+    z: float,
+    season_length: int,
+    alpha: float,
+    beta: float,
+    gamma: float,
+) -> Tuple[np.ndarray, ...]:
+    """Additive Holt-Winters; the recursion runs over time with all columns updated at once."""
+    n_obs, n_series = values.shape
+    m = season_length
+
+    level = values[:m].mean(axis=0)
+    trend = (values[m:2 * m].mean(axis=0) - level) / m
+    seasonal = values[:m] - level
+
+    fitted = np.full_like(values, np.nan)
+    for t in range(m, n_obs):
+        season = seasonal[t % m].copy()
+        fitted[t] = level + trend + season
+        previous_level = level
+        level = alpha * (values[t] - season) + (1 - alpha) * (level + trend)
+        trend = beta * (level - previous_level) + (1 - beta) * trend
+        seasonal[t % m] = gamma * (values[t] - level) + (1 - gamma) * season
+
+    steps = np.arange(1, horizon + 1)
+    season_idx = (n_obs + steps - 1) % m
+    mean = level[None, :] + steps[:, None] * trend[None, :] + seasonal[season_idx]
+
+    residuals = values[m:] - fitted[m:]
+    sigma = np.sqrt((residuals ** 2).mean(axis=0)) if len(residuals) else np.zeros(n_series)
+
+    # Variance multipliers of the additive Holt-Winters state space model
+    c = alpha * (1 + steps[:-1] * beta) + gamma * (1 - alpha) * (steps[:-1] % m == 0)
+    multipliers = np.sqrt(1.0 + np.concatenate([[0.0], np.cumsum(c ** 2)]))
+    spread = z * multipliers[:, None] * sigma[None, :]
+
+    return fitted, mean, mean - spread, mean + spread
+
+
+def min_observations(model: str, season_length: int = 7) -> int:
+    """
+    Returns the number of observations a forecast model needs.
+
+    Args:
+        model: One of 'linear', 'seasonal_naive' or 'holt_winters'
+        season_length: Seasonal period for the seasonal models
+
+    Returns:
+        Minimum length of the series
+
+    Raises:
+        ValueError: For an unknown model
+    """
+    if model == 'linear':
+        return 2
+    if model == 'seasonal_naive':
+        return season_length
+    if model == 'holt_winters':
+        return 2 * season_length
+    raise ValueError(f"Неизвестная модель прогноза: {model}")
+
+
+def forecast_matrix(
+    values: np.ndarray,
+    horizon: int = 7,
+    model: str = 'linear',
+    level: float = 0.95,
+    season_length: int = 7,
+    alpha: float = 0.3,
+    beta: float = 0.05,
+    gamma: float = 0.1,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Forecasts every column of a (time, series) matrix in one call.
+
+    Args:
+        values: Matrix of observations, one column per series
+        horizon: Number of periods to forecast
+        model: One of 'linear', 'seasonal_naive' or 'holt_winters'
+        level: Coverage of the prediction interval
+        season_length: Seasonal period for the seasonal models
+        alpha: Level smoothing factor for Holt-Winters
+        beta: Trend smoothing factor for Holt-Winters
+        gamma: Seasonal smoothing factor for Holt-Winters
+
+    Returns:
+        A tuple of (fitted, mean, lower, upper) arrays. ``fitted`` has the shape of
+        ``values``, the rest have shape (horizon, n_series).
+    """
+    values = np.asarray(values, dtype=float)
+    if values.ndim == 1:
+        values = values[:, None]
+    n_obs = values.shape[0]
+    z = NormalDist().inv_cdf(0.5 + level / 2)
+
+    required = min_observations(model, season_length)
+    if model == 'linear':
+        if n_obs < required:
+            raise ValueError(f"Для линейного тренда нужно минимум {required} наблюдения")
+        return _linear_trend(values, horizon, z)
+    if model == 'seasonal_naive':
+        if n_obs < required:
+            raise ValueError(f"Для сезонной модели нужно минимум {required} наблюдений")
+        return _seasonal_naive(values, horizon, z, season_length)
+    if n_obs < required:
+        raise ValueError(f"Для модели Хольта-Винтерса нужно минимум {required} наблюдений")
+    return _holt_winters(values, horizon, z, season_length, alpha, beta, gamma)
+
+
+def forecast_by_category(
+    df: pd.DataFrame,
+    value_cols: Optional[List[str]] = None,
+    horizon: int = 7,
+    model: str = 'linear',
+    level: float = 0.95,
+    include_total: bool = True,
+    **model_params,
+) -> ForecastResult:
+    """
+    Forecasts every category (and the total) of the given value columns at once.
+
+    Args:
+        df: DataFrame containing date, category, price and quantity data
+        value_cols: Columns to forecast; defaults to ['revenue', 'quantity']
+        horizon: Number of days to forecast
+        model: One of 'linear', 'seasonal_naive' or 'holt_winters'
+        level: Coverage of the prediction interval
+        include_total: Whether to also forecast the sum over categories
+        **model_params: Extra parameters passed to forecast_matrix
+
+    Returns:
+        ForecastResult whose series are named '<value column>:<category>'
+    """
+    if value_cols is None:
+        value_cols = ['revenue', 'quantity']
+
+    data = df
+    if 'revenue' in value_cols and 'revenue' not in df.columns:
+        data = df.assign(revenue=df['price'] * df['quantity'])
+
+    dates, labels, matrix = build_series_matrix(data, value_cols, include_total)
+    fitted, mean, lower, upper = forecast_matrix(
+        matrix, horizon=horizon, model=model, level=level, **model_params
+    )
+
+    forecast_dates = dates.max() + pd.to_timedelta(np.arange(1, horizon + 1), unit='D')
+
+    return ForecastResult(
+        dates=dates,
+        series=[f"{value_col}:{category}" for value_col, category in labels],
+        history=matrix,
+        fitted=fitted,
+        forecast_dates=forecast_dates,
+        mean=mean,
+        lower=lower,
+        upper=upper,
+    )
@@ -0,0 +1,77 @@
+import threading
+import weakref
+import pandas as pd
+from typing import Callable, Dict, Generic, Optional, Tuple, TypeVar
+
+
+T = TypeVar('T')
+
+# Every FrameCache, so that the memory derived from a frame can be accounted for
+_caches: 'weakref.WeakSet[FrameCache]' = weakref.WeakSet()
+
+
+class FrameCache(Generic[T]):
+    """
+    Structures derived from a DataFrame, built once per frame object.
+
+    Entries are keyed by id() and live as long as their frame: a weak reference
+    tells a live frame from a new one that reused the id, and the entry is
+    dropped when the frame is collected. Frames shared through the dataset
+    store therefore share their derived structures too. Frames must not be
+    mutated once cached. Values with an nbytes() method are included in
+    derived_nbytes().
+    """
+
+    def __init__(self, build: Callable[[pd.DataFrame], T]):
+        self._build = build
+        self._entries: Dict[int, Tuple[weakref.ref, T]] = {}
+        self._lock = threading.Lock()
+        _caches.add(self)
+
+    def peek(self, df: pd.DataFrame) -> Optional[T]:
+        """Returns the cached value of a frame, or None if it was not built yet."""
+        with self._lock:
+            cached = self._entries.get(id(df))
+        if cached is not None and cached[0]() is df:
+            return cached[1]
+        return None
+
+    def put(self, df: pd.DataFrame, value: T) -> None:
+        """Caches a value built elsewhere (e.g. while the frame was being loaded)."""
+        key = id(df)
+        with self._lock:
+            self._entries[key] = (weakref.ref(df), value)
+        weakref.finalize(df, self._discard, key)
+
+    def get(self, df: pd.DataFrame) -> T:
+        """Returns the value of a frame, building it on first use."""
+        value = self.peek(df)
+        if value is None:
+            value = self._build(df)
+            self.put(df, value)
+        return value
+
+    def _discard(self, key: int) -> None:
+        with self._lock:
+            cached = self._entries.get(key)
+            # The id may already belong to a newer frame cached after this one died
+            if cached is not None and cached[0]() is None:
+                del self._entries[key]
+
+
+def derived_nbytes(df: pd.DataFrame) -> int:
+    """
+    Returns the memory held by the structures cached for a frame in any FrameCache.
+
+    Args:
+        df: DataFrame whose derived structures are counted
+
+    Returns:
+        Sum of nbytes() over the cached values that report it
+    """
+    total = 0
+    for cache in list(_caches):
+        value = cache.peek(df)
+        if value is not None and hasattr(value, 'nbytes'):
+            total += value.nbytes()
+    return total
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Streaming generator of large synthetic sales datasets.
+
+    python -m generate_sales_data sales_10m.csv --rows 10000000 --categories 5000 --days 730
+
+The output format follows the file suffix: .csv, .xlsx or .parquet. Rows are
+generated day by day and written in chunks, so the full dataset is never held
+in memory. Every day has its own seeded random stream, so the same seed gives
+the same file whatever the chunk size.
+"""
+
+import argparse
+import sys
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Iterator, Optional
+from table_export import EXCEL_MAX_ROWS
+
+
+BASE_CATEGORIES = ['Электроника', 'Одежда', 'Дом', 'Книги', 'Спорт', 'Красота', 'Игрушки', 'Продукты']
+
+
+def category_names(n_categories: int) -> np.ndarray:
+    """Returns category names: the familiar ones first, then numbered ones."""
+    names = BASE_CATEGORIES[:n_categories]
+    names += [f"Категория {i:05d}" for i in range(len(names), n_categories)]
+    return np.array(names, dtype=object)
+
+
+def zipf_weights(n_categories: int, skew: float) -> np.ndarray:
+    """Returns category probabilities proportional to 1 / rank ** skew (0 = uniform)."""
+    weights = 1.0 / np.arange(1, n_categories + 1) ** skew
+    return weights / weights.sum()
+
+
+def daily_intensity(n_days: int) -> np.ndarray:
+    """
+    Returns the relative activity of every day.
+
+    Same shape as the existing sample data generator: linear trend, annual
+    seasonality and a weekly pattern around a base level of 100.
+    """
+    t = np.arange(n_days)
+    trend = np.linspace(0, 50, n_days)
+    seasonal = 20 * np.sin(2 * np.pi * t / 365.25)
+    weekly = np.array([0, -10, -5, 0, 5, 15, 10])[t % 7]
+    return np.maximum(100 + trend + seasonal + weekly, 1.0)
+
+
+def rows_per_day(n_rows: int, n_days: int) -> np.ndarray:
+    """Splits n_rows over the days proportionally to their intensity, summing exactly to n_rows."""
+    intensity = daily_intensity(n_days)
+    exact = n_rows * intensity / intensity.sum()
+    counts = np.floor(exact).astype(np.int64)
+    remainder = n_rows - counts.sum()
+    counts[np.argsort(exact - counts)[::-1][:remainder]] += 1
+    return counts
+
+
+def iter_sales_chunks(
+    n_rows: int,
+    n_categories: int = 50,
+    skew: float = 1.1,
+    start_date: str = '2023-01-01',
+    n_days: int = 365,
+    chunk_rows: int = 500_000,
+    seed: int = 42,
+) -> Iterator[pd.DataFrame]:
+    """
+    Yields the dataset as date-ordered chunks of roughly chunk_rows rows.
+
+    Args:
+        n_rows: Total number of rows
+        n_categories: Number of distinct categories
+        skew: Zipf exponent of the category popularity (0 = uniform)
+        start_date: First date
+        n_days: Number of days covered
+        chunk_rows: Target chunk size; whole days are never split
+        seed: Random seed
+
+    Yields:
+        DataFrames with date (YYYY-MM-DD strings), category, price and quantity
+    """
+    names = category_names(n_categories)
+    probabilities = zipf_weights(n_categories, skew)
+    intensity = daily_intensity(n_days)
+    relative = intensity / intensity.mean()
+    counts = rows_per_day(n_rows, n_days)
+    dates = pd.date_range(start_date, periods=n_days).strftime('%Y-%m-%d')
+
+    # Each category has its own typical price
+    base_prices = np.random.default_rng([seed, 0]).lognormal(mean=7.5, sigma=1.0, size=n_categories)
+
+    parts, buffered = [], 0
+    for day in range(n_days):
+        size = int(counts[day])
+        if size == 0:
+            continue
+        rng = np.random.default_rng([seed, 1, day])
+        codes = rng.choice(n_categories, size=size, p=probabilities)
+        parts.append(pd.DataFrame({
+            'date': np.full(size, dates[day], dtype=object),
+            'category': names[codes],
+            'price': np.round(base_prices[codes] * rng.lognormal(0.0, 0.15, size), 2),
+            'quantity': rng.poisson(2.0 * relative[day], size) + 1,
+        }))
+        buffered += size
+        if buffered >= chunk_rows:
+            yield pd.concat(parts, ignore_index=True)
+            parts, buffered = [], 0
+
+    if parts:
+        yield pd.concat(parts, ignore_index=True)
+
+
+def write_sales_file(path: str, n_rows: int, chunk_rows: int = 500_000, **params) -> int:
+    """
+    Streams a generated dataset to CSV, Excel (write-only mode) or Parquet.
+
+    Args:
+        path: Output file; the format is chosen by the suffix
+        n_rows: Total number of rows
+        chunk_rows: Rows generated and written at once
+        **params: Further iter_sales_chunks parameters
+
+    Returns:
+        Number of rows written
+
+    Raises:
+        ValueError: For unknown suffixes or more rows than an Excel sheet holds
+        ImportError: For Parquet output without pyarrow installed
+    """
+    suffix = Path(path).suffix.lower()
+    chunks = iter_sales_chunks(n_rows, chunk_rows=chunk_rows, **params)
+    written = 0
+
+    if suffix == '.csv':
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            for chunk in chunks:
+                chunk.to_csv(f, header=written == 0, index=False)
+                written += len(chunk)
+
+    elif suffix == '.xlsx':
+        if n_rows > EXCEL_MAX_ROWS:
+            raise ValueError(f"Лист Excel вмещает не более {EXCEL_MAX_ROWS:,} строк")
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet('sales')
+        sheet.append(['date', 'category', 'price', 'quantity'])
+        for chunk in chunks:
+            for row in chunk.itertuples(index=False):
+                sheet.append([row.date, row.category, float(row.price), int(row.quantity)])
+            written += len(chunk)
+        workbook.save(path)
+
+    elif suffix == '.parquet':
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Для записи Parquet требуется пакет pyarrow") from e
+
+        writer: Optional[pq.ParquetWriter] = None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+                written += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+
+    else:
+        raise ValueError(f"Неподдерживаемый формат: {suffix}")
+
+    return written
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Генерация больших синтетических наборов данных о продажах")
+    parser.add_argument('output', help="Файл .csv, .xlsx или .parquet")
+    parser.add_argument('--rows', type=int, default=1_000_000, help="Число строк")
+    parser.add_argument('--rows-per-day', type=int, default=None, help="Строк в день (вместо --rows)")
+    parser.add_argument('--categories', type=int, default=50, help="Число категорий")
+    parser.add_argument('--skew', type=float, default=1.1, help="Показатель Ципфа для популярности категорий")
+    parser.add_argument('--start', default='2023-01-01', help="Первая дата")
+    parser.add_argument('--days', type=int, default=365, help="Число дней")
+    parser.add_argument('--chunk-rows', type=int, default=500_000, help="Строк в одном блоке записи")
+    parser.add_argument('--seed', type=int, default=42, help="Зерно генератора")
+    args = parser.parse_args(argv)
+
+    n_rows = args.rows_per_day * args.days if args.rows_per_day else args.rows
+    try:
+        written = write_sales_file(
+            args.output, n_rows, chunk_rows=args.chunk_rows, n_categories=args.categories,
+            skew=args.skew, start_date=args.start, n_days=args.days, seed=args.seed,
+        )
+    except (ValueError, ImportError) as e:
+        print(str(e), file=sys.stderr)
+        return 1
+
+    print(f"Записано строк: {written:,} -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
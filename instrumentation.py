@@ -0,0 +1,203 @@
+import functools
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional
+
+
+# tracemalloc is process-wide: recordings tracing memory share it through a reference
+# count, and the peak is only reset while a single recording is tracing
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_started = False
+
+
+def _acquire_tracing() -> None:
+    """Registers a tracing recording, starting tracemalloc for the first one."""
+    global _tracing_users, _tracing_started
+    with _tracing_lock:
+        if _tracing_users == 0:
+            _tracing_started = not tracemalloc.is_tracing()
+            if _tracing_started:
+                tracemalloc.start()
+        _tracing_users += 1
+
+
+def _release_tracing() -> None:
+    """Unregisters a tracing recording, stopping tracemalloc after the last one if it was started here."""
+    global _tracing_users, _tracing_started
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _tracing_started:
+            tracemalloc.stop()
+            _tracing_started = False
+
+
+def _reset_peak_if_exclusive() -> bool:
+    """Resets the traced peak if only one recording is tracing; returns whether it did."""
+    with _tracing_lock:
+        if _tracing_users != 1 or not hasattr(tracemalloc, 'reset_peak'):  # reset_peak is Python 3.9+
+            return False
+        tracemalloc.reset_peak()
+        return True
+
+
+class StageRecord(NamedTuple):
+    """
+    Timing (and optionally peak memory) of one stage execution.
+
+    peak_bytes is the peak of all memory traced in the process during the stage,
+    other threads included, above the traced memory at its start. It is None
+    when memory is not traced, or when another recording was tracing at the
+    start of the stage and the peak could not be reset.
+    """
+    name: str
+    depth: int
+    start: float
+    seconds: float
+    peak_bytes: Optional[int]
+
+
+class Recorder:
+    """
+    Collects the stage records of one rerun.
+
+    Stages nest: a stage opened inside another is recorded with a greater depth
+    and its time is included in the enclosing stage.
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.started_at = datetime.now()
+        self.origin = time.perf_counter()
+        self.total_seconds = 0.0
+        self.records: List[StageRecord] = []
+        self.metadata: Dict[str, Any] = {}
+        self._depth = 0
+        # [current traced bytes at stage start, highest traced bytes seen, peak was reset] per open stage
+        self._memory_stack: List[List[Any]] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Times the enclosed block as a stage."""
+        depth = self._depth
+        self._depth += 1
+        if self.trace_memory:
+            self._enter_memory()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            peak = self._exit_memory() if self.trace_memory else None
+            self._depth -= 1
+            self.records.append(StageRecord(name, depth, started - self.origin, seconds, peak))
+
+    def _enter_memory(self) -> None:
+        current, peak = tracemalloc.get_traced_memory()
+        if self._memory_stack:
+            self._memory_stack[-1][1] = max(self._memory_stack[-1][1], peak)
+        # Without a reset the peak may predate the stage, so it is not attributed to it
+        reset = _reset_peak_if_exclusive()
+        self._memory_stack.append([current, current, reset])
+
+    def _exit_memory(self) -> Optional[int]:
+        _, peak = tracemalloc.get_traced_memory()
+        start, highest, reset = self._memory_stack.pop()
+        highest = max(highest, peak)
+        if self._memory_stack:
+            self._memory_stack[-1][1] = max(self._memory_stack[-1][1], highest)
+        return highest - start if reset else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the records in start order as a JSON-serializable dictionary."""
+        return {
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'total_seconds': self.total_seconds,
+            'trace_memory': self.trace_memory,
+            'metadata': self.metadata,
+            'stages': [record._asdict() for record in sorted(self.records, key=lambda record: record.start)],
+        }
+
+    def to_json(self) -> str:
+        """Returns the records as a JSON document."""
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2, default=str)
+
+
+_recorder: "ContextVar[Optional[Recorder]]" = ContextVar('instrumentation_recorder', default=None)
+_NULL_STAGE = nullcontext()
+
+
+def current_recorder() -> Optional[Recorder]:
+    """Returns the recorder of the current rerun, or None when instrumentation is off."""
+    return _recorder.get()
+
+
+def stage(name: str):
+    """
+    Context manager timing a block as a named stage of the current rerun.
+
+    Costs a single context variable lookup when no recording is active.
+
+    Args:
+        name: Stage name, e.g. 'data_loader.read_csv'
+    """
+    recorder = _recorder.get()
+    if recorder is None:
+        return _NULL_STAGE
+    return recorder.stage(name)
+
+
+def instrumented(name: Optional[str] = None) -> Callable:
+    """
+    Decorator recording every call of a function as a stage.
+
+    Args:
+        name: Stage name, defaults to 'module.function'
+    """
+    def decorator(func: Callable) -> Callable:
+        stage_name = name or f"{func.__module__}.{func.__name__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            recorder = _recorder.get()
+            if recorder is None:
+                return func(*args, **kwargs)
+            with recorder.stage(stage_name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def recording(trace_memory: bool = False) -> Iterator[Recorder]:
+    """
+    Records the stages run inside the block (in the current thread or task).
+
+    Memory tracing is shared by concurrent recordings: tracemalloc runs while
+    any of them traces memory, and stage peaks are only recorded while a
+    single one does (see StageRecord).
+
+    Args:
+        trace_memory: Whether to measure peak traced memory per stage (slower)
+
+    Yields:
+        Recorder receiving the stage records
+    """
+    recorder = Recorder(trace_memory)
+    if trace_memory:
+        _acquire_tracing()
+    token = _recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorder.reset(token)
+        recorder.total_seconds = time.perf_counter() - recorder.origin
+        if trace_memory:
+            _release_tracing()
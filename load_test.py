@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Concurrent-session load test of the dashboard.
+
+    python -m load_test --sessions 1 2 4 8 16 --rows 200000 --actions 12
+    python -m load_test --sessions 4 --distinct-files --output load.json
+
+Every simulated session is a headless streamlit AppTest of pages/home.py run in
+its own thread, so all sessions share one process like on the server: each
+uploads a generated sales file, then narrows categories, moves the dates and
+switches chart types. For every session count the harness reports rerun
+latency percentiles, throughput (reruns per second) and process RSS; the
+session count where throughput stops growing is where the app saturates.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import numpy as np
+from contextlib import contextmanager
+from datetime import timedelta
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+from generate_sales_data import write_sales_file
+
+
+HOME_PAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pages', 'home.py')
+DEFAULT_SESSION_COUNTS = (1, 2, 4, 8)
+ACTIONS = ('chart', 'categories', 'dates')
+CHART_SELECT_LABEL = "Выберите тип графика"
+
+# Streamlit releases whose AppTest internals shared_app_test_state patches were checked against
+TESTED_STREAMLIT_VERSIONS = ('1.66',)
+
+logger = logging.getLogger(__name__)
+
+
+def process_rss() -> Optional[int]:
+    """Returns the resident set size of this process in bytes, None if unavailable."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def peak_rss() -> Optional[int]:
+    """Returns the peak resident set size of this process in bytes, None if unavailable."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def check_streamlit_internals() -> None:
+    """
+    Verifies that the private Streamlit internals patched by shared_app_test_state exist.
+
+    Other versions than TESTED_STREAMLIT_VERSIONS only log a warning as long as
+    the patched attributes are still there.
+
+    Raises:
+        RuntimeError: If the installed Streamlit lacks one of them
+    """
+    import streamlit
+
+    version = streamlit.__version__
+    try:
+        from streamlit.runtime import Runtime
+        from streamlit.runtime.scriptrunner import script_cache
+        from streamlit.testing.v1 import local_script_runner
+    except ImportError as e:
+        raise RuntimeError(f"Streamlit {version} не поддерживается нагрузочным тестом: {e}") from e
+
+    missing = [name for name, present in (
+        ('Runtime.instance', isinstance(Runtime.__dict__.get('instance'), classmethod)),
+        ('Runtime.exists', isinstance(Runtime.__dict__.get('exists'), classmethod)),
+        ('Runtime._instance', hasattr(Runtime, '_instance')),
+        ('local_script_runner.ScriptCache', hasattr(local_script_runner, 'ScriptCache')),
+        ('script_cache.ScriptCache', hasattr(script_cache, 'ScriptCache')),
+    ) if not present]
+    if missing:
+        raise RuntimeError(
+            f"Streamlit {version} не поддерживается нагрузочным тестом (проверен с "
+            f"{', '.join(TESTED_STREAMLIT_VERSIONS)}): нет {', '.join(missing)}"
+        )
+    if not version.startswith(tuple(v + '.' for v in TESTED_STREAMLIT_VERSIONS)):
+        logger.warning("Load test harness was checked against Streamlit %s, running with %s",
+                       ', '.join(TESTED_STREAMLIT_VERSIONS), version)
+
+
+@contextmanager
+def shared_app_test_state() -> Iterator[None]:
+    """
+    Lets concurrent AppTest sessions share a process the way server sessions do.
+
+    AppTest assumes one test at a time: every run compiles the page with a fresh
+    script cache (concurrent compiles trip a thread-safety bug of ast.parse in
+    Python 3.11) and installs a mock runtime singleton that it removes when the
+    run ends, under the feet of the other sessions. Inside this block the page is
+    compiled once through a shared cache and the last installed runtime stays
+    available, like the single runtime of a server.
+
+    These are private Streamlit internals, checked by check_streamlit_internals
+    before anything is patched.
+    """
+    check_streamlit_internals()
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import local_script_runner
+
+    original_cache = local_script_runner.ScriptCache
+    original_instance = Runtime.__dict__['instance']
+    original_exists = Runtime.__dict__['exists']
+    cache = ScriptCache()
+    last_runtime = []
+
+    def instance(cls):
+        if cls._instance is not None:
+            last_runtime[:] = [cls._instance]
+        elif last_runtime:
+            return last_runtime[0]
+        return original_instance.__func__(cls)
+
+    def exists(cls):
+        return cls._instance is not None or bool(last_runtime)
+
+    local_script_runner.ScriptCache = lambda: cache
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(exists)
+    try:
+        yield
+    finally:
+        local_script_runner.ScriptCache = original_cache
+        Runtime.instance = original_instance
+        Runtime.exists = original_exists
+
+
+def _chart_select(at):
+    return next(widget for widget in at.sidebar.selectbox if widget.label == CHART_SELECT_LABEL)
+
+
+def perform_action(at, action: str, rng: np.random.Generator) -> None:
+    """
+    Changes one sidebar widget of a loaded dashboard (without rerunning it).
+
+    Args:
+        at: AppTest of pages/home.py with a dataset loaded
+        action: 'chart', 'categories' or 'dates'
+        rng: Random generator choosing the new value
+    """
+    if action == 'chart':
+        select = _chart_select(at)
+        select.set_value(select.options[rng.integers(len(select.options))])
+    elif action == 'categories':
+        multiselect = at.sidebar.multiselect[0]
+        options = multiselect.options
+        # Every other change goes back to all categories, like a user exploring
+        if len(multiselect.value) < len(options):
+            multiselect.set_value(options)
+        else:
+            size = int(rng.integers(1, max(2, len(options) // 2)))
+            multiselect.set_value([options[i] for i in sorted(rng.choice(len(options), size, replace=False))])
+    elif action == 'dates':
+        start_input, end_input = at.sidebar.date_input[0], at.sidebar.date_input[1]
+        low, high = start_input.min, end_input.max
+        days = (high - low).days
+        start = low + timedelta(days=int(rng.integers(0, max(1, days // 2))))
+        end_input.set_value(high - timedelta(days=int(rng.integers(0, max(1, days // 4)))))
+        start_input.set_value(start)
+    else:
+        raise ValueError(f"Неизвестное действие: {action}")
+
+
+def run_session(data: bytes, file_name: str, n_actions: int, seed: int,
+                app_path: str = HOME_PAGE, timeout: float = 120.0) -> Dict:
+    """
+    Drives one dashboard session: upload, then n_actions widget changes.
+
+    Args:
+        data: Content of the uploaded file
+        file_name: Name of the uploaded file
+        n_actions: Number of widget changes after the upload
+        seed: Seed of the session's choices
+        app_path: Streamlit script to run
+        timeout: Maximum seconds per rerun
+
+    Returns:
+        Dictionary with the rerun latencies per action ('initial', 'upload',
+        'chart', 'categories', 'dates') and the error messages
+    """
+    from streamlit.testing.v1 import AppTest
+
+    rng = np.random.default_rng(seed)
+    latencies: Dict[str, List[float]] = {}
+    errors: List[str] = []
+
+    def timed(action: str, run: Callable[[], object]) -> None:
+        started = time.perf_counter()
+        run()
+        latencies.setdefault(action, []).append(time.perf_counter() - started)
+        errors.extend(str(exception.value) for exception in at.exception)
+
+    try:
+        at = AppTest.from_file(app_path, default_timeout=timeout)
+        timed('initial', at.run)
+        file_type = 'text/csv' if file_name.endswith('.csv') else 'application/octet-stream'
+        timed('upload', lambda: at.sidebar.file_uploader[0].upload(file_name, data, file_type).run())
+        for number in range(n_actions):
+            action = ACTIONS[(number + seed) % len(ACTIONS)]
+            perform_action(at, action, rng)
+            timed(action, at.run)
+    except Exception as e:  # Timeouts and missing widgets end the session
+        errors.append(repr(e))
+
+    return {'latencies': latencies, 'errors': errors}
+
+
+def summarize_latencies(latencies: Sequence[float]) -> Dict[str, float]:
+    """Returns the count, mean, p50, p90, p99 and max of latencies in seconds."""
+    if not len(latencies):
+        return {'count': 0}
+    values = np.asarray(latencies)
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {'count': int(len(values)), 'mean': float(values.mean()), 'p50': float(p50),
+            'p90': float(p90), 'p99': float(p99), 'max': float(values.max())}
+
+
+def run_level(n_sessions: int, files: Sequence[str], n_actions: int, seed: int = 0,
+              app_path: str = HOME_PAGE, timeout: float = 120.0) -> Dict:
+    """
+    Runs n_sessions sessions concurrently, each in its own thread.
+
+    Args:
+        n_sessions: Number of concurrent sessions
+        files: Files uploaded by the sessions, assigned round-robin
+        n_actions: Widget changes per session
+        seed: Base seed, session i uses seed + i
+        app_path: Streamlit script to run
+        timeout: Maximum seconds per rerun
+
+    Returns:
+        Report of the level: latency summaries, throughput, RSS and errors
+    """
+    contents = {path: Path(path).read_bytes() for path in set(files)}
+    results: List[Optional[Dict]] = [None] * n_sessions
+    # Sessions start together so they really compete
+    barrier = threading.Barrier(n_sessions)
+
+    def session(index: int) -> None:
+        path = files[index % len(files)]
+        barrier.wait()
+        results[index] = run_session(contents[path], os.path.basename(path), n_actions, seed + index,
+                                     app_path, timeout)
+
+    threads = [threading.Thread(target=session, args=(index,), name=f'load-session-{index}')
+               for index in range(n_sessions)]
+    rss_before = process_rss()
+    with shared_app_test_state():
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        wall_seconds = time.perf_counter() - started
+
+    by_action: Dict[str, List[float]] = {}
+    errors: List[str] = []
+    for result in results:
+        for action, values in result['latencies'].items():
+            by_action.setdefault(action, []).extend(values)
+        errors.extend(result['errors'])
+    reruns = [value for action, values in by_action.items() if action != 'initial' for value in values]
+
+    return {
+        'sessions': n_sessions,
+        'reruns': len(reruns),
+        'wall_seconds': wall_seconds,
+        'throughput': len(reruns) / wall_seconds if wall_seconds else 0.0,
+        'latency': summarize_latencies(reruns),
+        'actions': {action: summarize_latencies(values) for action, values in by_action.items()},
+        'rss_before': rss_before,
+        'rss_after': process_rss(),
+        'peak_rss': peak_rss(),
+        'errors': errors,
+    }
+
+
+def run_load_test(session_counts: Sequence[int] = DEFAULT_SESSION_COUNTS, n_rows: int = 100_000,
+                  n_actions: int = 9, distinct_files: bool = False, seed: int = 0,
+                  app_path: str = HOME_PAGE, timeout: float = 120.0,
+                  progress: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+    """
+    Runs the load test at growing session counts.
+
+    The process-wide dataset store is cleared before every level, so each level
+    pays for its own uploads.
+
+    Args:
+        session_counts: Concurrent session counts to test
+        n_rows: Rows of the generated file(s)
+        n_actions: Widget changes per session
+        distinct_files: Give every session its own file instead of one shared file
+        seed: Seed of the data and of the sessions' choices
+        app_path: Streamlit script to run
+        timeout: Maximum seconds per rerun
+        progress: Called with the report of each level as it finishes
+
+    Returns:
+        Level reports in session count order
+    """
+    from dataset_store import get_dataset_store
+
+    reports = []
+    with tempfile.TemporaryDirectory() as directory:
+        n_files = max(session_counts) if distinct_files else 1
+        files = []
+        for number in range(n_files):
+            path = os.path.join(directory, f'sales_{number}.csv')
+            write_sales_file(path, n_rows, seed=seed + number)
+            files.append(path)
+
+        for n_sessions in session_counts:
+            get_dataset_store().clear()
+            report = run_level(n_sessions, files, n_actions, seed, app_path, timeout)
+            report['rows'] = n_rows
+            report['distinct_files'] = distinct_files
+            reports.append(report)
+            if progress is not None:
+                progress(report)
+
+    return reports
+
+
+def format_report(report: Dict) -> str:
+    """Formats a level report as one table row."""
+    latency = report['latency']
+    upload = report['actions'].get('upload', {})
+    rss = report['rss_after']
+    return (
+        f"{report['sessions']:>7} {report['reruns']:>8} {report['throughput']:>10.2f}"
+        f" {latency.get('p50', 0) * 1000:>9.0f} {latency.get('p90', 0) * 1000:>9.0f}"
+        f" {latency.get('p99', 0) * 1000:>9.0f} {upload.get('p50', 0) * 1000:>10.0f}"
+        f" {rss / 2 ** 20 if rss else float('nan'):>9.0f} {len(report['errors']):>7}"
+    )
+
+
+REPORT_HEADER = (
+    f"{'сессий':>7} {'запусков':>8} {'запуск/с':>10} {'p50, мс':>9} {'p90, мс':>9}"
+    f" {'p99, мс':>9} {'загр., мс':>10} {'RSS, МБ':>9} {'ошибок':>7}"
+)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Нагрузочный тест дашборда с параллельными сессиями")
+    parser.add_argument('--sessions', type=int, nargs='+', default=list(DEFAULT_SESSION_COUNTS),
+                        help="Числа одновременных сессий")
+    parser.add_argument('--rows', type=int, default=100_000, help="Число строк в загружаемом файле")
+    parser.add_argument('--actions', type=int, default=9, help="Число действий в каждой сессии")
+    parser.add_argument('--distinct-files', action='store_true', help="Отдельный файл для каждой сессии")
+    parser.add_argument('--seed', type=int, default=0, help="Начальное значение генератора")
+    parser.add_argument('--timeout', type=float, default=120.0, help="Максимальное время одного запуска, с")
+    parser.add_argument('--output', default=None, help="Сохранить отчет в JSON")
+    parser.add_argument('--verbose', action='store_true', help="Показывать журнал приложения")
+    args = parser.parse_args(argv)
+
+    if args.verbose:
+        # Off by default: every rerun logs its stage timings, which would bury the table
+        logging.basicConfig(level=logging.INFO)
+    try:
+        check_streamlit_internals()
+    except RuntimeError as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        return 1
+    print(REPORT_HEADER)
+    reports = run_load_test(args.sessions, args.rows, args.actions, args.distinct_files, args.seed,
+                            timeout=args.timeout,
+                            progress=lambda report: print(format_report(report), flush=True))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(reports, f, ensure_ascii=False, indent=2)
+    errors = [error for report in reports for error in report['errors']]
+    for error in sorted(set(errors)):
+        print(f"Ошибка: {error}", file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
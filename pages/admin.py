@@ -0,0 +1,58 @@
+import streamlit as st
+import pandas as pd
+from datetime import datetime
+from dataset_store import ADMIN_ENV_VAR, admin_controls_enabled, get_dataset_store
+
+
+def main():
+    st.title("Администрирование: хранилище данных")
+
+    store = get_dataset_store()
+    usage = store.usage()
+    used_mb = store.used_bytes() / 2 ** 20
+    budget_mb = store.budget_bytes / 2 ** 20
+
+    # Overall memory usage of the shared store
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Наборов данных", len(usage))
+    with col2:
+        st.metric("Память", f"{used_mb:,.1f} МБ из {budget_mb:,.0f} МБ")
+    with col3:
+        st.metric("Вытеснено", store.evictions)
+    st.progress(min(used_mb / budget_mb, 1.0) if budget_mb > 0 else 0.0)
+
+    if not usage:
+        st.info("Хранилище пусто.")
+    else:
+        table = pd.DataFrame([
+            {
+                'Набор': item['key'][:12],
+                'Файл': item['name'],
+                'Строк': item['rows'],
+                'МБ': item['bytes'] / 2 ** 20,
+                'Сессий': item['sessions'],
+                'Повторных обращений': item['hits'],
+                'Загружен': datetime.fromtimestamp(item['loaded_at']).strftime('%H:%M:%S'),
+                'Последнее обращение': datetime.fromtimestamp(item['last_access']).strftime('%H:%M:%S'),
+            }
+            for item in usage
+        ])
+        st.dataframe(table, hide_index=True, column_config={'МБ': st.column_config.NumberColumn(format="%.1f")})
+
+    # Budget and manual cleanup act on the store shared by every session, so they are opt-in
+    if not admin_controls_enabled():
+        st.caption(f"Просмотр только для чтения. Чтобы менять бюджет и очищать хранилище, "
+                   f"запустите приложение с {ADMIN_ENV_VAR}=1.")
+        return
+    new_budget = st.number_input("Бюджет памяти, МБ", min_value=16, value=int(budget_mb), step=64)
+    if st.button("Применить бюджет") and new_budget != int(budget_mb):
+        store.set_budget(int(new_budget * 2 ** 20))
+        st.rerun()
+    if st.button("Очистить хранилище"):
+        store.clear()
+        st.rerun()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,119 @@
 import streamlit as st
 import pandas as pd
+import os
+import time
 from datetime import datetime
 from data_loader import load_data_from_path, load_uploaded_data
-from analysis import calculate_sales_kpis, get_filtered_data
-from plotting import (create_revenue_trend_plot, create_quantity_trend_plot,
-                     create_forecast_plot, create_category_filter_plot, create_correlation_heatmap)
+from plotting import count_facet_pages, create_daily_totals_plot
+from pipeline import (CHART_TYPES, CHART_FORECAST, CHART_CATEGORIES, CHART_DISTRIBUTION,
+                      filter_key, options_key, filter_data, index_dataset, compute_aggregate_kpis, build_chart)
+from table_view import PAGE_SIZES, count_table_pages, table_sort_order, get_table_page
+from table_export import EXCEL_MAX_ROWS, EXPORT_FORMATS, export_table
+from stage_cache import get_stage_cache
+from prewarm import ensure_prewarm
+from instrumentation import recording, stage
+from dataset_store import get_dataset_store, content_hash, file_content_hash
+from progressive_loader import (PROGRESSIVE_MIN_BYTES, DEFAULT_CHUNK_ROWS, POLL_SECONDS, CHART_REFRESH_CHUNKS,
+                                ensure_progressive_load, cancel_progressive_load, progressive_load_pending)
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 
 
-def main():
+DEMO_DATA_PATH = 'synthetic_traffic.csv'
+
+DIAGNOSTICS_KEY = 'diagnostics_enabled'
+TRACE_MEMORY_KEY = 'diagnostics_trace_memory'
+
+# Rows of the first chunk shown while a large upload is being read
+PREVIEW_ROWS = 100
+
+
+def _session_id():
+    """Returns the id of the current browser session, if running under Streamlit."""
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else None
+
+
+def _load_indexed(loader, source):
+    """Loads a dataset and builds its category/date row index and its KPI aggregate once."""
+    df = loader(source)
+    if df is not None:
+        index_dataset(df)
+    return df
+
+
+def _load_progressively(store, dataset_key, uploaded_file, session_id, cache):
+    """
+    Returns the dataset of a large upload, parsing it in the background on first use.
+
+    While the file is being read, the provisional results are shown instead.
+
+    Returns:
+        Tuple of (frame, loading): the final frame (None until it is ready or after
+        an error) and whether the load is still running
+    """
+    df = store.get(dataset_key, session_id=session_id)
+    if df is not None:
+        return df, False
+
+    job = ensure_progressive_load(st.session_state, dataset_key, uploaded_file, DEFAULT_CHUNK_ROWS)
+    if job.error is not None:
+        st.error(f"Ошибка при загрузке файла: {job.error}")
+        return None, False
+    if not job.done():
+        render_load_preview(job, cache, dataset_key)
+        return None, True
+
+    result = job.take_result()
+    df = store.get_or_load(dataset_key, lambda: _load_indexed(lambda frame: frame, result),
+                           name=uploaded_file.name, session_id=session_id)
+    return df, False
+
+
+def render_load_preview(job, cache, dataset_key):
+    """
+    Shows the progress of a background load with provisional KPIs, a daily chart and the first rows.
+
+    Everything shown is read from the load's running aggregate and its first
+    chunk, so a poll costs the same however many rows have been read. The
+    chart is only redrawn every CHART_REFRESH_CHUNKS chunks.
+    """
+    progress = job.progress()
+    text = f"Загрузка {job.name}: прочитано {progress.rows:,} строк. Показаны предварительные результаты."
+    if job.fraction is not None:
+        st.progress(job.fraction, text=text)
+    else:
+        st.info(text)
+
+    if progress.preview is None:
+        st.info("Чтение первого блока данных...")
+        return
+
+    if progress.aggregate is not None:
+        with stage('page.kpis'):
+            total_revenue, avg_daily_revenue, total_quantity, _ = progress.aggregate.kpis()
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Общая выручка", f"{total_revenue:,.0f} руб.")
+        col2.metric("Средняя выручка в день", f"{avg_daily_revenue:,.0f} руб.")
+        col3.metric("Общее количество проданных единиц", f"{total_quantity:,}")
+
+        with stage('page.figure'):
+            fig = cache.get_or_compute(
+                'figure', (dataset_key, 'partial', (progress.version - 1) // CHART_REFRESH_CHUNKS),
+                lambda: create_daily_totals_plot(progress.aggregate.daily(),
+                                                 title="Динамика по прочитанным строкам")
+            )
+        with stage('page.chart_render'):
+            st.plotly_chart(fig, width='stretch')
+
+    st.subheader("Первые строки файла")
+    st.dataframe(progress.preview.head(PREVIEW_ROWS), hide_index=True)
+
+
+def render_dashboard():
+    # Every stage below is memoized on its inputs, so a rerun only recomputes what changed
+    cache = get_stage_cache(st.session_state)
+    rerun_started = cache.start_rerun()
+
     # Application title
     st.title("Анализатор Продаж")
 
@@ -15,22 +121,50 @@ def main():
     st.sidebar.header("Загрузка данных")
     uploaded_file = st.sidebar.file_uploader(
         "Загрузите CSV или Excel файл", 
-        type=['csv', 'xlsx', 'xls'],
-        help="Файл должен содержать колонки 'date', 'category', 'price', 'quantity'"
+        type=['csv', 'xlsx', 'xls', 'gz', 'zst', 'zip'],
+        help="Файл должен содержать колонки 'date', 'category', 'price', 'quantity'. "
+             "CSV можно загрузить сжатым (.csv.gz, .csv.zst или .zip)"
     )
 
+    # Datasets live in the process-wide store, deduplicated by content across sessions
+    store = get_dataset_store()
+    session_id = _session_id()
+    # Whether a large upload is still being parsed in the background
+    loading = False
+
     # Load data based on whether a file was uploaded
     if uploaded_file is not None:
-        df = load_uploaded_data(uploaded_file)
-        st.sidebar.success("Файл успешно загружен!")
+        # Hash the upload once per file; the store then returns the shared frame
+        dataset_key = cache.get_or_compute(
+            'dataset_key', uploaded_file.file_id, lambda: content_hash(uploaded_file.getvalue())
+        )
+        with stage('page.load'):
+            if uploaded_file.size < PROGRESSIVE_MIN_BYTES:
+                df = store.get_or_load(dataset_key, lambda: _load_indexed(load_uploaded_data, uploaded_file),
+                                       name=uploaded_file.name, session_id=session_id)
+            else:
+                df, loading = _load_progressively(store, dataset_key, uploaded_file, session_id, cache)
+        if df is not None:
+            st.sidebar.success("Файл успешно загружен!")
     else:
+        cancel_progressive_load(st.session_state)
         # Load demo data if no file is uploaded
-        df = load_data_from_path()
+        if os.path.exists(DEMO_DATA_PATH):
+            dataset_key = file_content_hash(DEMO_DATA_PATH)
+            with stage('page.load'):
+                df = store.get_or_load(dataset_key, lambda: _load_indexed(load_data_from_path, DEMO_DATA_PATH),
+                                       name=DEMO_DATA_PATH, session_id=session_id)
+        else:
+            dataset_key, df = None, None
         if df is not None:
             st.sidebar.info("Используются демонстрационные данные. Загрузите свой файл для анализа.")
         else:
             st.sidebar.warning("Демонстрационные данные недоступны. Пожалуйста, загрузите файл.")
 
+    if loading:
+        cache.log_rerun(rerun_started)
+        return
+
     if df is None or df.empty:
         st.info("Загрузите файл для анализа.")
         
@@ -91,8 +225,14 @@ def main():
     # Sidebar for filters
     st.sidebar.header("Параметры фильтрации")
 
+    # Category list and date bounds only change with the dataset
+    with stage('page.bounds'):
+        all_categories, min_date, max_date = cache.get_or_compute(
+            'bounds', dataset_key,
+            lambda: (df['category'].unique().tolist(), df['date'].min().date(), df['date'].max().date())
+        )
+
     # Category filter
-    all_categories = df['category'].unique().tolist()
     selected_categories = st.sidebar.multiselect(
         "Выберите категории",
         options=all_categories,
@@ -100,9 +240,6 @@ def main():
     )
 
     # Date range selection
-    min_date = df['date'].min().date()
-    max_date = df['date'].max().date()
-
     start_date = st.sidebar.date_input(
         "Начальная дата",
         value=min_date,
@@ -120,69 +257,214 @@ def main():
     # Validate date range
     if start_date > end_date:
         st.error("Ошибка: Конечная дата должна быть больше начальной даты.")
+        cache.log_rerun(rerun_started)
         return
 
     # Filter data based on selected dates and categories
-    filtered_df = get_filtered_data(df, start_date, end_date)
-    
-    if selected_categories:
-        filtered_df = filtered_df[filtered_df['category'].isin(selected_categories)]
+    current_filter = filter_key(dataset_key, start_date, end_date, selected_categories)
+
+    # Pre-warm KPIs and every chart for the default filters right after a load;
+    # the job is cancelled as soon as the filters move away from the defaults
+    default_filter = filter_key(dataset_key, min_date, max_date, all_categories)
+    ensure_prewarm(st.session_state, cache, dataset_key, df, default_filter, current_filter,
+                   min_date, max_date, all_categories)
+    with stage('page.filter'):
+        filtered_df = cache.get_or_compute(
+            'filter', current_filter,
+            lambda: filter_data(df, start_date, end_date, selected_categories)
+        )
 
     if filtered_df.empty:
         st.warning("Нет данных для выбранного диапазона дат и категорий.")
+        cache.log_rerun(rerun_started)
         return
 
-    # Calculate KPIs
-    total_revenue, avg_daily_revenue, total_quantity, avg_daily_quantity = calculate_sales_kpis(filtered_df)
+    # KPIs are exact sums over the date x category aggregate built at load time
+    with stage('page.kpis'):
+        total_revenue, avg_daily_revenue, total_quantity, avg_daily_quantity = cache.get_or_compute(
+            'kpis', current_filter,
+            lambda: compute_aggregate_kpis(df, start_date, end_date, selected_categories)
+        )
 
     # Display KPI metrics
     col1, col2, col3 = st.columns(3)
-    
+
     col1.metric("Общая выручка", f"{total_revenue:,.0f} руб.")
     col2.metric("Средняя выручка в день", f"{avg_daily_revenue:,.0f} руб.")
     col3.metric("Общее количество проданных единиц", f"{total_quantity:,}")
 
     # Visualization options
     st.sidebar.header("Настройки визуализации")
-    chart_type = st.sidebar.selectbox(
-        "Выберите тип графика",
-        [
-            "Динамика выручки по дням",
-            "Динамика количества продаж по дням",
-            "Прогноз выручки и количества",
-            "Анализ по категориям",
-            "Корреляционная матрица показателей"
-        ]
+    chart_type = st.sidebar.selectbox("Выберите тип графика", CHART_TYPES)
+
+    # Collect the options of the selected chart
+    chart_options = {}
+    if chart_type == CHART_FORECAST:
+        forecast_models = {
+            "Линейный тренд": "linear",
+            "Сезонный наивный (неделя)": "seasonal_naive",
+            "Хольт-Винтерс": "holt_winters"
+        }
+        forecast_model = st.sidebar.selectbox("Модель прогноза", list(forecast_models.keys()))
+        chart_options['model'] = forecast_models[forecast_model]
+    elif chart_type == CHART_CATEGORIES and len(selected_categories) != 1:
+        # Small multiples for all selected categories, paginated for large selections
+        facet_categories = selected_categories or all_categories
+        facets_per_page = st.sidebar.number_input(
+            "Категорий на странице", min_value=1, max_value=60, value=12, step=1
+        )
+        n_pages = count_facet_pages(len(facet_categories), facets_per_page)
+        page = 1
+        if n_pages > 1:
+            page = st.sidebar.number_input("Страница", min_value=1, max_value=n_pages, value=1, step=1)
+        facet_metric = st.sidebar.radio("Показатель", ["Выручка", "Количество"], horizontal=True)
+        chart_options.update(
+            metric='revenue' if facet_metric == "Выручка" else 'quantity',
+            page=int(page) - 1,
+            facets_per_page=int(facets_per_page)
+        )
+    elif chart_type == CHART_DISTRIBUTION:
+        distribution_metric = st.sidebar.radio("Показатель", ["Цена", "Выручка"], horizontal=True)
+        chart_options.update(
+            column='price' if distribution_metric == "Цена" else 'revenue',
+            bins=st.sidebar.slider("Количество интервалов", min_value=10, max_value=200, value=50, step=10),
+            log=st.sidebar.checkbox("Логарифмическая шкала", value=False)
+        )
+
+    # Create the selected chart
+    with stage('page.figure'):
+        fig = cache.get_or_compute(
+            'figure', (current_filter, chart_type, options_key(chart_options)),
+            lambda: build_chart(chart_type, filtered_df, selected_categories, chart_options)
+        )
+
+    with stage('page.chart_render'):
+        st.plotly_chart(fig, use_container_width=True)
+
+    # Display data table: sorting happens server-side and only the visible page is built
+    st.subheader("Данные за выбранный период")
+    sort_labels = {
+        "Дата": 'date',
+        "Категория": 'category',
+        "Цена": 'price',
+        "Количество": 'quantity',
+        "Выручка": 'revenue'
+    }
+    table_col1, table_col2, table_col3, table_col4 = st.columns(4)
+    sort_label = table_col1.selectbox("Сортировать по", list(sort_labels.keys()))
+    ascending = table_col2.selectbox("Порядок", ["По возрастанию", "По убыванию"]) == "По возрастанию"
+    page_size = table_col3.selectbox("Строк на странице", PAGE_SIZES, index=1)
+    n_table_pages = count_table_pages(len(filtered_df), page_size)
+    table_page = table_col4.number_input(
+        f"Страница (из {n_table_pages})", min_value=1, max_value=n_table_pages, value=1, step=1
     )
 
-    # Create and display the selected chart
-    if chart_type == "Динамика выручки по дням":
-        fig = create_revenue_trend_plot(filtered_df, selected_categories)
-    elif chart_type == "Динамика количества продаж по дням":
-        fig = create_quantity_trend_plot(filtered_df, selected_categories)
-    elif chart_type == "Прогноз выручки и количества":
-        fig = create_forecast_plot(filtered_df, selected_categories)
-    elif chart_type == "Анализ по категориям":
-        if len(selected_categories) == 1:
-            fig = create_category_filter_plot(filtered_df, selected_categories[0])
+    sort_by = sort_labels[sort_label]
+    with stage('page.table'):
+        order = cache.get_or_compute(
+            'table_order', (current_filter, sort_by, ascending),
+            lambda: table_sort_order(filtered_df, sort_by if sort_by != 'date' else None, ascending)
+        )
+        page_df = get_table_page(filtered_df, order, int(table_page) - 1, page_size)
+        st.dataframe(
+            page_df,
+            hide_index=True,
+            column_config={
+                'date': st.column_config.DateColumn("date", format="YYYY-MM-DD"),
+                'price': st.column_config.NumberColumn("price", format="%.0f руб."),
+                'quantity': st.column_config.NumberColumn("quantity", format="%d"),
+                'revenue': st.column_config.NumberColumn("revenue", format="%.0f руб.")
+            }
+        )
+    st.caption(f"Показаны строки {(int(table_page) - 1) * page_size + 1}–"
+               f"{min(int(table_page) * page_size, len(filtered_df))} из {len(filtered_df):,}")
+
+    # Files are generated only on click, chunk by chunk, in the table's sort order
+    export_name = f"sales_{start_date}_{end_date}"
+    export_col1, export_col2 = st.columns(2)
+    export_col1.download_button(
+        "Скачать CSV",
+        data=lambda: export_table(filtered_df, 'csv', order),
+        file_name=export_name + EXPORT_FORMATS['csv'][1],
+        mime=EXPORT_FORMATS['csv'][0],
+        on_click='ignore'
+    )
+    too_large_for_excel = len(filtered_df) > EXCEL_MAX_ROWS
+    export_col2.download_button(
+        "Скачать Excel",
+        data=lambda: export_table(filtered_df, 'xlsx', order),
+        file_name=export_name + EXPORT_FORMATS['xlsx'][1],
+        mime=EXPORT_FORMATS['xlsx'][0],
+        on_click='ignore',
+        disabled=too_large_for_excel,
+        help=f"Лист Excel вмещает не более {EXCEL_MAX_ROWS:,} строк; используйте CSV" if too_large_for_excel else None
+    )
+
+    cache.log_rerun(rerun_started)
+
+
+def render_diagnostics(recorder):
+    """Shows the diagnostics switches and, when enabled, the stage timings of this rerun."""
+    st.sidebar.header("Диагностика")
+    st.sidebar.checkbox("Показывать время этапов", key=DIAGNOSTICS_KEY)
+    st.sidebar.checkbox("Измерять пиковую память (медленнее)", key=TRACE_MEMORY_KEY,
+                        disabled=not st.session_state.get(DIAGNOSTICS_KEY, False))
+
+    if recorder is None:
+        return
+
+    recorder.metadata['cache_events'] = [
+        {'stage': stage_name, 'hit': hit, 'seconds': seconds}
+        for stage_name, hit, seconds in get_stage_cache(st.session_state).events
+    ]
+    report = recorder.to_dict()
+    with st.expander(f"Диагностика: {report['total_seconds'] * 1000:.0f} мс на перезапуск", expanded=False):
+        rows = [
+            {
+                'Этап': '\u00a0\u00a0' * item['depth'] + item['name'],
+                'Время, мс': item['seconds'] * 1000,
+                'Доля, %': 100 * item['seconds'] / report['total_seconds'] if report['total_seconds'] else 0.0,
+                'Пик памяти процесса, МБ': None if item['peak_bytes'] is None else item['peak_bytes'] / 2 ** 20,
+            }
+            for item in report['stages']
+        ]
+        if rows:
+            st.dataframe(
+                pd.DataFrame(rows),
+                hide_index=True,
+                column_config={
+                    'Время, мс': st.column_config.NumberColumn(format="%.1f"),
+                    'Доля, %': st.column_config.NumberColumn(format="%.0f"),
+                    'Пик памяти процесса, МБ': st.column_config.NumberColumn(format="%.1f"),
+                }
+            )
         else:
-            st.warning("Для анализа по отдельной категории, пожалуйста, выберите только одну категорию")
-            # Default to showing revenue trend
-            fig = create_revenue_trend_plot(filtered_df, selected_categories)
-    elif chart_type == "Корреляционная матрица показателей":
-        fig = create_correlation_heatmap(filtered_df)
+            st.write("Этапы не выполнялись.")
+        if report['trace_memory']:
+            st.caption("Пик памяти считается по всему процессу, включая другие сессии. "
+                       "Если память одновременно измеряет другая сессия, пик этапа не записывается.")
+        st.download_button(
+            "Скачать JSON",
+            data=recorder.to_json(),
+            file_name=f"diagnostics_{recorder.started_at:%Y%m%d_%H%M%S}.json",
+            mime="application/json"
+        )
 
-    st.plotly_chart(fig, use_container_width=True)
 
-    # Display data table
-    st.subheader("Данные за выбранный период")
-    display_df = filtered_df.copy()
-    display_df['revenue'] = display_df['price'] * display_df['quantity']
-    st.dataframe(display_df[['date', 'category', 'price', 'quantity', 'revenue']].style.format({
-        'price': '{:,.0f} руб.',
-        'quantity': '{:,.0f}',
-        'revenue': '{:,.0f} руб.'
-    }))
+def main():
+    # Stage timings are only collected while the diagnostics panel is switched on
+    if st.session_state.get(DIAGNOSTICS_KEY, False):
+        with recording(trace_memory=st.session_state.get(TRACE_MEMORY_KEY, False)) as recorder:
+            render_dashboard()
+    else:
+        recorder = None
+        render_dashboard()
+    render_diagnostics(recorder)
+
+    # Follow a background load: rerun until its final frame has been shown
+    if progressive_load_pending(st.session_state):
+        time.sleep(POLL_SECONDS)
+        st.rerun()
 
 
 if __name__ == "__main__":
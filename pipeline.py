@@ -0,0 +1,168 @@
+import pandas as pd
+from datetime import date
+from typing import Dict, Hashable, List, Optional, Tuple
+from aggregates import get_sales_aggregate
+from analysis import calculate_sales_kpis
+from binning import compute_histogram
+from row_index import get_row_index
+from plotting import (create_revenue_trend_plot, create_quantity_trend_plot,
+                      create_forecast_plot, create_category_filter_plot, create_correlation_heatmap,
+                      create_category_small_multiples, create_distribution_plot)
+
+
+CHART_REVENUE = "Динамика выручки по дням"
+CHART_QUANTITY = "Динамика количества продаж по дням"
+CHART_FORECAST = "Прогноз выручки и количества"
+CHART_CATEGORIES = "Анализ по категориям"
+CHART_CORRELATION = "Корреляционная матрица показателей"
+CHART_DISTRIBUTION = "Распределение цен и выручки"
+
+CHART_TYPES = [
+    CHART_REVENUE,
+    CHART_QUANTITY,
+    CHART_FORECAST,
+    CHART_CATEGORIES,
+    CHART_CORRELATION,
+    CHART_DISTRIBUTION,
+]
+
+# Default options of every chart type, as selected by the sidebar widgets
+DEFAULT_CHART_OPTIONS = {
+    CHART_FORECAST: {'model': 'linear'},
+    CHART_CATEGORIES: {'metric': 'revenue', 'page': 0, 'facets_per_page': 12},
+    CHART_DISTRIBUTION: {'column': 'price', 'bins': 50, 'log': False},
+}
+
+
+def filter_key(dataset_key: Hashable, start_date: date, end_date: date,
+               selected_categories: List[str]) -> Tuple:
+    """Returns the cache key identifying a filter state of a dataset."""
+    return (dataset_key, start_date, end_date, tuple(selected_categories))
+
+
+def options_key(options: Optional[Dict]) -> Tuple:
+    """Returns a hashable representation of chart options."""
+    return tuple(sorted((options or {}).items()))
+
+
+def default_chart_options(chart_type: str, selected_categories: List[str]) -> Dict:
+    """
+    Returns the options the sidebar widgets produce for a chart type before any change.
+
+    Args:
+        chart_type: One of CHART_TYPES
+        selected_categories: Selected categories
+
+    Returns:
+        Dictionary of chart options
+    """
+    if chart_type == CHART_CATEGORIES and len(selected_categories) == 1:
+        return {}
+    return dict(DEFAULT_CHART_OPTIONS.get(chart_type, {}))
+
+
+def filter_data(df: pd.DataFrame, start_date: date, end_date: date,
+                selected_categories: List[str]) -> pd.DataFrame:
+    """
+    Applies the date range and category filters of the dashboard.
+
+    The selection is resolved through the frame's row index (date slice by
+    binary search intersected with per-category posting lists), so only the
+    matching rows are touched.
+
+    Args:
+        df: Loaded dataset
+        start_date: Start date for filtering
+        end_date: End date for filtering
+        selected_categories: Categories to keep, all if empty
+
+    Returns:
+        Filtered DataFrame
+    """
+    return get_row_index(df).select(df, start_date, end_date, selected_categories)
+
+
+def index_dataset(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Builds the category/date row index and the KPI aggregate of a loaded dataset once.
+
+    Both are cached per frame object, so every later filter and KPI query of
+    the dataset reuses them.
+
+    Args:
+        df: Loaded dataset
+
+    Returns:
+        The same frame
+    """
+    if {'date', 'category'}.issubset(df.columns):
+        get_row_index(df)
+        if {'price', 'quantity'}.issubset(df.columns):
+            get_sales_aggregate(df)
+    return df
+
+
+def compute_kpis(filtered_df: pd.DataFrame) -> Tuple[float, float, int, float]:
+    """Computes the KPI set shown above the chart."""
+    return calculate_sales_kpis(filtered_df)
+
+
+def compute_aggregate_kpis(df: pd.DataFrame, start_date: date, end_date: date,
+                           selected_categories: List[str]) -> Tuple[float, float, int, float]:
+    """
+    Computes the KPI set from the dataset's date x category aggregate, without filtering its rows.
+
+    Args:
+        df: Loaded dataset
+        start_date: Start date for filtering
+        end_date: End date for filtering
+        selected_categories: Categories to keep, all if empty
+
+    Returns:
+        The values of compute_kpis on the filtered rows
+    """
+    return get_sales_aggregate(df).kpis(start_date, end_date, selected_categories)
+
+
+def build_chart(chart_type: str, filtered_df: pd.DataFrame, selected_categories: List[str],
+                options: Optional[Dict] = None) -> object:
+    """
+    Builds the figure of a chart type exactly as the dashboard displays it.
+
+    Args:
+        chart_type: One of CHART_TYPES
+        filtered_df: Filtered DataFrame
+        selected_categories: Selected categories
+        options: Chart options; missing values fall back to DEFAULT_CHART_OPTIONS
+
+    Returns:
+        Plotly figure object
+    """
+    options = dict(DEFAULT_CHART_OPTIONS.get(chart_type, {}), **(options or {}))
+
+    if chart_type == CHART_REVENUE:
+        return create_revenue_trend_plot(filtered_df, selected_categories)
+    if chart_type == CHART_QUANTITY:
+        return create_quantity_trend_plot(filtered_df, selected_categories)
+    if chart_type == CHART_FORECAST:
+        return create_forecast_plot(filtered_df, selected_categories, model=options['model'])
+    if chart_type == CHART_CATEGORIES:
+        if len(selected_categories) == 1:
+            return create_category_filter_plot(filtered_df, selected_categories[0])
+        facet_categories = selected_categories or filtered_df['category'].unique().tolist()
+        return create_category_small_multiples(
+            filtered_df,
+            facet_categories,
+            metric=options['metric'],
+            page=options['page'],
+            facets_per_page=options['facets_per_page']
+        )
+    if chart_type == CHART_CORRELATION:
+        return create_correlation_heatmap(
+            filtered_df, selected_categories[0] if len(selected_categories) == 1 else None
+        )
+    if chart_type == CHART_DISTRIBUTION:
+        histogram = compute_histogram(filtered_df, options['column'], bins=options['bins'], log=options['log'])
+        return create_distribution_plot(filtered_df, histogram.column, histogram=histogram)
+
+    raise ValueError(f"Неизвестный тип графика: {chart_type}")
@@ -1,12 +1,19 @@
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import pandas as pd
-from typing import Tuple
 import numpy as np
-from datetime import datetime, timedelta
+from forecasting import forecast_by_category, min_observations, TOTAL_SERIES
+from correlation import correlation_matrix, correlation_by_category
+from binning import Histogram, compute_histogram
+from encoding import category_mask
+from instrumentation import instrumented
 
+# plotly is imported inside the chart functions: it takes longer to import than
+# everything else here, and headless callers of pipeline never draw a chart
 
+# Fewest distinct dates the forecast chart projects from, whatever the model needs
+MIN_FORECAST_DATES = 10
+
+
+@instrumented()
 def create_revenue_trend_plot(df: pd.DataFrame, selected_categories: list = None) -> object:
     """
     Creates a bar chart showing revenue trend over time.
@@ -18,9 +25,11 @@ def create_revenue_trend_plot(df: pd.DataFrame, selected_categories: list = None
     Returns:
         Plotly figure object
     """
+    import plotly.express as px
+
     # Filter by selected categories if provided
     if selected_categories is not None and len(selected_categories) > 0:
-        plot_df = df[df['category'].isin(selected_categories)].copy()
+        plot_df = df[category_mask(df['category'], selected_categories)].copy()
     else:
         plot_df = df.copy()
 
@@ -48,6 +57,7 @@ def create_revenue_trend_plot(df: pd.DataFrame, selected_categories: list = None
     return fig
 
 
+@instrumented()
 def create_quantity_trend_plot(df: pd.DataFrame, selected_categories: list = None) -> object:
     """
     Creates a bar chart showing quantity trend over time.
@@ -59,9 +69,11 @@ def create_quantity_trend_plot(df: pd.DataFrame, selected_categories: list = Non
     Returns:
         Plotly figure object
     """
+    import plotly.express as px
+
     # Filter by selected categories if provided
     if selected_categories is not None and len(selected_categories) > 0:
-        plot_df = df[df['category'].isin(selected_categories)].copy()
+        plot_df = df[category_mask(df['category'], selected_categories)].copy()
     else:
         plot_df = df.copy()
 
@@ -88,38 +100,117 @@ def create_quantity_trend_plot(df: pd.DataFrame, selected_categories: list = Non
     return fig
 
 
-def create_forecast_plot(df: pd.DataFrame, selected_categories: list = None) -> object:
+@instrumented()
+def create_daily_totals_plot(daily: pd.DataFrame, title: str = "Динамика выручки и количества по дням") -> object:
+    """
+    Creates a chart of daily revenue (bars) and quantity (line) from precomputed daily totals.
+
+    Args:
+        daily: DataFrame with date, revenue and quantity columns, e.g. SalesAggregate.daily()
+        title: Chart title
+
+    Returns:
+        Plotly figure object
+    """
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    fig.add_trace(
+        go.Bar(
+            x=daily['date'],
+            y=daily['revenue'],
+            name='Выручка',
+            marker_color='blue',
+            hovertemplate='Дата: %{x}<br>Выручка: %{y:,.0f} руб.<extra></extra>'
+        ),
+        secondary_y=False,
+    )
+    fig.add_trace(
+        go.Scatter(
+            x=daily['date'],
+            y=daily['quantity'],
+            mode='lines',
+            name='Количество',
+            line=dict(color='red', width=2),
+            hovertemplate='Дата: %{x}<br>Количество: %{y:,.0f}<extra></extra>'
+        ),
+        secondary_y=True,
+    )
+
+    fig.update_layout(title_text=title, hovermode='x unified', dragmode='pan')
+    fig.update_xaxes(title_text="Дата")
+    fig.update_yaxes(title_text="Выручка (руб.)", secondary_y=False)
+    fig.update_yaxes(title_text="Количество", secondary_y=True)
+
+    return fig
+
+
+@instrumented()
+def create_forecast_plot(df: pd.DataFrame, selected_categories: list = None,
+                         model: str = 'linear', horizon: int = 7) -> object:
     """
     Creates a forecast plot showing revenue and quantity trends with projections.
 
+    Forecasts for every category and for the total are produced by a single
+    forecasting.forecast_by_category call; the chart draws the totals. When the
+    data is too short for the model, only the history is drawn, with a note
+    saying why.
+
     Args:
         df: DataFrame containing date, price, and quantity data
         selected_categories: List of categories to filter, if None, show all
+        model: Forecast model: 'linear', 'seasonal_naive' or 'holt_winters'
+        horizon: Number of days to forecast
 
     Returns:
         Plotly figure object
     """
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
     # Filter by selected categories if provided
     if selected_categories is not None and len(selected_categories) > 0:
-        plot_df = df[df['category'].isin(selected_categories)].copy()
+        plot_df = df[category_mask(df['category'], selected_categories)]
     else:
-        plot_df = df.copy()
-
-    # Group by date to get daily metrics
-    plot_df['revenue'] = plot_df['price'] * plot_df['quantity']
-    daily_data = plot_df.groupby('date').agg({
-        'revenue': 'sum',
-        'quantity': 'sum'
-    }).reset_index()
+        plot_df = df
 
     # Create subplots
     fig = make_subplots(specs=[[{"secondary_y": True}]])
 
+    # The trend line alone needs 2 days, but a forecast from fewer than 10 is not meaningful
+    required = max(MIN_FORECAST_DATES, min_observations(model))
+    n_dates = plot_df['date'].nunique()
+    result = None
+    notice = None
+    if n_dates < required:
+        notice = f"Недостаточно данных для прогноза: нужно минимум {required} дней, в выборке {n_dates}"
+    else:
+        try:
+            result = forecast_by_category(plot_df, ['revenue', 'quantity'], horizon=horizon, model=model)
+        except ValueError as e:
+            notice = f"Прогноз не построен: {e}"
+
+    if result is not None:
+        dates = result.dates
+        revenue_col = result.column(f"revenue:{TOTAL_SERIES}")
+        quantity_col = result.column(f"quantity:{TOTAL_SERIES}")
+        revenue_values = result.history[:, revenue_col]
+        quantity_values = result.history[:, quantity_col]
+    else:
+        daily_data = plot_df.assign(revenue=plot_df['price'] * plot_df['quantity']).groupby('date').agg({
+            'revenue': 'sum',
+            'quantity': 'sum'
+        }).reset_index()
+        dates = daily_data['date']
+        revenue_values = daily_data['revenue']
+        quantity_values = daily_data['quantity']
+
     # Add revenue trend
     fig.add_trace(
         go.Scatter(
-            x=daily_data['date'],
-            y=daily_data['revenue'],
+            x=dates,
+            y=revenue_values,
             mode='lines+markers',
             name='Выручка (факт)',
             line=dict(color='blue', width=2),
@@ -131,8 +222,8 @@ def create_forecast_plot(df: pd.DataFrame, selected_categories: list = None) ->
     # Add quantity trend
     fig.add_trace(
         go.Scatter(
-            x=daily_data['date'],
-            y=daily_data['quantity'],
+            x=dates,
+            y=quantity_values,
             mode='lines+markers',
             name='Количество (факт)',
             line=dict(color='red', width=2),
@@ -141,63 +232,45 @@ def create_forecast_plot(df: pd.DataFrame, selected_categories: list = None) ->
         secondary_y=True,
     )
 
-    # Add forecast if we have enough data
-    if len(daily_data) >= 10:  # Only create forecast if we have sufficient data
-        # Create a time series for forecasting
-        dates = pd.to_datetime(daily_data['date'])
-        revenue_values = daily_data['revenue'].values
-        quantity_values = daily_data['quantity'].values
-
-        # Simple linear trend forecast
-        x_vals = np.arange(len(dates))
-
-        # Revenue forecast
-        revenue_coeffs = np.polyfit(x_vals, revenue_values, 1)
-        revenue_trend = np.polyval(revenue_coeffs, x_vals)
-
-        # Quantity forecast
-        quantity_coeffs = np.polyfit(x_vals, quantity_values, 1)
-        quantity_trend = np.polyval(quantity_coeffs, x_vals)
-
-        # Extend dates for forecast
-        last_date = dates.max()
-        forecast_dates = []
-        for i in range(1, 8):  # 7 days forecast
-            forecast_dates.append(last_date + timedelta(days=i))
-
-        forecast_x = np.arange(len(x_vals), len(x_vals) + len(forecast_dates))
-        forecast_revenue = np.polyval(revenue_coeffs, forecast_x)
-        forecast_quantity = np.polyval(quantity_coeffs, forecast_x)
-
-        # Add forecast lines
-        all_dates = list(dates) + forecast_dates
-        all_revenue = list(daily_data['revenue']) + list(forecast_revenue)
-        all_quantity = list(daily_data['quantity']) + list(forecast_quantity)
-
-        # Add forecast lines
-        fig.add_trace(
-            go.Scatter(
-                x=forecast_dates,
-                y=forecast_revenue,
-                mode='lines',
-                name='Выручка (прогноз)',
-                line=dict(color='blue', width=2, dash='dash'),
-                hovertemplate='Дата: %{x}<br>Выручка (прогноз): %{y:,.0f} руб.<extra></extra>'
-            ),
-            secondary_y=False,
-        )
-
-        fig.add_trace(
-            go.Scatter(
-                x=forecast_dates,
-                y=forecast_quantity,
-                mode='lines',
-                name='Количество (прогноз)',
-                line=dict(color='red', width=2, dash='dash'),
-                hovertemplate='Дата: %{x}<br>Количество (прогноз): %{y:,.0f}<extra></extra>'
-            ),
-            secondary_y=True,
-        )
+    if result is not None:
+        forecast_dates = list(result.forecast_dates)
+        series_styles = [
+            (revenue_col, 'Выручка', 'blue', 'rgba(0, 0, 255, 0.15)', ' руб.', False),
+            (quantity_col, 'Количество', 'red', 'rgba(255, 0, 0, 0.15)', '', True),
+        ]
+
+        for col, label, color, band_color, unit, secondary in series_styles:
+            # Prediction interval as a closed band around the forecast
+            fig.add_trace(
+                go.Scatter(
+                    x=forecast_dates + forecast_dates[::-1],
+                    y=list(result.upper[:, col]) + list(result.lower[::-1, col]),
+                    fill='toself',
+                    fillcolor=band_color,
+                    line=dict(width=0),
+                    hoverinfo='skip',
+                    name=f'{label} (интервал)',
+                    showlegend=False
+                ),
+                secondary_y=secondary,
+            )
+
+            # Add forecast line
+            fig.add_trace(
+                go.Scatter(
+                    x=forecast_dates,
+                    y=result.mean[:, col],
+                    mode='lines',
+                    name=f'{label} (прогноз)',
+                    line=dict(color=color, width=2, dash='dash'),
+                    hovertemplate=f'Дата: %{{x}}<br>{label} (прогноз): %{{y:,.0f}}{unit}<extra></extra>'
+                ),
+                secondary_y=secondary,
+            )
+
+    if notice is not None:
+        fig.add_annotation(text=notice, xref='paper', yref='paper', x=0.5, y=1.05,
+                           showarrow=False, font=dict(color='gray'))
 
     # Update layout
     fig.update_layout(
@@ -215,6 +288,7 @@ def create_forecast_plot(df: pd.DataFrame, selected_categories: list = None) ->
     return fig
 
 
+@instrumented()
 def create_category_filter_plot(df: pd.DataFrame, category: str) -> object:
     """
     Creates a plot for a specific category showing its revenue and quantity trends.
@@ -226,7 +300,10 @@ def create_category_filter_plot(df: pd.DataFrame, category: str) -> object:
     Returns:
         Plotly figure object
     """
-    plot_df = df[df['category'] == category].copy()
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    plot_df = df[category_mask(df['category'], [category])].copy()
     if plot_df.empty:
         fig = go.Figure()
         fig.add_annotation(text=f"Нет данных для категории {category}")
@@ -282,30 +359,43 @@ def create_category_filter_plot(df: pd.DataFrame, category: str) -> object:
     return fig
 
 
-def create_correlation_heatmap(df: pd.DataFrame) -> object:
+@instrumented()
+def create_correlation_heatmap(df: pd.DataFrame, category: str = None) -> object:
     """
     Creates a correlation heatmap showing relationships between numerical columns.
 
+    Covers every numeric column (sales and traffic metrics plus derived revenue)
+    using the chunked accumulators from the correlation module, without copying df.
+
     Args:
         df: DataFrame containing the data to analyze
+        category: Optional category to restrict the matrix to
 
     Returns:
         Plotly figure object
     """
-    # Create additional calculated columns for analysis
-    plot_df = df.copy()
-    plot_df['revenue'] = plot_df['price'] * plot_df['quantity']
+    import plotly.express as px
+    import plotly.graph_objects as go
 
-    # Select only numerical columns for correlation
-    numerical_cols = ['price', 'quantity', 'revenue']
-    corr_data = plot_df[numerical_cols].corr()
+    if category is not None:
+        corr_data = correlation_by_category(df).get(str(category))
+        title = f"Корреляционная матрица показателей: {category}"
+    else:
+        corr_data = correlation_matrix(df)
+        title = "Корреляционная матрица показателей"
+
+    if corr_data is None:
+        fig = go.Figure()
+        fig.add_annotation(text=f"Нет данных для категории {category}")
+        fig.update_layout(title=title)
+        return fig
 
     # Create heatmap
     fig = px.imshow(
         corr_data,
-        text_auto=True,
+        text_auto='.2f',
         aspect="auto",
-        title="Корреляционная матрица показателей",
+        title=title,
         color_continuous_scale='RdBu',
         range_color=[-1, 1]
     )
@@ -315,4 +405,189 @@ def create_correlation_heatmap(df: pd.DataFrame) -> object:
         yaxis_title="Показатели"
     )
 
-    return fig
\ No newline at end of file
+    return fig
+
+
+def count_facet_pages(n_categories: int, facets_per_page: int = 12) -> int:
+    """
+    Returns the number of small-multiples pages needed for the given categories.
+
+    Args:
+        n_categories: Number of categories to display
+        facets_per_page: Maximum number of facets drawn in one figure
+
+    Returns:
+        Number of pages (at least 1)
+    """
+    return max(1, -(-n_categories // max(1, facets_per_page)))
+
+
+@instrumented()
+def create_category_small_multiples(df: pd.DataFrame, selected_categories: list = None,
+                                    metric: str = 'revenue', page: int = 0,
+                                    facets_per_page: int = 12, n_cols: int = 3) -> object:
+    """
+    Creates a faceted chart with one small panel per category and shared axes.
+
+    All facets of the page are computed from a single groupby(['date', 'category'])
+    pass and drawn into one figure; categories beyond `facets_per_page` are paginated.
+
+    Args:
+        df: DataFrame containing date, category, price, and quantity data
+        selected_categories: Categories to display, if None, show all
+        metric: 'revenue' or 'quantity'
+        page: Zero-based page number
+        facets_per_page: Maximum number of facets drawn in one figure
+        n_cols: Number of facet columns
+
+    Returns:
+        Plotly figure object
+    """
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    if selected_categories is None or len(selected_categories) == 0:
+        selected_categories = df['category'].unique().tolist()
+
+    n_pages = count_facet_pages(len(selected_categories), facets_per_page)
+    page = min(max(page, 0), n_pages - 1)
+    page_categories = list(selected_categories[page * facets_per_page:(page + 1) * facets_per_page])
+
+    plot_df = df[category_mask(df['category'], page_categories)]
+    values = plot_df['price'] * plot_df['quantity'] if metric == 'revenue' else plot_df['quantity']
+    daily = values.groupby([plot_df['date'], plot_df['category']], observed=True).sum()
+    wide = daily.unstack('category', fill_value=0).sort_index()
+
+    n_rows = max(1, -(-len(page_categories) // n_cols))
+    fig = make_subplots(
+        rows=n_rows,
+        cols=n_cols,
+        shared_xaxes=True,
+        shared_yaxes='all',
+        subplot_titles=[str(category) for category in page_categories],
+        vertical_spacing=min(0.08, 0.3 / n_rows),
+        horizontal_spacing=0.03
+    )
+
+    if metric == 'revenue':
+        hovertemplate = 'Дата: %{x}<br>Выручка: %{y:,.0f} руб.<extra>%{fullData.name}</extra>'
+        axis_title = "Выручка (руб.)"
+    else:
+        hovertemplate = 'Дата: %{x}<br>Количество: %{y:,.0f}<extra>%{fullData.name}</extra>'
+        axis_title = "Количество"
+
+    for i, category in enumerate(page_categories):
+        series = wide[category] if category in wide.columns else pd.Series(dtype=float)
+        fig.add_trace(
+            go.Scatter(
+                x=series.index,
+                y=series.values,
+                mode='lines',
+                name=str(category),
+                line=dict(color='blue', width=1),
+                showlegend=False,
+                hovertemplate=hovertemplate
+            ),
+            row=i // n_cols + 1,
+            col=i % n_cols + 1
+        )
+
+    page_suffix = f" (страница {page + 1} из {n_pages})" if n_pages > 1 else ""
+    fig.update_layout(
+        title_text=f"Динамика по категориям{page_suffix}",
+        height=max(300, 220 * n_rows),
+        dragmode='pan'
+    )
+    fig.update_yaxes(title_text=axis_title, col=1)
+
+    return fig
+
+
+def _log_ticks(low: float, high: float) -> np.ndarray:
+    """Returns round tick values (1, 2, 5 per decade for short ranges, decades otherwise) within [low, high]."""
+    decades = 10.0 ** np.arange(np.floor(np.log10(low)), np.ceil(np.log10(high)) + 1)
+    steps = (1, 2, 5) if len(decades) <= 5 else (1,)
+    ticks = np.concatenate([decades * step for step in steps])
+    ticks = np.sort(ticks[(ticks >= low * (1 - 1e-9)) & (ticks <= high * (1 + 1e-9))])
+    return ticks if len(ticks) else np.array([low, high])
+
+
+@instrumented()
+def create_distribution_plot(df: pd.DataFrame, column: str = 'price', selected_categories: list = None,
+                             bins: int = 50, log: bool = False, histogram: Histogram = None,
+                             max_categories: int = 10) -> object:
+    """
+    Creates a histogram of price or revenue from server-side binned counts.
+
+    Only the bin counts are sent to the browser, never the raw values.
+
+    Args:
+        df: DataFrame containing category, price, and quantity data
+        column: 'price' or 'revenue'
+        selected_categories: List of categories to filter, if None, show all
+        bins: Number of bins
+        log: Whether to use logarithmic bins and a log x-axis
+        histogram: Precomputed (e.g. cached) binning.compute_histogram result
+        max_categories: Categories are stacked up to this count, otherwise totals are shown
+
+    Returns:
+        Plotly figure object
+    """
+    import plotly.graph_objects as go
+
+    if histogram is None:
+        if selected_categories is not None and len(selected_categories) > 0:
+            df = df[category_mask(df['category'], selected_categories)]
+        histogram = compute_histogram(df, column, bins=bins, log=log)
+
+    # Log bins are drawn on a linear axis of log10(value), where their edges are
+    # evenly spaced; bars of a log-type axis would get linear widths and overlap
+    edges = np.log10(histogram.edges) if histogram.log else histogram.edges
+    centers = (edges[:-1] + edges[1:]) / 2
+    widths = np.diff(edges)
+    bin_ranges = np.column_stack([histogram.edges[:-1], histogram.edges[1:]])
+
+    if column == 'revenue':
+        label = 'Выручка (руб.)'
+        title = 'Распределение выручки по строкам'
+    else:
+        label = 'Цена (руб.)'
+        title = 'Распределение цен'
+
+    bin_hover = '%{customdata[0]:,.0f} – %{customdata[1]:,.0f}'
+    fig = go.Figure()
+    if 1 < len(histogram.categories) <= max_categories:
+        for category, counts in zip(histogram.categories, histogram.counts):
+            fig.add_trace(go.Bar(
+                x=centers,
+                y=counts,
+                width=widths,
+                customdata=bin_ranges,
+                name=category,
+                hovertemplate=f'{label}: {bin_hover}<br>Количество строк: %{{y:,}}<extra>{category}</extra>'
+            ))
+    else:
+        fig.add_trace(go.Bar(
+            x=centers,
+            y=histogram.total(),
+            width=widths,
+            customdata=bin_ranges,
+            name='Все категории',
+            marker_color='blue',
+            hovertemplate=f'{label}: {bin_hover}<br>Количество строк: %{{y:,}}<extra></extra>'
+        ))
+
+    fig.update_layout(
+        title_text=title,
+        barmode='stack',
+        bargap=0,
+        xaxis_title=label,
+        yaxis_title="Количество строк",
+        dragmode='pan'
+    )
+    if histogram.log:
+        tick_values = _log_ticks(histogram.edges[0], histogram.edges[-1])
+        fig.update_xaxes(tickmode='array', tickvals=np.log10(tick_values),
+                         ticktext=[f'{value:,.0f}' if value >= 1 else f'{value:g}' for value in tick_values])
+
+    return fig
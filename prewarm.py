@@ -0,0 +1,137 @@
+import threading
+import pandas as pd
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date
+from typing import Hashable, List, Optional, Tuple
+from pipeline import (CHART_TYPES, build_chart, compute_aggregate_kpis, default_chart_options, filter_data,
+                      options_key)
+from stage_cache import StageCache
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_prewarm_executor(max_workers: int = 2) -> ThreadPoolExecutor:
+    """Returns the process-wide thread pool used for pre-warming."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='prewarm')
+        return _executor
+
+
+class PrewarmJob:
+    """
+    Background computation of the KPIs and every chart variant for one filter state.
+
+    Results land in the session's StageCache under the same keys the page uses,
+    so the first switch to any chart type is a cache hit.
+    """
+
+    def __init__(self, filter_key: Tuple):
+        self.filter_key = filter_key
+        self.cancelled = threading.Event()
+        self.futures: List[Future] = []
+
+    def cancel(self) -> None:
+        """Stops tasks that have not started yet; running ones finish but are harmless."""
+        self.cancelled.set()
+        for future in self.futures:
+            future.cancel()
+
+    def done(self) -> bool:
+        """Returns whether every task has finished or was cancelled."""
+        return all(future.done() for future in self.futures)
+
+
+def start_prewarm(
+    cache: StageCache,
+    df: pd.DataFrame,
+    filter_key: Tuple,
+    start_date: date,
+    end_date: date,
+    selected_categories: List[str],
+    executor: Optional[ThreadPoolExecutor] = None,
+) -> PrewarmJob:
+    """
+    Schedules the filter, KPI and all chart stages for a filter state in the background.
+
+    Args:
+        cache: Session stage cache receiving the results
+        df: Loaded dataset
+        filter_key: Cache key of the filter state (pipeline.filter_key)
+        start_date: Start date of the filter state
+        end_date: End date of the filter state
+        selected_categories: Selected categories of the filter state
+        executor: Executor to use, defaults to the shared pre-warm pool
+
+    Returns:
+        PrewarmJob that can be cancelled when the user changes the filters
+    """
+    if executor is None:
+        executor = get_prewarm_executor()
+    job = PrewarmJob(filter_key)
+
+    def filtered() -> pd.DataFrame:
+        return cache.get_or_compute(
+            'filter', filter_key, lambda: filter_data(df, start_date, end_date, selected_categories),
+            record=False
+        )
+
+    # Tasks run in submission order, so dependents always find the filter running or done
+    tasks = [
+        ('filter', filter_key, lambda: filter_data(df, start_date, end_date, selected_categories)),
+        ('kpis', filter_key, lambda: compute_aggregate_kpis(df, start_date, end_date, selected_categories)),
+    ]
+    for chart_type in CHART_TYPES:
+        options = default_chart_options(chart_type, selected_categories)
+        tasks.append((
+            'figure',
+            (filter_key, chart_type, options_key(options)),
+            lambda chart_type=chart_type, options=options: build_chart(
+                chart_type, filtered(), selected_categories, options
+            ),
+        ))
+
+    for stage, key, compute in tasks:
+        future = cache.submit(executor, stage, key, compute, job.cancelled)
+        if future is not None:
+            job.futures.append(future)
+
+    return job
+
+
+def ensure_prewarm(session_state, cache: StageCache, dataset_key: Hashable, df: pd.DataFrame,
+                   default_filter: Tuple, current_filter: Tuple, start_date: date, end_date: date,
+                   selected_categories: List[str]) -> Optional[PrewarmJob]:
+    """
+    Starts pre-warming once per dataset and cancels it when the filters move away.
+
+    Args:
+        session_state: Streamlit session state holding the job
+        cache: Session stage cache
+        dataset_key: Key of the loaded dataset
+        df: Loaded dataset
+        default_filter: Filter key of the default filter state
+        current_filter: Filter key of the current widgets
+        start_date: Default start date
+        end_date: Default end date
+        selected_categories: Default category selection
+
+    Returns:
+        The active PrewarmJob, if any
+    """
+    job = session_state.get('_prewarm_job')
+    if session_state.get('_prewarm_dataset') != dataset_key:
+        if job is not None:
+            job.cancel()
+        job = None
+        session_state['_prewarm_dataset'] = dataset_key
+        if current_filter == default_filter:
+            job = start_prewarm(cache, df, default_filter, start_date, end_date, selected_categories)
+        session_state['_prewarm_job'] = job
+    elif job is not None and current_filter != job.filter_key and not job.done():
+        job.cancel()
+
+    return job
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Replays a dashboard session under a profiler.
+
+    python -m profile_session sales.csv --profiler sampling --output-dir profiles
+    python -m profile_session sales.csv --script steps.json --profiler cprofile --top 30
+
+Every step sets some of the widgets of pages/home.py (start/end date,
+categories, chart type, chart options, table sort) and runs the same pipeline
+functions the page calls. The output directory receives collapsed stacks
+(stacks.collapsed, for flamegraph.pl or speedscope), the top-N hotspot table
+(hotspots.txt), per-step wall times (steps.json) and, for cProfile, the raw
+statistics (profile.prof).
+"""
+
+import argparse
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+
+# Steps inherit every widget value they do not set from the previous step
+DEFAULT_SCRIPT = [
+    {'chart': "Динамика выручки по дням"},
+    {'chart': "Динамика количества продаж по дням"},
+    {'chart': "Прогноз выручки и количества"},
+    {'chart': "Прогноз выручки и количества", 'options': {'model': 'holt_winters'}},
+    {'chart': "Анализ по категориям"},
+    {'chart': "Корреляционная матрица показателей"},
+    {'chart': "Распределение цен и выручки"},
+    {'start': 'quarter', 'end': 'three_quarters', 'chart': "Динамика выручки по дням"},
+    {'categories': 'top3', 'chart': "Динамика выручки по дням"},
+    {'chart': "Анализ по категориям"},
+    {'sort_by': 'revenue', 'ascending': False},
+    {'categories': 'all', 'start': 'min', 'end': 'max'},
+]
+
+
+def _resolve_date(value, dates) -> object:
+    """Resolves symbolic dates ('min', 'quarter', ...) of a script against the data."""
+    import pandas as pd
+
+    positions = {'min': 0.0, 'quarter': 0.25, 'half': 0.5, 'three_quarters': 0.75, 'max': 1.0}
+    if value in positions:
+        return pd.Timestamp(dates[int(round(positions[value] * (len(dates) - 1)))]).date()
+    return pd.Timestamp(value).date()
+
+
+def replay(df, steps: List[Dict], use_cache: bool = True) -> List[Dict]:
+    """
+    Runs the scripted interactions through the pipeline functions of the dashboard.
+
+    Args:
+        df: Loaded dataset
+        steps: Interaction steps (see DEFAULT_SCRIPT); categories may be a list,
+            'all' or 'topN' (the N most frequent categories)
+        use_cache: Whether to memoize stages per filter state like the page does
+
+    Returns:
+        Wall time and state of every step
+    """
+    from pipeline import build_chart, compute_aggregate_kpis, filter_data, filter_key, options_key
+    from stage_cache import DEFAULT_STAGE_LIMITS, StageCache
+    from table_view import get_table_page, table_sort_order
+
+    dates = df['date'].drop_duplicates().sort_values().to_numpy()
+    all_categories = df['category'].unique().tolist()
+    by_frequency = df['category'].value_counts().index.tolist()
+    cache = StageCache(stage_limits=DEFAULT_STAGE_LIMITS)
+
+    def stage(name, key, compute):
+        return cache.get_or_compute(name, key, compute) if use_cache else compute()
+
+    state = {'start': 'min', 'end': 'max', 'categories': 'all', 'chart': "Динамика выручки по дням",
+             'options': {}, 'sort_by': None, 'ascending': True}
+    timings = []
+    for number, step in enumerate(steps):
+        state.update(step)
+        if 'chart' in step and 'options' not in step:
+            state['options'] = {}
+
+        categories = state['categories']
+        if categories == 'all':
+            categories = list(all_categories)
+        elif isinstance(categories, str) and categories.startswith('top'):
+            categories = by_frequency[:int(categories[3:])]
+        start, end = _resolve_date(state['start'], dates), _resolve_date(state['end'], dates)
+        chart, options = state['chart'], state['options']
+
+        started = time.perf_counter()
+        current_filter = filter_key('profile', start, end, categories)
+        filtered = stage('filter', current_filter, lambda: filter_data(df, start, end, categories))
+        if not filtered.empty:
+            # Like the page: KPIs from the dataset's aggregate, not from the filtered rows
+            stage('kpis', current_filter, lambda: compute_aggregate_kpis(df, start, end, categories))
+            stage('figure', (current_filter, chart, options_key(options)),
+                  lambda: build_chart(chart, filtered, categories, options))
+            order = stage('table_order', (current_filter, state['sort_by'], state['ascending']),
+                          lambda: table_sort_order(filtered, state['sort_by'], state['ascending']))
+            get_table_page(filtered, order, 0, 100)
+        timings.append({
+            'step': number,
+            'seconds': time.perf_counter() - started,
+            'start': str(start),
+            'end': str(end),
+            'categories': len(categories),
+            'chart': chart,
+            'rows': int(len(filtered)),
+        })
+
+    return timings
+
+
+class SamplingProfiler:
+    """
+    Samples the Python stack of one thread at a fixed interval from a background thread.
+
+    Stacks are kept as root-to-leaf tuples of 'module:function' frames.
+    """
+
+    def __init__(self, interval: float = 0.005, thread_id: Optional[int] = None):
+        self.interval = interval
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _frame_name(frame) -> str:
+        module = os.path.splitext(os.path.basename(frame.f_code.co_filename))[0]
+        return f"{module}:{frame.f_code.co_name}"
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_name(frame))
+                frame = frame.f_back
+            if stack:
+                self.samples[tuple(reversed(stack))] += 1
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> 'SamplingProfiler':
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def collapse_samples(samples: Counter) -> List[str]:
+    """Formats stack samples as collapsed stacks: 'root;child;leaf count'."""
+    return [f"{';'.join(stack)} {count}" for stack, count in sorted(samples.items())]
+
+
+def sample_hotspots(samples: Counter, top: int = 20) -> List[Tuple[str, int, int]]:
+    """
+    Returns the functions with the most samples.
+
+    Args:
+        samples: Stack samples
+        top: Number of functions
+
+    Returns:
+        List of (function, self samples, inclusive samples), by self samples
+    """
+    self_counts, inclusive_counts = Counter(), Counter()
+    for stack, count in samples.items():
+        self_counts[stack[-1]] += count
+        for name in set(stack):
+            inclusive_counts[name] += count
+    return [(name, self_counts[name], inclusive_counts[name]) for name, _ in self_counts.most_common(top)]
+
+
+def _function_name(func: Tuple[str, int, str]) -> str:
+    filename, _, name = func
+    module = os.path.splitext(os.path.basename(filename))[0] if filename != '~' else 'builtins'
+    return f"{module}:{name}"
+
+
+def collapse_pstats(stats: pstats.Stats, max_depth: int = 64, min_fraction: float = 1e-4) -> List[str]:
+    """
+    Converts cProfile statistics into approximate collapsed stacks.
+
+    cProfile only records caller/callee pairs, so the time of a function is split
+    over its call paths in proportion to the cumulative time of each call edge
+    (the usual flameprof approach). Counts are microseconds of own time.
+
+    Args:
+        stats: Loaded cProfile statistics
+        max_depth: Deepest call path expanded
+        min_fraction: Paths carrying less than this share of the total time are not expanded
+
+    Returns:
+        Collapsed stack lines
+    """
+    raw = stats.stats
+    callees: Dict = {}
+    for func, (_, _, _, _, callers) in raw.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+
+    totals: Counter = Counter()
+    roots = [func for func, (_, _, _, _, callers) in raw.items() if not callers]
+    # Without pruning the number of call paths grows exponentially with the depth
+    min_seconds = min_fraction * sum(raw[root][3] for root in roots)
+
+    def walk(func, path: Tuple[str, ...], fraction: float, on_path: frozenset) -> None:
+        _, _, own_time, cumulative_time, _ = raw[func]
+        path = path + (_function_name(func),)
+        if len(path) >= max_depth or cumulative_time * fraction < min_seconds:
+            # The whole subtree is attributed to this frame
+            totals[path] += cumulative_time * fraction
+            return
+        totals[path] += own_time * fraction
+        for callee, edge_cumulative in callees.get(func, []):
+            if callee in on_path or callee not in raw:
+                continue
+            callee_cumulative = raw[callee][3]
+            if callee_cumulative > 0 and edge_cumulative > 0:
+                walk(callee, path, fraction * edge_cumulative / callee_cumulative, on_path | {callee})
+
+    for root in roots:
+        walk(root, (), 1.0, frozenset([root]))
+
+    return [f"{';'.join(path)} {int(round(seconds * 1e6))}"
+            for path, seconds in sorted(totals.items()) if seconds * 1e6 >= 1]
+
+
+def pstats_hotspots(stats: pstats.Stats, top: int = 20) -> List[Tuple[str, int, float, float]]:
+    """Returns (function, calls, own seconds, cumulative seconds) of the top functions by own time."""
+    rows = [
+        (_function_name(func), calls, own_time, cumulative_time)
+        for func, (_, calls, own_time, cumulative_time, _) in stats.stats.items()
+    ]
+    return sorted(rows, key=lambda row: row[2], reverse=True)[:top]
+
+
+def run_profile(file_path: str, steps: Optional[List[Dict]] = None, profiler: str = 'sampling',
+                output_dir: str = 'profiles', top: int = 20, interval: float = 0.005,
+                use_cache: bool = True) -> Dict:
+    """
+    Loads a file, replays the steps under a profiler and writes the profile files.
+
+    Args:
+        file_path: CSV, Excel or Parquet file to load
+        steps: Interaction steps, DEFAULT_SCRIPT if None
+        profiler: 'sampling' or 'cprofile'
+        output_dir: Directory receiving the output files
+        top: Number of hotspots in the table
+        interval: Sampling interval in seconds
+        use_cache: Whether to memoize stages like the page does
+
+    Returns:
+        Summary with the output paths, hotspot lines and step timings
+    """
+    from data_loader import load_data_file
+    from pipeline import index_dataset
+
+    if profiler not in ('sampling', 'cprofile'):
+        raise ValueError(f"Неизвестный профилировщик: {profiler}")
+    steps = DEFAULT_SCRIPT if steps is None else steps
+    os.makedirs(output_dir, exist_ok=True)
+
+    def session() -> List[Dict]:
+        started = time.perf_counter()
+        df = load_data_file(file_path)
+        if df is None or df.empty:
+            raise ValueError(f"Не удалось загрузить данные: {file_path}")
+        index_dataset(df)
+        load_seconds = time.perf_counter() - started
+        return [{'step': 'load', 'seconds': load_seconds, 'rows': int(len(df))}] + replay(df, steps, use_cache)
+
+    paths = {
+        'stacks': os.path.join(output_dir, 'stacks.collapsed'),
+        'hotspots': os.path.join(output_dir, 'hotspots.txt'),
+        'steps': os.path.join(output_dir, 'steps.json'),
+    }
+
+    if profiler == 'cprofile':
+        profile = cProfile.Profile()
+        timings = profile.runcall(session)
+        paths['profile'] = os.path.join(output_dir, 'profile.prof')
+        profile.dump_stats(paths['profile'])
+        stats = pstats.Stats(profile)
+        stacks = collapse_pstats(stats)
+        hotspot_lines = [f"{'функция':<60} {'вызовов':>10} {'собств., с':>12} {'всего, с':>12}"] + [
+            f"{name:<60} {calls:>10,} {own:>12.4f} {cumulative:>12.4f}"
+            for name, calls, own, cumulative in pstats_hotspots(stats, top)
+        ]
+    else:
+        with SamplingProfiler(interval) as sampler:
+            timings = session()
+        stacks = collapse_samples(sampler.samples)
+        total = sum(sampler.samples.values()) or 1
+        hotspot_lines = [f"{'функция':<60} {'собств.':>10} {'%':>6} {'всего':>10} {'%':>6}"] + [
+            f"{name:<60} {own:>10,} {100 * own / total:>6.1f} {inclusive:>10,} {100 * inclusive / total:>6.1f}"
+            for name, own, inclusive in sample_hotspots(sampler.samples, top)
+        ]
+
+    with open(paths['stacks'], 'w', encoding='utf-8') as f:
+        f.write('\n'.join(stacks) + '\n')
+    with open(paths['hotspots'], 'w', encoding='utf-8') as f:
+        f.write('\n'.join(hotspot_lines) + '\n')
+    with open(paths['steps'], 'w', encoding='utf-8') as f:
+        json.dump(timings, f, ensure_ascii=False, indent=2)
+
+    return {'paths': paths, 'hotspots': hotspot_lines, 'steps': timings}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Профилирование воспроизведенной сессии дашборда")
+    parser.add_argument('file', help="Файл данных (CSV, Excel или Parquet)")
+    parser.add_argument('--script', default=None, help="JSON-файл со списком шагов")
+    parser.add_argument('--profiler', choices=['sampling', 'cprofile'], default='sampling', help="Профилировщик")
+    parser.add_argument('--interval', type=float, default=0.005, help="Интервал выборки, с")
+    parser.add_argument('--top', type=int, default=20, help="Число строк в таблице горячих точек")
+    parser.add_argument('--output-dir', default='profiles', help="Каталог для результатов")
+    parser.add_argument('--no-cache', action='store_true', help="Не кэшировать этапы между шагами")
+    args = parser.parse_args(argv)
+
+    steps = None
+    if args.script:
+        with open(args.script, encoding='utf-8') as f:
+            steps = json.load(f)
+
+    try:
+        result = run_profile(args.file, steps, args.profiler, args.output_dir, args.top,
+                             args.interval, use_cache=not args.no_cache)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+
+    for timing in result['steps']:
+        print(f"  шаг {timing['step']!s:>4}: {timing['seconds'] * 1000:9.1f} мс")
+    print('\n'.join(result['hotspots']))
+    print(f"Результаты: {args.output_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
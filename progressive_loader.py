@@ -0,0 +1,289 @@
+import logging
+import threading
+import pandas as pd
+from typing import Hashable, Iterator, List, NamedTuple, Optional, Tuple
+from aggregates import SalesAggregate, combine_totals, daily_category_totals, set_sales_aggregate
+from compression import compression_codec, decompressed_stream
+from data_loader import finish_loaded_frame, prepare_loaded_chunk
+
+
+logger = logging.getLogger(__name__)
+
+# Smaller uploads are parsed in one go: a preview would not appear any sooner
+PROGRESSIVE_MIN_BYTES = 20 * 1024 * 1024
+
+DEFAULT_CHUNK_ROWS = 200_000
+
+# Seconds between page reruns while a load is running
+POLL_SECONDS = 0.5
+
+# The provisional chart is redrawn after the first chunk and then every this many chunks
+CHART_REFRESH_CHUNKS = 5
+
+# Columns the running KPI aggregate needs
+AGGREGATE_COLUMNS = ('date', 'category', 'price', 'quantity')
+
+CSV_TYPES = ("text/csv",)
+XLSX_TYPES = ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",)
+XLS_TYPES = ("application/vnd.ms-excel",)
+
+PROGRESSIVE_LOAD_KEY = '_progressive_load'
+
+
+def _excel_cell(value):
+    """Converts an openpyxl cell value the way pandas.read_excel does."""
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _iter_xlsx_chunks(source, chunk_rows: int) -> Iterator[Tuple[pd.DataFrame, Optional[float]]]:
+    """Streams the first sheet of an xlsx file through openpyxl's read-only mode."""
+    from openpyxl import load_workbook
+    from pandas.io.parsers import TextParser
+
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        # Files written in streaming mode may not record their size
+        total_rows = sheet.max_row
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        header = list(header)
+
+        start = 0
+        batch: List[list] = []
+        for row in rows:
+            batch.append([_excel_cell(value) for value in row])
+            if len(batch) == chunk_rows:
+                yield _parse_rows(TextParser, header, batch, start, total_rows)
+                start += len(batch)
+                batch = []
+        if batch or not start:
+            yield _parse_rows(TextParser, header, batch, start, total_rows)
+    finally:
+        workbook.close()
+
+
+def _parse_rows(text_parser, header: list, batch: List[list], start: int,
+                total_rows: Optional[int]) -> Tuple[pd.DataFrame, Optional[float]]:
+    """Builds a chunk with TextParser, which infers column types exactly like read_excel does."""
+    frame = text_parser([header] + batch, header=0).read()
+    frame.index = pd.RangeIndex(start, start + len(frame))
+    fraction = min(1.0, (start + len(batch) + 1) / total_rows) if total_rows else None
+    return frame, fraction
+
+
+def iter_raw_chunks(uploaded_file, chunk_rows: int = DEFAULT_CHUNK_ROWS
+                    ) -> Iterator[Tuple[pd.DataFrame, Optional[float]]]:
+    """
+    Reads an uploaded CSV or Excel file in chunks of rows.
+
+    Compressed CSV files are decompressed as the chunks are parsed; their
+    progress is the fraction of the compressed bytes consumed.
+
+    Args:
+        uploaded_file: Streamlit uploaded file object
+        chunk_rows: Rows per chunk
+
+    Yields:
+        Tuples of (raw chunk, fraction of the file read or None if unknown)
+    """
+    codec = compression_codec(getattr(uploaded_file, 'name', ''))
+    if codec is not None:
+        total_bytes = len(uploaded_file.getbuffer())
+        with decompressed_stream(uploaded_file, codec) as stream, pd.read_csv(stream, chunksize=chunk_rows) as reader:
+            for chunk in reader:
+                yield chunk, min(1.0, uploaded_file.tell() / total_bytes) if total_bytes else None
+    elif uploaded_file.type in CSV_TYPES:
+        total_bytes = len(uploaded_file.getbuffer())
+        with pd.read_csv(uploaded_file, chunksize=chunk_rows) as reader:
+            for chunk in reader:
+                # The parser reads ahead in blocks, so this slightly overstates the progress
+                yield chunk, min(1.0, uploaded_file.tell() / total_bytes) if total_bytes else None
+    elif uploaded_file.type in XLSX_TYPES:
+        yield from _iter_xlsx_chunks(uploaded_file, chunk_rows)
+    elif uploaded_file.type in XLS_TYPES:
+        # The legacy format cannot be streamed; it arrives as a single chunk
+        yield pd.read_excel(uploaded_file), 1.0
+    else:
+        raise ValueError("Поддерживаются только CSV и Excel файлы")
+
+
+class LoadProgress(NamedTuple):
+    """What a running load has published so far."""
+    version: int
+    rows: int
+    preview: Optional[pd.DataFrame]
+    aggregate: Optional[SalesAggregate]
+
+
+class ProgressiveLoad:
+    """
+    Parses an upload chunk by chunk in a background thread.
+
+    Every chunk is prepared on arrival (column names, dates) and folded into a
+    running date x category aggregate, so provisional KPIs and daily series
+    cost the same whatever the number of rows read. The first chunk is kept
+    as the table preview. Once the file is read, the chunks are concatenated
+    once and finished together exactly like load_uploaded_data finishes a
+    whole file.
+    """
+
+    def __init__(self, key: Hashable, uploaded_file, chunk_rows: int = DEFAULT_CHUNK_ROWS):
+        self.key = key
+        self.name = getattr(uploaded_file, 'name', '')
+        self.chunk_rows = chunk_rows
+        self.rows_loaded = 0
+        self.fraction: Optional[float] = 0.0
+        self.version = 0
+        self.error: Optional[str] = None
+        self.finalized = False
+        self.cancelled = threading.Event()
+        self._source = uploaded_file
+        self._chunks: List[pd.DataFrame] = []
+        self._preview: Optional[pd.DataFrame] = None
+        # Running (date, category) totals, only touched by the loading thread
+        self._totals: Optional[pd.DataFrame] = None
+        self._aggregate: Optional[SalesAggregate] = None
+        self._result: Optional[pd.DataFrame] = None
+        self._finished = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name='progressive-load', daemon=True)
+
+    def start(self) -> 'ProgressiveLoad':
+        self._thread.start()
+        return self
+
+    def cancel(self) -> None:
+        """Stops reading after the current chunk."""
+        self.cancelled.set()
+
+    def done(self) -> bool:
+        """Returns whether the load has finished, failed or was cancelled."""
+        return self._finished.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Waits for the load to finish; returns whether it did."""
+        return self._finished.wait(timeout)
+
+    def _aggregate_chunk(self, chunk: pd.DataFrame) -> Optional[SalesAggregate]:
+        """Adds a chunk to the running totals and returns the aggregate of all chunks so far."""
+        if not set(AGGREGATE_COLUMNS).issubset(chunk.columns):
+            return None
+        totals = daily_category_totals(chunk)
+        self._totals = totals if self._totals is None else combine_totals([self._totals, totals])
+        return SalesAggregate(self._totals)
+
+    def _run(self) -> None:
+        try:
+            for raw, fraction in iter_raw_chunks(self._source, self.chunk_rows):
+                if self.cancelled.is_set():
+                    return
+                chunk = prepare_loaded_chunk(raw)
+                if chunk is None:
+                    self.error = "Колонка 'date' не найдена в данных."
+                    return
+                aggregate = self._aggregate_chunk(chunk)
+                with self._lock:
+                    self._chunks.append(chunk)
+                    if self._preview is None:
+                        self._preview = chunk
+                    self._aggregate = aggregate
+                    self.rows_loaded += len(chunk)
+                    self.fraction = fraction
+                    self.version += 1
+
+            if not self.cancelled.is_set():
+                with self._lock:
+                    chunks = list(self._chunks)
+                    aggregate = self._aggregate
+                if not chunks:
+                    self.error = "Файл не содержит данных."
+                    return
+                result = finish_loaded_frame(pd.concat(chunks) if len(chunks) > 1 else chunks[0])
+                if aggregate is not None:
+                    # Finishing keeps the rows and their values, so the running totals are the final ones
+                    set_sales_aggregate(result, aggregate)
+                self._result = result
+                self.fraction = 1.0
+        except Exception as e:
+            logger.exception("Progressive load of %s failed", self.name)
+            self.error = str(e)
+        finally:
+            self._source = None
+            self._finished.set()
+
+    def progress(self) -> LoadProgress:
+        """
+        Returns what has been read so far, without touching the rows.
+
+        Returns:
+            LoadProgress with the version (number of chunks read), the number of rows,
+            the first chunk as preview and the aggregate of all chunks (None before
+            the first chunk, or when the file lacks a KPI column)
+        """
+        with self._lock:
+            return LoadProgress(self.version, self.rows_loaded, self._preview, self._aggregate)
+
+    def take_result(self) -> Optional[pd.DataFrame]:
+        """
+        Returns the finished frame and releases the chunks; the job is then finalized.
+
+        Returns:
+            The final DataFrame, or None if the load has not completed successfully
+        """
+        if not self.done() or self.error is not None:
+            return None
+        with self._lock:
+            result = self._result
+            self._result = None
+            self._chunks = []
+            self._preview = None
+            self._aggregate = None
+            self.finalized = True
+        return result
+
+
+def ensure_progressive_load(session_state, key: Hashable, uploaded_file,
+                            chunk_rows: int = DEFAULT_CHUNK_ROWS) -> ProgressiveLoad:
+    """
+    Returns the session's load of the file with this key, starting it if needed.
+
+    A load of another file is cancelled, and a finalized load is restarted
+    (its result was handed over and may since have been evicted).
+
+    Args:
+        session_state: Streamlit session state holding the job
+        key: Content hash of the upload
+        uploaded_file: Streamlit uploaded file object
+        chunk_rows: Rows per chunk
+
+    Returns:
+        The running or finished ProgressiveLoad
+    """
+    job = session_state.get(PROGRESSIVE_LOAD_KEY)
+    if job is not None and job.key == key and not job.finalized:
+        return job
+    if job is not None:
+        job.cancel()
+    job = ProgressiveLoad(key, uploaded_file, chunk_rows).start()
+    session_state[PROGRESSIVE_LOAD_KEY] = job
+    return job
+
+
+def cancel_progressive_load(session_state) -> None:
+    """Cancels and forgets the session's load, if any."""
+    job = session_state.pop(PROGRESSIVE_LOAD_KEY, None)
+    if job is not None:
+        job.cancel()
+
+
+def progressive_load_pending(session_state) -> bool:
+    """Returns whether the page must rerun to show more rows or the final result."""
+    job = session_state.get(PROGRESSIVE_LOAD_KEY)
+    return job is not None and not job.finalized and job.error is None and not job.cancelled.is_set()
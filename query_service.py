@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+Local asyncio JSON service over the aggregated sales data.
+
+    python -m query_service serve data.csv --port 8765
+    python -m query_service loadgen --port 8765 --requests 5000 --concurrency 32
+    python -m query_service bench data.csv
+
+Endpoints: /kpis, /daily, /categories, /summary, /stats, /health. Filters are passed
+as URL-encoded query parameters: start=YYYY-MM-DD, end=YYYY-MM-DD and either
+categories=a,b or one category=<name> per category (for names containing commas).
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from aggregates import get_sales_aggregate
+
+logger = logging.getLogger(__name__)
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           500: 'Internal Server Error'}
+
+
+class AggregateStore:
+    """
+    Shared in-memory date x category aggregate answering every endpoint.
+
+    Raw rows are reduced once to (date, category) totals, so each query touches
+    at most days x categories rows instead of the full dataset. The totals are
+    the aggregates.SalesAggregate of the frame, the same object the dashboard
+    computes its KPIs from.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.aggregate = get_sales_aggregate(df)
+        present = np.unique(self.aggregate.category_codes[self.aggregate.category_codes >= 0])
+        self.all_categories = sorted(str(category) for category in self.aggregate.category_index[present])
+        dates = self.aggregate.dates
+        self.min_date = pd.Timestamp(dates.min()).date() if len(dates) else None
+        self.max_date = pd.Timestamp(dates.max()).date() if len(dates) else None
+
+    def kpis(self, start=None, end=None, categories=None) -> Dict:
+        """Same values as analysis.calculate_sales_kpis on the filtered rows."""
+        total_revenue, avg_daily_revenue, total_quantity, avg_daily_quantity = self.aggregate.kpis(
+            start, end, categories)
+        return {
+            'total_revenue': total_revenue,
+            'avg_daily_revenue': avg_daily_revenue,
+            'total_quantity': total_quantity,
+            'avg_daily_quantity': avg_daily_quantity,
+        }
+
+    def daily(self, start=None, end=None, categories=None) -> Dict:
+        """Daily revenue and quantity series as drawn by the plotting trend charts."""
+        daily = self.aggregate.daily(start, end, categories)
+        return {
+            'date': [str(pd.Timestamp(d).date()) for d in daily['date']],
+            'revenue': daily['revenue'].tolist(),
+            'quantity': daily['quantity'].astype(int).tolist(),
+        }
+
+    def summary(self, start=None, end=None, categories=None) -> Dict:
+        """Row count and per-category totals of the filtered data."""
+        aggregate = self.aggregate
+        mask = aggregate.select(start, end, categories)
+        per_category = pd.DataFrame({
+            'code': aggregate.category_codes[mask],
+            'revenue': aggregate.revenue[mask],
+            'quantity': aggregate.quantity[mask],
+            'rows': aggregate.rows[mask],
+        }).groupby('code').sum()
+        return {
+            'rows': int(aggregate.rows[mask].sum()),
+            'categories': {
+                str(aggregate.category_index[code]): {
+                    'revenue': float(row['revenue']),
+                    'quantity': int(row['quantity']),
+                    'rows': int(row['rows']),
+                }
+                for code, row in per_category.iterrows() if code >= 0
+            },
+        }
+
+
+class LatencyRecorder:
+    """Keeps the most recent request latencies for percentile reporting."""
+
+    def __init__(self, max_samples: int = 100_000):
+        self.samples: List[float] = []
+        self.max_samples = max_samples
+        self.count = 0
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.samples.append(seconds)
+        if len(self.samples) > self.max_samples:
+            del self.samples[:len(self.samples) - self.max_samples]
+
+    def percentiles(self) -> Dict:
+        """Returns count and p50/p90/p99 latency in milliseconds."""
+        if not self.samples:
+            return {'count': self.count, 'p50_ms': None, 'p90_ms': None, 'p99_ms': None}
+        p50, p90, p99 = np.percentile(self.samples, [50, 90, 99]) * 1000
+        return {'count': self.count, 'p50_ms': float(p50), 'p90_ms': float(p90), 'p99_ms': float(p99)}
+
+
+class QueryService:
+    """
+    Minimal HTTP/1.1 JSON server on asyncio streams with request-level caching.
+
+    Identical queries (same path and parameters) are answered from an LRU of
+    serialized responses.
+    """
+
+    def __init__(self, store: AggregateStore, cache_size: int = 1024):
+        self.store = store
+        self.cache_size = cache_size
+        self._responses: "OrderedDict[Tuple, bytes]" = OrderedDict()
+        self.cache_hits = 0
+        self.latency = LatencyRecorder()
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def _parse_filters(self, query: Dict[str, List[str]]) -> Dict:
+        filters = {}
+        for name in ('start', 'end'):
+            if query.get(name):
+                filters[name] = date.fromisoformat(query[name][0])
+        categories = [c for c in query.get('categories', [''])[0].split(',') if c]
+        categories += [c for c in query.get('category', []) if c]
+        if categories:
+            filters['categories'] = categories
+        return filters
+
+    def handle(self, target: str) -> Tuple[int, bytes]:
+        """
+        Answers a request target such as '/kpis?start=2023-01-01'.
+
+        Args:
+            target: Path with query string
+
+        Returns:
+            A tuple of (HTTP status, JSON body)
+        """
+        parts = urlsplit(target)
+        query = parse_qs(parts.query)
+
+        if parts.path == '/stats':
+            body = dict(self.latency.percentiles(), cache_hits=self.cache_hits,
+                        cached_responses=len(self._responses))
+            return 200, json.dumps(body).encode()
+        if parts.path == '/health':
+            return 200, b'{"status": "ok"}'
+
+        cache_key = (parts.path, tuple(sorted((k, tuple(v)) for k, v in query.items())))
+        cached = self._responses.get(cache_key)
+        if cached is not None:
+            self._responses.move_to_end(cache_key)
+            self.cache_hits += 1
+            return 200, cached
+
+        handlers = {
+            '/kpis': self.store.kpis,
+            '/daily': self.store.daily,
+            '/summary': self.store.summary,
+        }
+        try:
+            if parts.path == '/categories':
+                body = {
+                    'categories': self.store.all_categories,
+                    'min_date': str(self.store.min_date),
+                    'max_date': str(self.store.max_date),
+                }
+            elif parts.path in handlers:
+                body = handlers[parts.path](**self._parse_filters(query))
+            else:
+                return 404, json.dumps({'error': f"Неизвестный путь: {parts.path}"}, ensure_ascii=False).encode()
+        except ValueError as e:
+            return 400, json.dumps({'error': str(e)}, ensure_ascii=False).encode()
+        except Exception:
+            logger.exception("Request %s failed", target)
+            return 500, json.dumps({'error': "Внутренняя ошибка сервиса"}, ensure_ascii=False).encode()
+
+        payload = json.dumps(body, ensure_ascii=False).encode()
+        self._responses[cache_key] = payload
+        if len(self._responses) > self.cache_size:
+            self._responses.popitem(last=False)
+        return 200, payload
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                started = time.perf_counter()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    method, target, _ = request_line.split(b' ', 2)
+                except ValueError:
+                    break
+                try:
+                    # Clients should percent-encode; raw non-ASCII targets are accepted as UTF-8
+                    target = target.decode('utf-8')
+                except UnicodeDecodeError:
+                    status, body = 400, b'{"error": "request target is not valid UTF-8"}'
+                else:
+                    if method != b'GET':
+                        status, body = 405, b'{"error": "method not allowed"}'
+                    else:
+                        status, body = self.handle(target)
+
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + body
+                )
+                await writer.drain()
+                self.latency.add(time.perf_counter() - started)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = '127.0.0.1', port: int = 8765) -> asyncio.AbstractServer:
+        """Starts listening and returns the asyncio server."""
+        self._server = await asyncio.start_server(self._serve_connection, host, port)
+        return self._server
+
+
+async def run_load(host: str, port: int, targets: List[str], n_requests: int = 2000,
+                   concurrency: int = 16) -> Dict:
+    """
+    Local load generator: keep-alive clients issuing GET requests for random targets.
+
+    Args:
+        host: Server host
+        port: Server port
+        targets: Request targets to pick from
+        n_requests: Total number of requests
+        concurrency: Number of concurrent connections
+
+    Returns:
+        Client-side throughput and p50/p90/p99 latency
+    """
+    latency = LatencyRecorder()
+    remaining = [n_requests]
+    rng = random.Random(0)
+
+    async def client() -> None:
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            while remaining[0] > 0:
+                remaining[0] -= 1
+                started = time.perf_counter()
+                writer.write(f"GET {rng.choice(targets)} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+                await writer.drain()
+                length = 0
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b''):
+                        break
+                    if line.lower().startswith(b'content-length:'):
+                        length = int(line.split(b':')[1])
+                await reader.readexactly(length)
+                latency.add(time.perf_counter() - started)
+        finally:
+            writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return dict(latency.percentiles(), seconds=elapsed, requests_per_second=n_requests / elapsed)
+
+
+def default_targets(all_categories: List[str], min_date, max_date, n_targets: int = 200,
+                    seed: int = 0) -> List[str]:
+    """
+    Builds a mix of request targets over random date ranges and category sets.
+
+    Categories are sent as URL-encoded category parameters, so names with
+    commas, ampersands or non-ASCII characters select what they name. Without
+    categories (or dates), the targets do not filter by them.
+    """
+    rng = random.Random(seed)
+    days = pd.date_range(min_date, max_date, freq='D')
+    targets = ['/categories']
+    for _ in range(n_targets):
+        params = []
+        if len(days):
+            first, last = sorted(rng.sample(range(len(days)), 2)) if len(days) > 1 else (0, 0)
+            params += [('start', str(days[first].date())), ('end', str(days[last].date()))]
+        if all_categories:
+            categories = rng.sample(all_categories, k=rng.randint(1, min(3, len(all_categories))))
+            params += [('category', category) for category in categories]
+        targets.append(f"/{rng.choice(['kpis', 'daily', 'summary'])}?{urlencode(params)}")
+    return targets
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="JSON-сервис агрегированных данных продаж")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    serve = subparsers.add_parser('serve', help="Запустить сервис")
+    serve.add_argument('data', help="CSV или Excel файл с данными")
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8765)
+
+    loadgen = subparsers.add_parser('loadgen', help="Нагрузить запущенный сервис")
+    loadgen.add_argument('--host', default='127.0.0.1')
+    loadgen.add_argument('--port', type=int, default=8765)
+    loadgen.add_argument('--requests', type=int, default=2000)
+    loadgen.add_argument('--concurrency', type=int, default=16)
+
+    bench = subparsers.add_parser('bench', help="Запустить сервис и нагрузку в одном процессе")
+    bench.add_argument('data', help="CSV или Excel файл с данными")
+    bench.add_argument('--requests', type=int, default=2000)
+    bench.add_argument('--concurrency', type=int, default=16)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'loadgen':
+        async def fetch_targets() -> List[str]:
+            reader, writer = await asyncio.open_connection(args.host, args.port)
+            writer.write(b"GET /categories HTTP/1.1\r\nConnection: close\r\n\r\n")
+            response = await reader.read()
+            writer.close()
+            info = json.loads(response.split(b'\r\n\r\n', 1)[1])
+            return default_targets(info['categories'], info['min_date'], info['max_date'])
+
+        targets = asyncio.run(fetch_targets())
+        result = asyncio.run(run_load(args.host, args.port, targets, args.requests, args.concurrency))
+        print(json.dumps(result, indent=2))
+        return 0
+
+    from data_loader import load_data_file
+
+    df = load_data_file(args.data)
+    if df is None:
+        print("Не удалось загрузить данные", file=sys.stderr)
+        return 1
+    service = QueryService(AggregateStore(df))
+
+    if args.command == 'serve':
+        async def serve_forever() -> None:
+            server = await service.start(args.host, args.port)
+            print(f"Сервис запущен на http://{args.host}:{args.port}")
+            async with server:
+                await server.serve_forever()
+
+        try:
+            asyncio.run(serve_forever())
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    async def run_bench() -> Dict:
+        server = await service.start('127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            store = service.store
+            targets = default_targets(store.all_categories, store.min_date, store.max_date)
+            client = await run_load('127.0.0.1', port, targets, args.requests, args.concurrency)
+        return {'client': client, 'server': service.latency.percentiles(), 'cache_hits': service.cache_hits}
+
+    print(json.dumps(asyncio.run(run_bench()), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
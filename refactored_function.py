@@ -26,7 +26,7 @@ def group_by_date_and_category(dataframe: pd.DataFrame) -> pd.DataFrame:
     Returns:
         Grouped DataFrame with aggregated values
     """
-    grouped_df = dataframe.groupby(['date', 'category']).agg({
+    grouped_df = dataframe.groupby(['date', 'category'], observed=True).agg({
         'revenue': 'sum',
         'quantity': 'sum'
     }).reset_index()
@@ -47,7 +47,7 @@ def calculate_category_moving_average(dataframe: pd.DataFrame, window: int = 7)
     result_df = dataframe.copy()
     result_df = result_df.sort_values('date')
     result_df['revenue_rolling_avg'] = (
-        result_df.groupby('category')['revenue']
+        result_df.groupby('category', observed=True)['revenue']
         .transform(lambda x: x.rolling(window=window, min_periods=1).mean())
     )
     return result_df
@@ -64,7 +64,7 @@ def calculate_revenue_percentage(dataframe: pd.DataFrame) -> pd.DataFrame:
         DataFrame with added 'revenue_percentage' column
     """
     result_df = dataframe.copy()
-    category_totals = result_df.groupby('category')['revenue'].transform('sum')
+    category_totals = result_df.groupby('category', observed=True)['revenue'].transform('sum')
     result_df['revenue_percentage'] = (result_df['revenue'] / category_totals) * 100
     return result_df
 
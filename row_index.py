@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+from datetime import date
+from typing import Iterable, Optional, Tuple
+from encoding import category_codes, category_lookup
+from frame_cache import FrameCache
+
+# Share of the date slice above which a code mask over the slice beats merging posting lists
+MASK_MIN_SHARE = 0.3
+
+
+class RowIndex:
+    """
+    Per-category posting lists over a date-sorted frame.
+
+    Row ids of every category are stored contiguously and in ascending order,
+    so a date window maps to a sub-range of each posting list found by binary
+    search. A selection of a few categories then costs time proportional to
+    the matching rows rather than to the whole frame; broad selections scan
+    the codes of the date slice instead.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.n_rows = len(df)
+        self.dates = df['date'].to_numpy()
+        self.dates_sorted = bool(df['date'].is_monotonic_increasing)
+
+        codes, self.categories = category_codes(df['category'])
+        self.codes = codes
+        # Stable sort keeps the row ids of each category ascending; missing categories (-1) come first
+        self.row_ids = np.argsort(codes, kind='stable').astype(np.int64 if self.n_rows > 2 ** 31 - 1 else np.int32)
+        counts = np.bincount(codes + 1, minlength=len(self.categories) + 1)
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+
+    def nbytes(self) -> int:
+        """Returns the memory used by the index itself."""
+        return int(self.row_ids.nbytes + self.offsets.nbytes + self.codes.nbytes)
+
+    def date_slice(self, start_date: Optional[date], end_date: Optional[date]) -> Tuple[int, int]:
+        """
+        Returns the row range [lo, hi) whose dates fall within the inclusive window.
+
+        Matches get_filtered_data: start <= date <= end, with both bounds at midnight.
+        """
+        lo, hi = 0, self.n_rows
+        if start_date is not None:
+            lo = int(np.searchsorted(self.dates, self._bound(start_date), side='left'))
+        if end_date is not None:
+            hi = int(np.searchsorted(self.dates, self._bound(end_date), side='right'))
+        return lo, max(lo, hi)
+
+    def _bound(self, value: date) -> np.datetime64:
+        # Searching with the column's own unit avoids converting the whole column
+        return np.datetime64(pd.to_datetime(value)).astype(self.dates.dtype)
+
+    def posting_list(self, code: int) -> np.ndarray:
+        """Returns the ascending row ids of a category code."""
+        return self.row_ids[self.offsets[code]:self.offsets[code + 1]]
+
+    def rows(self, start_date: Optional[date], end_date: Optional[date],
+             selected_categories: Optional[Iterable] = None) -> np.ndarray:
+        """
+        Returns the ascending row positions matching a date window and category selection.
+
+        Args:
+            start_date: Inclusive start date, or None
+            end_date: Inclusive end date, or None
+            selected_categories: Categories to keep, all if empty
+
+        Returns:
+            Array of row positions
+        """
+        selected_categories = list(selected_categories or [])
+
+        if not self.dates_sorted:
+            mask = np.ones(self.n_rows, dtype=bool)
+            if start_date is not None:
+                mask &= self.dates >= self._bound(start_date)
+            if end_date is not None:
+                mask &= self.dates <= self._bound(end_date)
+            if selected_categories:
+                mask &= category_lookup(self.categories, selected_categories)[self.codes]
+            return np.flatnonzero(mask)
+
+        lo, hi = self.date_slice(start_date, end_date)
+        if not selected_categories:
+            return np.arange(lo, hi)
+
+        lookup = category_lookup(self.categories, selected_categories)
+        parts = []
+        for code in np.flatnonzero(lookup[:-1]):
+            # +1: the posting lists are laid out with the missing category first
+            postings = self.posting_list(code + 1)
+            parts.append(postings[np.searchsorted(postings, lo):np.searchsorted(postings, hi)])
+        n_matching = sum(len(part) for part in parts)
+        if n_matching == hi - lo:
+            # Every row of the slice matches, e.g. all categories selected
+            return np.arange(lo, hi)
+        if n_matching > MASK_MIN_SHARE * (hi - lo):
+            # Merging would sort most of the slice; one gather over its codes is cheaper
+            return lo + np.flatnonzero(lookup[self.codes[lo:hi]])
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        if len(parts) == 1:
+            return parts[0]
+        return np.sort(np.concatenate(parts))
+
+    def select(self, df: pd.DataFrame, start_date: Optional[date], end_date: Optional[date],
+               selected_categories: Optional[Iterable] = None) -> pd.DataFrame:
+        """Returns the rows of df (the indexed frame) matching the filters."""
+        if self.dates_sorted and not selected_categories:
+            lo, hi = self.date_slice(start_date, end_date)
+            return df.iloc[lo:hi]
+        return df.take(self.rows(start_date, end_date, selected_categories))
+
+
+_indexes: FrameCache[RowIndex] = FrameCache(RowIndex)
+
+
+def get_row_index(df: pd.DataFrame) -> RowIndex:
+    """
+    Returns the row index of a frame, building it once per frame object.
+
+    The index lives as long as the frame, so frames shared through the dataset
+    store share their index as well. Frames must not be mutated once indexed.
+
+    Args:
+        df: DataFrame with 'date' and 'category' columns
+
+    Returns:
+        RowIndex of the frame
+    """
+    return _indexes.get(df)
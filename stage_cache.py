@@ -0,0 +1,199 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+SESSION_KEY = '_stage_cache'
+
+# Figures of every chart variant are kept, including the pre-warmed ones; filtered
+# frames are per-session copies, so only the few most recent are kept
+DEFAULT_STAGE_LIMITS = {'figure': 24, 'filter': 4}
+
+
+class StageCache:
+    """
+    Thread-safe memo of dashboard stage results keyed on the stage inputs.
+
+    Every stage (filter, kpis, figure, table, ...) keeps its own small LRU
+    so that a rerun only recomputes the stages whose inputs actually changed.
+    """
+
+    def __init__(self, max_entries: int = 8, stage_limits: Optional[Dict[str, int]] = None):
+        self.max_entries = max_entries
+        self.stage_limits = stage_limits or {}
+        self._entries: Dict[str, "OrderedDict[Hashable, Any]"] = {}
+        self._lock = threading.RLock()
+        self._pending: Dict[Tuple[str, Hashable], Future] = {}
+        self.events: List[Tuple[str, bool, float]] = []
+
+    def _stage(self, stage: str) -> "OrderedDict[Hashable, Any]":
+        return self._entries.setdefault(stage, OrderedDict())
+
+    def get(self, stage: str, key: Hashable, default: Any = None) -> Any:
+        """Returns a cached value (marking it recently used) or the default."""
+        with self._lock:
+            entries = self._stage(stage)
+            if key not in entries:
+                return default
+            entries.move_to_end(key)
+            return entries[key]
+
+    def contains(self, stage: str, key: Hashable) -> bool:
+        """Returns whether a value is cached for the stage and key."""
+        with self._lock:
+            return key in self._stage(stage)
+
+    def put(self, stage: str, key: Hashable, value: Any) -> None:
+        """Stores a value, evicting the least recently used entries of the stage."""
+        with self._lock:
+            entries = self._stage(stage)
+            entries[key] = value
+            entries.move_to_end(key)
+            limit = self.stage_limits.get(stage, self.max_entries)
+            while len(entries) > limit:
+                entries.popitem(last=False)
+
+    def get_or_compute(self, stage: str, key: Hashable, compute: Callable[[], Any], record: bool = True) -> Any:
+        """
+        Returns the cached value of a stage or computes and stores it.
+
+        If the same value is being computed in the background (see submit), the
+        background result is awaited instead of computing it twice.
+
+        Args:
+            stage: Stage name
+            key: Hashable representation of every input of the stage
+            compute: Zero-argument function producing the value
+            record: Whether to record the hit or miss in the rerun events
+
+        Returns:
+            Stage result
+        """
+        with self._lock:
+            entries = self._stage(stage)
+            if key in entries:
+                entries.move_to_end(key)
+                if record:
+                    self.events.append((stage, True, 0.0))
+                return entries[key]
+            pending = self._pending.get((stage, key))
+
+        started = time.perf_counter()
+        if pending is not None:
+            try:
+                pending.result()
+            except Exception:
+                # Cancelled or failed in the background: compute it here instead
+                pass
+            with self._lock:
+                entries = self._stage(stage)
+                if key in entries:
+                    if record:
+                        self.events.append((stage, True, time.perf_counter() - started))
+                    return entries[key]
+
+        value = compute()
+        elapsed = time.perf_counter() - started
+
+        self.put(stage, key, value)
+        if record:
+            with self._lock:
+                self.events.append((stage, False, elapsed))
+        return value
+
+    def submit(
+        self,
+        executor: Executor,
+        stage: str,
+        key: Hashable,
+        compute: Callable[[], Any],
+        cancelled: Optional[threading.Event] = None,
+    ) -> Optional[Future]:
+        """
+        Computes a stage value in the background and stores it in the cache.
+
+        Args:
+            executor: Executor running the computation
+            stage: Stage name
+            key: Hashable representation of every input of the stage
+            compute: Zero-argument function producing the value
+            cancelled: Event that, once set, makes the task skip its computation
+
+        Returns:
+            Future of the computation, or None if the value is already cached
+        """
+        with self._lock:
+            if key in self._stage(stage):
+                return None
+            if (stage, key) in self._pending:
+                return self._pending[(stage, key)]
+
+            def run() -> None:
+                if cancelled is not None and cancelled.is_set():
+                    return
+                self.put(stage, key, compute())
+
+            future = executor.submit(run)
+            self._pending[(stage, key)] = future
+
+        def forget(done: Future) -> None:
+            with self._lock:
+                if self._pending.get((stage, key)) is done:
+                    del self._pending[(stage, key)]
+
+        future.add_done_callback(forget)
+        return future
+
+    def invalidate(self, stage: Optional[str] = None) -> None:
+        """Drops the cached values of one stage, or of every stage."""
+        with self._lock:
+            if stage is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(stage, None)
+
+    def start_rerun(self) -> float:
+        """Resets the per-rerun event log and returns the rerun start time."""
+        with self._lock:
+            self.events = []
+        return time.perf_counter()
+
+    def log_rerun(self, started: float, label: str = 'rerun') -> float:
+        """
+        Logs the latency of the current rerun together with stage hits and misses.
+
+        Args:
+            started: Value returned by start_rerun
+            label: Name of the interaction being logged
+
+        Returns:
+            Rerun latency in seconds
+        """
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            stages = ', '.join(
+                f"{stage}: {'hit' if hit else f'miss {duration * 1000:.1f} ms'}"
+                for stage, hit, duration in self.events
+            )
+        logger.info("%s: %.1f ms (%s)", label, elapsed * 1000, stages or 'no stages')
+        return elapsed
+
+
+def get_stage_cache(session_state: Any) -> StageCache:
+    """
+    Returns the stage cache stored in the given session state, creating it once.
+
+    Args:
+        session_state: Streamlit session state (or any mutable mapping)
+
+    Returns:
+        StageCache of the session
+    """
+    if SESSION_KEY not in session_state:
+        session_state[SESSION_KEY] = StageCache(stage_limits=DEFAULT_STAGE_LIMITS)
+    return session_state[SESSION_KEY]
@@ -0,0 +1,88 @@
+import pandas as pd
+import numpy as np
+from typing import Optional
+
+
+TABLE_COLUMNS = ['date', 'category', 'price', 'quantity', 'revenue']
+PAGE_SIZES = [50, 100, 500, 1000]
+
+
+def count_table_pages(n_rows: int, page_size: int) -> int:
+    """
+    Returns the number of table pages (at least 1).
+
+    Args:
+        n_rows: Number of rows in the table
+        page_size: Rows per page
+
+    Returns:
+        Number of pages
+    """
+    return max(1, -(-n_rows // max(1, page_size)))
+
+
+def _column_values(df: pd.DataFrame, column: str) -> np.ndarray:
+    """Returns a table column as an array, deriving revenue on the fly."""
+    if column == 'revenue' and 'revenue' not in df.columns:
+        return df['price'].to_numpy() * df['quantity'].to_numpy()
+    return df[column].to_numpy()
+
+
+def table_sort_order(df: pd.DataFrame, sort_by: Optional[str] = None, ascending: bool = True) -> np.ndarray:
+    """
+    Computes the row order of the table once per sort setting (server-side sort).
+
+    Args:
+        df: Filtered DataFrame
+        sort_by: Column to sort by, None keeps the current (date) order
+        ascending: Sort direction
+
+    Returns:
+        Array of row positions in display order
+    """
+    if sort_by is None:
+        order = np.arange(len(df))
+        return order if ascending else order[::-1]
+
+    values = _column_values(df, sort_by)
+    if isinstance(values, np.ndarray) and values.dtype.kind in 'biufM':
+        order = np.argsort(values, kind='stable')
+    else:
+        order = np.argsort(pd.Series(values).astype(str).to_numpy(), kind='stable')
+    return order if ascending else order[::-1]
+
+
+def get_table_page(df: pd.DataFrame, order: np.ndarray, page: int, page_size: int) -> pd.DataFrame:
+    """
+    Materializes one page of the table; only these rows get the derived revenue.
+
+    Values keep their numeric types so that formatting is left to the grid.
+
+    Args:
+        df: Filtered DataFrame
+        order: Row order from table_sort_order
+        page: Zero-based page number (clamped to the valid range)
+        page_size: Rows per page
+
+    Returns:
+        DataFrame with the TABLE_COLUMNS of the page's rows
+    """
+    n_pages = count_table_pages(len(order), page_size)
+    page = min(max(page, 0), n_pages - 1)
+    return table_rows(df, order[page * page_size:(page + 1) * page_size])
+
+
+def table_rows(df: pd.DataFrame, rows) -> pd.DataFrame:
+    """
+    Builds the TABLE_COLUMNS of some rows, deriving their revenue.
+
+    Args:
+        df: Filtered DataFrame
+        rows: Row positions or a slice
+
+    Returns:
+        DataFrame with the TABLE_COLUMNS of the rows
+    """
+    rows_df = df.iloc[rows][['date', 'category', 'price', 'quantity']]
+    rows_df = rows_df.assign(revenue=rows_df['price'] * rows_df['quantity'])
+    return rows_df[TABLE_COLUMNS]
@@ -0,0 +1,110 @@
+import os
+from datetime import date
+import numpy as np
+import pandas as pd
+import pytest
+from aggregates import (SalesAggregate, combine_totals, daily_category_totals, get_sales_aggregate,
+                        set_sales_aggregate)
+from analysis import calculate_sales_kpis
+from generate_sales_data import write_sales_file
+from pipeline import filter_data
+
+
+@pytest.fixture(scope="module")
+def sales_df():
+    """Fixture with skewed prices over 40 days and 6 categories, sorted by date."""
+    rng = np.random.default_rng(7)
+    n_rows = 60_000
+    categories = np.array(['A', 'B', 'C', 'D', 'E', 'F'])
+    return pd.DataFrame({
+        'date': np.sort(rng.choice(pd.date_range('2023-01-01', periods=40).to_numpy(), n_rows)),
+        'category': pd.Categorical(categories[rng.integers(0, 6, n_rows)]),
+        'price': rng.lognormal(5, 1, n_rows),
+        'quantity': rng.integers(1, 20, n_rows),
+    })
+
+
+FILTERS = [
+    (None, None, None),
+    (date(2023, 1, 5), date(2023, 1, 20), None),
+    (date(2023, 1, 1), date(2023, 2, 9), ['B', 'E']),
+    (date(2023, 1, 12), date(2023, 1, 12), ['A']),
+    (date(2024, 1, 1), date(2024, 2, 1), None),
+]
+
+
+class TestSalesAggregate:
+    """Test class for the date x category aggregate."""
+
+    @pytest.mark.parametrize("start,end,categories", FILTERS)
+    def test_kpis_are_exact(self, sales_df, start, end, categories):
+        """Test that the aggregate KPIs equal the row-level KPIs of the filtered rows."""
+        aggregate = SalesAggregate.from_frame(sales_df)
+
+        result = aggregate.kpis(start, end, categories)
+        expected = calculate_sales_kpis(filter_data(sales_df, start, end, categories or []))
+
+        assert result == pytest.approx(expected)
+        assert result[2] == expected[2]
+
+    def test_daily_series(self, sales_df):
+        """Test that the daily series matches a groupby over the filtered rows."""
+        daily = SalesAggregate.from_frame(sales_df).daily(date(2023, 1, 3), date(2023, 1, 9), ['C'])
+
+        rows = filter_data(sales_df, date(2023, 1, 3), date(2023, 1, 9), ['C'])
+        expected = rows.assign(revenue=rows['price'] * rows['quantity']).groupby('date')[['revenue', 'quantity']].sum()
+        np.testing.assert_array_equal(daily['date'].to_numpy(), expected.index.to_numpy())
+        np.testing.assert_allclose(daily['revenue'], expected['revenue'])
+        np.testing.assert_array_equal(daily['quantity'], expected['quantity'])
+
+    def test_rows_without_category_count_in_totals(self):
+        """Test that rows with a missing category are included unless categories are selected."""
+        df = pd.DataFrame({
+            'date': pd.to_datetime(['2023-01-01', '2023-01-01', '2023-01-02']),
+            'category': ['A', None, 'A'],
+            'price': [1.0, 2.0, 3.0],
+            'quantity': [1, 1, 1],
+        })
+        aggregate = SalesAggregate.from_frame(df)
+
+        assert aggregate.kpis()[0] == 6.0
+        assert aggregate.kpis(categories=['A'])[0] == 4.0
+        assert aggregate.n_rows == 3
+
+    def test_combined_chunks_equal_whole(self, sales_df):
+        """Test that merging the totals of chunks gives the totals of the whole frame."""
+        parts = [daily_category_totals(sales_df.iloc[start:start + 7_000]) for start in range(0, len(sales_df), 7_000)]
+
+        combined = SalesAggregate(combine_totals(parts))
+        whole = SalesAggregate.from_frame(sales_df)
+
+        for start, end, categories in FILTERS:
+            assert combined.kpis(start, end, categories) == pytest.approx(whole.kpis(start, end, categories))
+        assert combined.n_rows == len(sales_df)
+
+    def test_aggregate_is_cached_per_frame(self, sales_df):
+        """Test that the aggregate is built once per frame object and can be provided up front."""
+        assert get_sales_aggregate(sales_df) is get_sales_aggregate(sales_df)
+        assert get_sales_aggregate(sales_df.copy()) is not get_sales_aggregate(sales_df)
+
+        copy = sales_df.copy()
+        aggregate = SalesAggregate.from_frame(sales_df)
+        set_sales_aggregate(copy, aggregate)
+        assert get_sales_aggregate(copy) is aggregate
+
+
+def test_dashboard_kpis_from_aggregate(tmp_path):
+    """Test that the dashboard shows the exact KPIs of the uploaded file."""
+    from streamlit.testing.v1 import AppTest
+
+    path = tmp_path / 'sales.csv'
+    write_sales_file(str(path), 2_000, n_categories=5, n_days=30)
+    df = pd.read_csv(path)
+    at = AppTest.from_file(os.path.join(os.path.dirname(__file__), 'pages', 'home.py'), default_timeout=60)
+    at.run()
+    at.sidebar.file_uploader[0].upload('sales.csv', path.read_bytes(), 'text/csv').run()
+
+    assert not at.exception
+    assert at.metric[0].value == f"{(df['price'] * df['quantity']).sum():,.0f} руб."
+    assert at.metric[2].value == f"{df['quantity'].sum():,}"
+    assert not at.sidebar.toggle
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+from backtesting import backtest, horizon_errors, rolling_origin_forecasts
+from forecasting import forecast_matrix
+
+
+@pytest.fixture
+def trending_values():
+    """Fixture that provides 6 weeks of noisy trending data for three series."""
+    rng = np.random.default_rng(7)
+    return rng.normal(100, 10, size=(42, 3)) + np.arange(42)[:, None] * 1.5
+
+
+class TestRollingOriginForecasts:
+    """Test class for rolling_origin_forecasts function."""
+
+    @pytest.mark.parametrize("model", ["linear", "seasonal_naive", "holt_winters"])
+    def test_matches_refitting_at_every_cutoff(self, trending_values, model):
+        """Test that incremental backtest forecasts equal a full refit at each cutoff."""
+        cutoffs, forecasts, _ = rolling_origin_forecasts(trending_values, model=model, horizon=5)
+
+        for i, cutoff in enumerate(cutoffs):
+            _, mean, _, _ = forecast_matrix(trending_values[:cutoff], horizon=5, model=model)
+            np.testing.assert_allclose(forecasts[i], mean)
+
+    def test_rolling_window_linear(self, trending_values):
+        """Test that a rolling window fits only the last `window` observations."""
+        cutoffs, forecasts, _ = rolling_origin_forecasts(
+            trending_values, model="linear", horizon=3, window=10
+        )
+
+        position = list(cutoffs).index(30)
+        _, mean, _, _ = forecast_matrix(trending_values[20:30], horizon=3, model="linear")
+        np.testing.assert_allclose(forecasts[position], mean)
+
+    @pytest.mark.parametrize("window", [0, 1])
+    def test_rejects_too_short_window(self, trending_values, window):
+        """Test that a linear window too short to fit a line is rejected."""
+        with pytest.raises(ValueError):
+            rolling_origin_forecasts(trending_values, model="linear", window=window)
+
+    def test_actuals_beyond_data_are_nan(self, trending_values):
+        """Test that targets past the end of the data are marked missing."""
+        cutoffs, _, actuals = rolling_origin_forecasts(trending_values, horizon=7)
+
+        assert cutoffs[-1] == len(trending_values) - 1
+        assert not np.isnan(actuals[-1, 0]).any()
+        assert np.isnan(actuals[-1, 1:]).all()
+
+
+class TestHorizonErrors:
+    """Test class for horizon_errors function."""
+
+    def test_horizon_errors_basic(self):
+        """Test MAPE and RMSE on a hand-computed example."""
+        forecasts = np.array([[[110.0], [90.0]], [[100.0], [0.0]]])
+        actuals = np.array([[[100.0], [100.0]], [[100.0], [np.nan]]])
+
+        mape, rmse, count = horizon_errors(forecasts, actuals)
+
+        np.testing.assert_allclose(mape[:, 0], [5.0, 10.0])
+        np.testing.assert_allclose(rmse[:, 0], [np.sqrt(50.0), 10.0])
+        np.testing.assert_array_equal(count[:, 0], [2, 1])
+
+
+class TestBacktest:
+    """Test class for backtest function."""
+
+    def test_backtest_reports_every_model_category_and_horizon(self):
+        """Test that the report covers all models, metrics, categories and horizons."""
+        n_days = 35
+        data = {
+            "date": np.repeat(pd.date_range("2023-01-01", periods=n_days, freq="D"), 2),
+            "category": ["Electronics", "Clothing"] * n_days,
+            "price": [100.0, 50.0] * n_days,
+            "quantity": np.arange(2 * n_days) % 5 + 1,
+        }
+
+        report = backtest(pd.DataFrame(data), horizon=7)
+
+        # 3 models x 7 horizons x 2 metrics x (2 categories + total)
+        assert len(report) == 3 * 7 * 2 * 3
+        assert set(report["model"]) == {"linear", "seasonal_naive", "holt_winters"}
+        assert (report["rmse"] >= 0).all()
@@ -0,0 +1,99 @@
+import json
+import subprocess
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+from batch_report import build_report, expand_inputs, report_names, run_batch
+
+
+@pytest.fixture
+def shop_files(tmp_path):
+    """Fixture that writes two shop CSV files and one file without a date column."""
+    rng = np.random.default_rng(5)
+    n_days = 20
+    for name in ["shop_a", "shop_b"]:
+        data = {
+            "date": np.repeat(pd.date_range("2023-01-01", periods=n_days, freq="D").strftime("%Y-%m-%d"), 2),
+            "category": ["Electronics", "Clothing"] * n_days,
+            "price": rng.uniform(10.0, 100.0, 2 * n_days).round(2),
+            "quantity": rng.integers(1, 5, 2 * n_days),
+        }
+        pd.DataFrame(data).to_csv(tmp_path / f"{name}.csv", index=False)
+    (tmp_path / "broken.csv").write_text("x,y\n1,2\n")
+    return tmp_path
+
+
+class TestBatchReport:
+    """Test class for the headless batch report."""
+
+    def test_expand_inputs_globs(self, shop_files):
+        """Test glob expansion and de-duplication."""
+        files = expand_inputs([str(shop_files / "shop_*.csv"), str(shop_files / "shop_a.csv")])
+
+        assert [f.split("/")[-1] for f in files] == ["shop_a.csv", "shop_b.csv"]
+
+    def test_build_report_writes_json_and_charts(self, shop_files):
+        """Test that a report contains KPIs and exported chart files."""
+        output_dir = shop_files / "out"
+        output_dir.mkdir()
+
+        report = build_report(str(shop_files / "shop_a.csv"), str(output_dir))
+
+        assert report["status"] == "ok"
+        assert report["rows"] == 40
+        assert report["kpis"]["total_quantity"] > 0
+        saved = json.loads((output_dir / "shop_a.json").read_text(encoding="utf-8"))
+        assert saved["kpis"] == report["kpis"]
+        assert (output_dir / "shop_a.forecast.html").exists()
+
+    def test_run_batch_summary(self, shop_files):
+        """Test the throughput summary, including a failed file."""
+        files = expand_inputs([str(shop_files / "*.csv")])
+
+        summary = run_batch(files, str(shop_files / "out"), workers=2, export_charts=False)
+
+        assert summary["files"] == 3
+        assert summary["succeeded"] == 2
+        assert summary["rows"] == 80
+        assert summary["failed"][0].endswith("broken.csv")
+        assert (shop_files / "out" / "summary.json").exists()
+
+    def test_report_names_are_unique(self, tmp_path):
+        """Test that report names keep the relative directory and drop data and compression suffixes."""
+        files = [str(tmp_path / "a" / "sales.csv"), str(tmp_path / "b" / "sales.csv.gz"),
+                 str(tmp_path / "b" / "sales_2023.xlsx")]
+
+        assert list(report_names(files).values()) == ["a/sales", "b/sales", "b/sales_2023"]
+        assert report_names([str(tmp_path / "x.csv.gz")]) == {str(tmp_path / "x.csv.gz"): "x"}
+
+    @pytest.mark.parametrize("names", [["x.csv", "x.csv.gz"], ["x.csv", "X.xlsx"], ["summary.csv", "a.csv"]])
+    def test_report_name_collisions_fail(self, tmp_path, names):
+        """Test that inputs sharing a report name, or taking the summary's, are rejected before any work."""
+        with pytest.raises(ValueError):
+            run_batch([str(tmp_path / name) for name in names], str(tmp_path / "out"))
+        assert not (tmp_path / "out").exists()
+
+    def test_run_batch_nested_directories(self, shop_files):
+        """Test that files with the same name in different directories get separate reports."""
+        for folder in ["north", "south"]:
+            (shop_files / folder).mkdir()
+            (shop_files / folder / "sales.csv").write_bytes((shop_files / "shop_a.csv").read_bytes())
+
+        files = expand_inputs([str(shop_files / "*" / "sales.csv")])
+        summary = run_batch(files, str(shop_files / "out"), workers=2, export_charts=False)
+
+        assert summary["succeeded"] == 2
+        assert (shop_files / "out" / "north" / "sales.json").exists()
+        assert (shop_files / "out" / "south" / "sales.json").exists()
+
+    def test_headless_path_does_not_import_streamlit(self, shop_files):
+        """Test that the batch path never imports Streamlit."""
+        code = (
+            "import sys, batch_report, tempfile\n"
+            f"batch_report.build_report({str(shop_files / 'shop_a.csv')!r}, tempfile.mkdtemp())\n"
+            "assert 'streamlit' not in sys.modules, 'streamlit was imported'\n"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+
+        assert result.returncode == 0, result.stderr
@@ -0,0 +1,96 @@
+import json
+import pytest
+from benchmarks import (
+    IMPORT_BUDGETS, check_import_budgets, compare_with_baseline, load_baseline, main, measure_import_time,
+    run_suite, save_baseline, suite_cases
+)
+
+
+def result(seconds, peak_mb=10.0, rows=1000):
+    return {'case': 'stage', 'rows': rows, 'seconds': seconds, 'rows_per_second': rows / seconds, 'peak_mb': peak_mb}
+
+
+class TestSuite:
+    """Test class for the benchmark suite."""
+
+    def test_every_stage_is_covered(self):
+        """Test that the suite covers the loaders, analysis, every chart and both process_data versions."""
+        names = {name for name, _ in suite_cases()}
+
+        assert {'load_data_from_path', 'load_uploaded_data', 'get_filtered_data', 'calculate_sales_kpis',
+                'process_data_refactored', 'process_data_legacy'} <= names
+        import plotting
+        charts = {name for name in dir(plotting) if name.startswith('create_')}
+        assert charts <= names
+
+    def test_run_suite_records_metrics(self):
+        """Test that a small run records time, throughput and peak memory per case and size."""
+        results = run_suite(sizes=[500], cases=['load_uploaded_data', 'calculate_sales_kpis'], repeat=1)
+
+        assert set(results) == {'load_uploaded_data@500', 'calculate_sales_kpis@500'}
+        for entry in results.values():
+            assert entry['rows'] == 500
+            assert entry['seconds'] > 0
+            assert entry['rows_per_second'] > 0
+            assert entry['peak_mb'] > 0
+
+
+class TestBaseline:
+    """Test class for the baseline comparison."""
+
+    def test_regressions_beyond_threshold_are_reported(self):
+        """Test that only slowdowns and memory growth beyond the threshold fail."""
+        baseline = {'a@1000': result(0.1), 'b@1000': result(0.1), 'c@1000': result(0.1, peak_mb=10)}
+        results = {'a@1000': result(0.12), 'b@1000': result(0.2), 'c@1000': result(0.1, peak_mb=20),
+                   'new@1000': result(5.0)}
+
+        regressions = compare_with_baseline(results, baseline, threshold=0.25)
+
+        assert len(regressions) == 2
+        assert regressions[0].startswith('b@1000')
+        assert regressions[1].startswith('c@1000')
+
+    def test_noise_below_minimum_is_ignored(self):
+        """Test that tiny absolute slowdowns of fast stages are not regressions."""
+        regressions = compare_with_baseline({'a@1000': result(0.002)}, {'a@1000': result(0.001)})
+
+        assert regressions == []
+
+    def test_baseline_round_trip(self, tmp_path):
+        """Test that saved results are loaded back with the environment recorded."""
+        path = str(tmp_path / 'baseline.json')
+        save_baseline(path, {'a@1000': result(0.1)})
+
+        assert load_baseline(path) == {'a@1000': result(0.1)}
+        assert 'pandas' in json.load(open(path, encoding='utf-8'))['environment']
+        assert load_baseline(str(tmp_path / 'missing.json')) is None
+
+    def test_cli_fails_on_regression(self, tmp_path):
+        """Test that the CLI exits with 1 when the baseline is much faster."""
+        path = str(tmp_path / 'baseline.json')
+        save_baseline(path, {'load_uploaded_data@20000': result(1e-6, peak_mb=0.001, rows=20_000)})
+
+        code = main(['suite', '--sizes', '20000', '--cases', 'load_uploaded_data', '--repeat', '1',
+                     '--baseline', path])
+
+        assert code == 1
+
+
+class TestImportTime:
+    """Test class for the cold import budgets."""
+
+    @pytest.mark.parametrize("module", sorted(IMPORT_BUDGETS))
+    def test_headless_modules_within_budget(self, module):
+        """Test that headless modules import within budget and without plotly or Streamlit."""
+        seconds, loaded = measure_import_time(module)
+
+        assert loaded == []
+        assert seconds <= IMPORT_BUDGETS[module], f"{module}: {seconds * 1000:.0f} ms"
+
+    def test_heavy_imports_are_reported(self):
+        """Test that a module pulling in plotly fails its budget check."""
+        timings, violations = check_import_budgets({'plotly.express': 0.001}, repeat=1)
+
+        assert timings['plotly.express'] > 0.001
+        assert any('imports plotly' in violation for violation in violations)
+        assert any('> 1 ms' in violation for violation in violations)
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+from binning import compute_histogram, histogram_edges
+
+
+@pytest.fixture
+def priced_dataframe():
+    """Fixture that provides prices and quantities for two categories."""
+    rng = np.random.default_rng(11)
+    n_rows = 2000
+    data = {
+        "category": rng.choice(["Electronics", "Clothing"], n_rows),
+        "price": rng.lognormal(5, 1, n_rows),
+        "quantity": rng.integers(1, 5, n_rows),
+    }
+    return pd.DataFrame(data)
+
+
+class TestHistogramEdges:
+    """Test class for histogram_edges function."""
+
+    def test_fixed_width_edges(self):
+        """Test evenly spaced edges spanning the data."""
+        edges = histogram_edges(np.array([0.0, 5.0, 10.0]), bins=4)
+
+        np.testing.assert_allclose(edges, [0.0, 2.5, 5.0, 7.5, 10.0])
+
+    def test_log_edges_ignore_non_positive(self):
+        """Test log edges start at the smallest positive value."""
+        edges = histogram_edges(np.array([-1.0, 0.0, 1.0, 1000.0]), bins=3, log=True)
+
+        np.testing.assert_allclose(edges, [1.0, 10.0, 100.0, 1000.0])
+
+
+class TestComputeHistogram:
+    """Test class for compute_histogram function."""
+
+    @pytest.mark.parametrize("log", [False, True])
+    def test_counts_match_numpy_per_category(self, priced_dataframe, log):
+        """Test that the single-pass table equals numpy.histogram for each category."""
+        result = compute_histogram(priced_dataframe, "price", bins=30, log=log)
+
+        for category, counts in zip(result.categories, result.counts):
+            values = priced_dataframe.loc[priced_dataframe["category"] == category, "price"]
+            expected, _ = np.histogram(values, bins=result.edges)
+            np.testing.assert_array_equal(counts, expected)
+        assert result.total().sum() == len(priced_dataframe)
+
+    def test_revenue_is_derived(self, priced_dataframe):
+        """Test binning of revenue computed from price and quantity."""
+        result = compute_histogram(priced_dataframe, "revenue", bins=20, by_category=False)
+
+        revenue = priced_dataframe["price"] * priced_dataframe["quantity"]
+        expected, _ = np.histogram(revenue, bins=result.edges)
+        assert result.categories == ["Все"]
+        np.testing.assert_array_equal(result.counts[0], expected)
+
+    def test_values_outside_edges_are_dropped(self):
+        """Test that values outside given edges are counted as dropped."""
+        df = pd.DataFrame({"category": ["A", "A", "B"], "price": [1.0, 5.0, 50.0]})
+
+        result = compute_histogram(df, "price", edges=np.array([0.0, 2.0, 10.0]))
+
+        np.testing.assert_array_equal(result.counts, [[1, 1], [0, 0]])
+        assert result.dropped == 1
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+from analysis import calculate_sales_kpis
+from compaction import compact_frame
+from data_loader import transform_sales_to_traffic
+
+
+@pytest.fixture
+def sales_df():
+    """Sales frame as produced by the loaders before compaction."""
+    rng = np.random.default_rng(0)
+    n_rows = 2000
+    df = pd.DataFrame({
+        'date': pd.to_datetime('2023-01-01') + pd.to_timedelta(rng.integers(0, 90, n_rows), unit='D'),
+        'category': rng.choice(['Электроника', 'Одежда', 'Дом', 'Книги'], n_rows).astype(object),
+        'price': rng.integers(100, 500000, n_rows) / 100,
+        'quantity': rng.integers(1, 20, n_rows),
+    })
+    df['sales'] = df['price'] * df['quantity']
+    return transform_sales_to_traffic(df).sort_values('date').reset_index(drop=True)
+
+
+class TestCompactFrame:
+    """Test class for compact_frame."""
+
+    def test_dtypes_are_narrowed(self, sales_df):
+        """Test that categories, integers and tolerated floats get smaller dtypes."""
+        compacted, report = compact_frame(sales_df)
+
+        assert isinstance(compacted['category'].dtype, pd.CategoricalDtype)
+        assert compacted['quantity'].dtype == np.int32
+        assert compacted['bounce_rate'].dtype == np.float32
+        assert compacted['price'].dtype == np.float64
+        assert report.bytes_after < report.bytes_before
+        assert report.bytes_saved == report.bytes_before - report.bytes_after
+        assert report.columns['quantity'] == ('int64', 'int32')
+
+    def test_values_and_kpis_are_unchanged(self, sales_df):
+        """Test that the KPIs are identical and values equal within tolerance."""
+        compacted, _ = compact_frame(sales_df)
+
+        assert calculate_sales_kpis(compacted) == calculate_sales_kpis(sales_df)
+        assert (compacted['category'].astype(object) == sales_df['category']).all()
+        assert (compacted['quantity'] == sales_df['quantity']).all()
+        np.testing.assert_allclose(compacted['bounce_rate'], sales_df['bounce_rate'], atol=1e-6, rtol=0)
+
+    def test_lossy_float_is_kept(self):
+        """Test that floats without a tolerance stay float64 unless float32 is exact."""
+        df = pd.DataFrame({'exact': [0.5, 1.25, np.nan], 'lossy': [0.1, 0.2, 0.3]})
+
+        compacted, report = compact_frame(df)
+
+        assert compacted['exact'].dtype == np.float32
+        assert compacted['lossy'].dtype == np.float64
+        assert 'lossy' not in report.columns
+
+    def test_large_integers_are_kept(self):
+        """Test that integers are only downcast when the range fits."""
+        df = pd.DataFrame({'small': [1, 2, 3], 'large': [0, 2 ** 40, -5]})
+
+        compacted, _ = compact_frame(df)
+
+        assert compacted['small'].dtype == np.int32
+        assert compacted['large'].dtype == np.int64
+
+    def test_integers_do_not_wrap(self):
+        """Test that small integers keep room for arithmetic instead of wrapping at int8."""
+        df = pd.DataFrame({'quantity': np.full(1_000, 100, dtype=np.int64)})
+
+        compacted, _ = compact_frame(df)
+
+        assert (compacted['quantity'].to_numpy() * 100)[0] == 10_000
+        assert compacted['quantity'].to_numpy().cumsum()[-1] == 100_000
+
+    def test_high_cardinality_strings_stay_strings(self):
+        """Test that only the category column is always dictionary-encoded."""
+        df = pd.DataFrame({'category': ['a', 'b', 'c', 'd'], 'comment': ['w', 'x', 'y', 'z']})
+
+        compacted, _ = compact_frame(df)
+
+        assert isinstance(compacted['category'].dtype, pd.CategoricalDtype)
+        assert not isinstance(compacted['comment'].dtype, pd.CategoricalDtype)
@@ -0,0 +1,125 @@
+import importlib.util
+import io
+import sys
+import zipfile
+import pandas as pd
+import pytest
+from benchmarks import CODEC_NAMES, BenchmarkUpload, compress_csv
+from compression import compression_codec, decompressed_stream, decompression_throughput
+from data_loader import load_data_file, load_data_from_path, load_uploaded_data
+from generate_sales_data import write_sales_file
+from progressive_loader import ProgressiveLoad, iter_raw_chunks
+
+CODECS = [
+    'gzip',
+    'zip',
+    pytest.param('zstd', marks=pytest.mark.skipif(importlib.util.find_spec('zstandard') is None,
+                                                  reason="zstandard is not installed")),
+]
+
+
+@pytest.fixture(scope="module")
+def csv_bytes(tmp_path_factory):
+    """Fixture with the bytes of a generated sales CSV."""
+    path = tmp_path_factory.mktemp('compression') / 'sales.csv'
+    write_sales_file(str(path), 60_000, n_categories=10, n_days=60)
+    return path.read_bytes()
+
+
+@pytest.fixture(scope="module")
+def expected(csv_bytes):
+    """Fixture with the frame loaded from the plain CSV."""
+    return load_uploaded_data(BenchmarkUpload(csv_bytes))
+
+
+class RecordingUpload(BenchmarkUpload):
+    """Upload remembering the largest single read of its compressed bytes."""
+
+    def __init__(self, data, name):
+        super().__init__(data, name=name)
+        self.largest_read = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.largest_read = max(self.largest_read, len(data))
+        return data
+
+
+def test_codec_from_name():
+    """Test that the codec is chosen by the last suffix of the file name."""
+    assert compression_codec('sales.csv.gz') == 'gzip'
+    assert compression_codec('SALES.CSV.ZST') == 'zstd'
+    assert compression_codec('export.zip') == 'zip'
+    assert compression_codec('sales.csv') is None
+    assert compression_codec('sales.xlsx') is None
+
+
+class TestCompressedLoads:
+    """Test class for loading compressed CSV files."""
+
+    @pytest.mark.parametrize("codec", CODECS)
+    def test_upload_matches_plain_csv(self, csv_bytes, expected, codec):
+        """Test that a compressed upload loads exactly like the plain CSV."""
+        before = decompression_throughput().get(codec, {}).get('files', 0)
+
+        upload = RecordingUpload(compress_csv(csv_bytes, codec), name=CODEC_NAMES[codec])
+        upload.type = 'application/octet-stream'
+        df = load_uploaded_data(upload)
+
+        pd.testing.assert_frame_equal(df, expected)
+        # The compressed bytes are consumed block by block, not in one read
+        assert upload.largest_read < len(upload.getvalue())
+        totals = decompression_throughput()[codec]
+        assert totals['files'] == before + 1
+        assert totals['ratio'] > 1
+        assert totals['mb_per_second'] > 0
+
+    @pytest.mark.parametrize("codec", CODECS)
+    def test_paths_match_plain_csv(self, csv_bytes, expected, codec, tmp_path):
+        """Test that both path loaders accept compressed files."""
+        path = tmp_path / CODEC_NAMES[codec]
+        path.write_bytes(compress_csv(csv_bytes, codec))
+
+        pd.testing.assert_frame_equal(load_data_file(str(path)), expected)
+        pd.testing.assert_frame_equal(load_data_from_path(str(path)), expected)
+
+    def test_progressive_load_of_compressed_upload(self, csv_bytes, expected):
+        """Test that the chunked loader streams a compressed upload with growing progress."""
+        upload = BenchmarkUpload(compress_csv(csv_bytes, 'gzip'), name='sales.csv.gz')
+        fractions = [fraction for _, fraction in iter_raw_chunks(upload, chunk_rows=15_000)]
+
+        assert len(fractions) == 4
+        assert fractions == sorted(fractions)
+        assert fractions[-1] == 1.0
+
+        job = ProgressiveLoad('key', BenchmarkUpload(upload.getvalue(), name='sales.csv.gz'), chunk_rows=15_000)
+        assert job.start().wait(30)
+        pd.testing.assert_frame_equal(job.take_result(), expected)
+
+    def test_zip_picks_csv_member(self, csv_bytes):
+        """Test that the CSV file of an archive is read and archives without one are rejected."""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            archive.writestr('README.txt', "описание")
+            archive.writestr('data/sales.csv', csv_bytes[:1000])
+        buffer.seek(0)
+        with decompressed_stream(buffer, 'zip') as stream:
+            assert stream.read() == csv_bytes[:1000]
+
+        empty = io.BytesIO()
+        with zipfile.ZipFile(empty, 'w') as archive:
+            archive.writestr('a.txt', "a")
+            archive.writestr('b.txt', "b")
+        empty.seek(0)
+        with pytest.raises(ValueError):
+            with decompressed_stream(empty, 'zip'):
+                pass
+
+    def test_zstd_without_package(self, monkeypatch):
+        """Test that zstd input without the optional package fails with a clear message."""
+        monkeypatch.setitem(sys.modules, 'zstandard', None)
+
+        with pytest.raises(ImportError, match="zstandard"):
+            with decompressed_stream(io.BytesIO(b"\x28\xb5\x2f\xfd"), 'zstd'):
+                pass
+        assert load_uploaded_data(BenchmarkUpload(b"\x28\xb5\x2f\xfd", name='sales.csv.zst')) is None
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+from correlation import CovarianceAccumulator, correlation_by_category, correlation_matrix, numeric_columns
+
+
+@pytest.fixture
+def traffic_dataframe():
+    """Fixture that provides sales data with traffic metrics for two categories."""
+    rng = np.random.default_rng(3)
+    n_rows = 1000
+    sessions = rng.integers(50, 300, n_rows)
+    data = {
+        "date": pd.date_range("2023-01-01", periods=n_rows, freq="h"),
+        "category": rng.choice(["Electronics", "Clothing"], n_rows),
+        "price": rng.uniform(10.0, 500.0, n_rows),
+        "quantity": rng.integers(1, 10, n_rows),
+        "sessions": sessions,
+        "page_views": sessions * 3 + rng.integers(0, 20, n_rows),
+        "bounce_rate": rng.uniform(0.3, 0.6, n_rows),
+    }
+    return pd.DataFrame(data)
+
+
+def expected_correlation(df):
+    """Reference correlation computed by pandas on a copy with revenue added."""
+    reference = df.drop(columns=["date", "category"]).copy()
+    reference["revenue"] = reference["price"] * reference["quantity"]
+    return reference.corr()
+
+
+class TestCovarianceAccumulator:
+    """Test class for CovarianceAccumulator."""
+
+    def test_merge_equals_single_pass(self):
+        """Test that merging partial accumulators matches one accumulator over all rows."""
+        rng = np.random.default_rng(0)
+        values = rng.normal(size=(500, 4))
+
+        single = CovarianceAccumulator(4).update(values)
+        merged = CovarianceAccumulator(4)
+        for part in np.array_split(values, 7):
+            merged.merge(CovarianceAccumulator(4).update(part))
+
+        np.testing.assert_allclose(merged.covariance(), np.cov(values, rowvar=False))
+        np.testing.assert_allclose(merged.correlation(), single.correlation())
+
+    def test_rows_with_nan_are_skipped(self):
+        """Test that incomplete rows do not contribute."""
+        values = np.array([[1.0, 2.0], [2.0, np.nan], [3.0, 6.0]])
+
+        accumulator = CovarianceAccumulator(2).update(values)
+
+        assert accumulator.count == 2
+        np.testing.assert_allclose(accumulator.mean, [2.0, 4.0])
+
+
+class TestCorrelationMatrix:
+    """Test class for correlation_matrix and correlation_by_category functions."""
+
+    def test_numeric_columns_include_traffic_and_revenue(self, traffic_dataframe):
+        """Test that every numeric column and the derived revenue are covered."""
+        assert numeric_columns(traffic_dataframe) == [
+            "price", "quantity", "sessions", "page_views", "bounce_rate", "revenue"
+        ]
+
+    @pytest.mark.parametrize("n_workers", [1, 3])
+    def test_correlation_matrix_matches_pandas(self, traffic_dataframe, n_workers):
+        """Test chunked and partitioned results against pandas .corr()."""
+        result = correlation_matrix(traffic_dataframe, chunk_size=128, n_workers=n_workers)
+
+        expected = expected_correlation(traffic_dataframe)
+        pd.testing.assert_frame_equal(result, expected[result.columns].loc[result.index])
+
+    def test_correlation_matrix_does_not_modify_input(self, traffic_dataframe):
+        """Test that the input frame is left untouched."""
+        columns_before = list(traffic_dataframe.columns)
+
+        correlation_matrix(traffic_dataframe)
+
+        assert list(traffic_dataframe.columns) == columns_before
+
+    def test_correlation_by_category(self, traffic_dataframe):
+        """Test per-category matrices against pandas on each subset."""
+        result = correlation_by_category(traffic_dataframe, chunk_size=100)
+
+        assert set(result) == {"Electronics", "Clothing"}
+        subset = traffic_dataframe[traffic_dataframe["category"] == "Clothing"]
+        expected = expected_correlation(subset)
+        pd.testing.assert_frame_equal(result["Clothing"], expected[result["Clothing"].columns].loc[result["Clothing"].index])
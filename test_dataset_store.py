@@ -0,0 +1,174 @@
+import os
+import threading
+import time
+import pandas as pd
+import dataset_store
+from aggregates import get_sales_aggregate
+from dataset_store import ADMIN_ENV_VAR, DatasetStore, content_hash, file_content_hash, frame_nbytes
+from row_index import get_row_index
+
+
+def make_frame(n_rows):
+    return pd.DataFrame({
+        'date': pd.date_range('2023-01-01', periods=n_rows, freq='h'),
+        'category': ['A', 'B'] * (n_rows // 2),
+        'price': [1.0] * n_rows,
+        'quantity': [1] * n_rows,
+    })
+
+
+class TestDatasetStore:
+    """Test class for the shared DatasetStore."""
+
+    def test_identical_content_is_loaded_once(self):
+        """Test that two sessions uploading the same bytes share one frame."""
+        store = DatasetStore()
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return make_frame(10)
+
+        key = content_hash(b"date,category\n2023-01-01,A\n")
+        first = store.get_or_load(key, loader, name='a.csv', session_id='s1')
+        second = store.get_or_load(content_hash(b"date,category\n2023-01-01,A\n"), loader,
+                                   name='copy.csv', session_id='s2')
+
+        assert first is second
+        assert len(calls) == 1
+        usage = store.usage()
+        assert len(usage) == 1
+        assert usage[0]['sessions'] == 2
+        assert usage[0]['hits'] == 1
+        assert usage[0]['bytes'] == frame_nbytes(first)
+
+    def test_lru_eviction_past_budget(self):
+        """Test that the least recently used dataset is evicted once over budget."""
+        size = frame_nbytes(make_frame(100))
+        store = DatasetStore(budget_bytes=int(size * 2.5))
+
+        store.get_or_load('a', lambda: make_frame(100))
+        store.get_or_load('b', lambda: make_frame(100))
+        store.get_or_load('a', lambda: make_frame(100))
+        store.get_or_load('c', lambda: make_frame(100))
+
+        assert [item['key'] for item in store.usage()] == ['c', 'a']
+        assert store.evictions == 1
+        assert store.used_bytes() <= store.budget_bytes
+
+    def test_dataset_larger_than_budget_is_kept(self):
+        """Test that the dataset just loaded is returned and kept even if it exceeds the budget."""
+        store = DatasetStore(budget_bytes=1)
+        store.get_or_load('a', lambda: make_frame(10))
+        df = store.get_or_load('b', lambda: make_frame(10))
+
+        assert len(df) == 10
+        assert [item['key'] for item in store.usage()] == ['b']
+
+    def test_failed_load_is_not_cached(self):
+        """Test that a loader returning None is retried on the next request."""
+        store = DatasetStore()
+        assert store.get_or_load('a', lambda: None) is None
+        assert store.usage() == []
+        assert len(store.get_or_load('a', lambda: make_frame(4))) == 4
+
+    def test_concurrent_requests_wait_for_first_loader(self):
+        """Test that concurrent sessions do not parse the same dataset twice."""
+        store = DatasetStore()
+        calls = []
+
+        def loader():
+            calls.append(1)
+            time.sleep(0.05)
+            return make_frame(10)
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(store.get_or_load('a', loader)))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert all(result is results[0] for result in results)
+
+    def test_get_does_not_load(self):
+        """Test that get returns loaded datasets only, never waiting or loading."""
+        store = DatasetStore()
+        started, release = threading.Event(), threading.Event()
+
+        def slow_loader():
+            started.set()
+            release.wait(5)
+            return make_frame(4)
+
+        thread = threading.Thread(target=lambda: store.get_or_load('a', slow_loader))
+        thread.start()
+        started.wait(5)
+        assert store.get('a') is None
+        release.set()
+        thread.join()
+
+        assert len(store.get('a', session_id='s1')) == 4
+        assert store.get('missing') is None
+        assert store.usage()[0]['sessions'] == 1
+
+    def test_set_budget_evicts(self):
+        """Test that lowering the budget evicts datasets immediately."""
+        store = DatasetStore()
+        store.get_or_load('a', lambda: make_frame(10))
+        store.get_or_load('b', lambda: make_frame(10))
+
+        store.set_budget(frame_nbytes(make_frame(10)))
+
+        assert [item['key'] for item in store.usage()] == ['b']
+
+    def test_derived_structures_count_towards_budget(self):
+        """Test that the row index and aggregate of a stored frame are part of its footprint."""
+        store = DatasetStore()
+        df = store.get_or_load('a', lambda: make_frame(1_000))
+        assert store.used_bytes() == frame_nbytes(df)
+
+        index, aggregate = get_row_index(df), get_sales_aggregate(df)
+
+        assert store.used_bytes() == frame_nbytes(df) + index.nbytes() + aggregate.nbytes()
+        assert store.usage()[0]['bytes'] == store.used_bytes()
+
+
+def test_file_content_hash_matches_bytes(tmp_path):
+    """Test that hashing a file gives the same key as hashing its uploaded bytes."""
+    path = tmp_path / 'data.csv'
+    path.write_bytes(b"date,category,price,quantity\n2023-01-01,A,1,2\n")
+
+    assert file_content_hash(str(path)) == content_hash(path.read_bytes())
+
+
+def test_file_hash_memo_is_bounded(tmp_path, monkeypatch):
+    """Test that only the most recently hashed files are remembered."""
+    monkeypatch.setattr(dataset_store, 'FILE_HASH_MEMO_SIZE', 2)
+    monkeypatch.setattr(dataset_store, '_file_hashes', dataset_store.OrderedDict())
+    paths = []
+    for i in range(3):
+        paths.append(tmp_path / f'data{i}.csv')
+        paths[-1].write_bytes(f"date\n2023-01-0{i + 1}\n".encode())
+        file_content_hash(str(paths[-1]))
+
+    assert [key[0] for key in dataset_store._file_hashes] == [str(paths[1]), str(paths[2])]
+
+
+def test_admin_page_is_read_only_by_default(monkeypatch):
+    """Test that the admin page only offers budget and cleanup controls when enabled."""
+    from streamlit.testing.v1 import AppTest
+
+    page = os.path.join(os.path.dirname(__file__), 'pages', 'admin.py')
+    monkeypatch.delenv(ADMIN_ENV_VAR, raising=False)
+    at = AppTest.from_file(page).run()
+    assert not at.exception
+    assert not at.button and not at.number_input
+
+    monkeypatch.setenv(ADMIN_ENV_VAR, '1')
+    at = AppTest.from_file(page).run()
+    assert [button.label for button in at.button] == ["Применить бюджет", "Очистить хранилище"]
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks import bench_date_parsing
+from date_parsing import detect_date_format, parse_dates
+
+
+class TestParseDates:
+    """Test class for parse_dates."""
+
+    @pytest.mark.parametrize("values", [
+        ['2023-01-01', '2023-01-02', '2023-01-01', None, 'не дата', '2023-01-02'],
+        ['01.02.2023', '15.02.2023', '01.02.2023'],
+        ['2023-01-01 10:30:00', '2023-01-01 11:00:00', '2023-01-01 10:30:00'],
+        ['01/02/2023', '03/04/2023', '01/02/2023'],
+        [None, None],
+    ])
+    def test_matches_to_datetime(self, values):
+        """Test that parsing distinct values gives the same column as pd.to_datetime."""
+        series = pd.Series(values, index=np.arange(len(values)) * 10, name='Дата')
+
+        result = parse_dates(series)
+
+        pd.testing.assert_series_equal(result, pd.to_datetime(series, errors='coerce'))
+
+    def test_datetime_column_is_returned_unchanged(self):
+        """Test that an already parsed column (e.g. from Excel) is passed through."""
+        series = pd.Series(pd.to_datetime(['2023-01-01', '2023-01-02']))
+
+        assert parse_dates(series) is series
+
+    def test_detect_date_format(self):
+        """Test that the format is detected from the first non-empty string."""
+        assert detect_date_format(pd.Index(['', '2023-01-31'])) == '%Y-%m-%d'
+        assert detect_date_format(pd.Index([1, 2])) is None
+
+
+def test_date_parsing_benchmark_runs():
+    """Test that the benchmark runs at a small size."""
+    timings = bench_date_parsing(n_rows=10_000, n_dates=50, repeat=1)
+
+    assert set(timings) == {'to_datetime_rows', 'parse_dates_unique'}
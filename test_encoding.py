@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks import bench_category_filter
+from encoding import category_codes, category_lookup, category_mask
+
+
+@pytest.fixture
+def categories():
+    """Category column with a missing value."""
+    return pd.Series(['Дом', 'Одежда', None, 'Электроника', 'Дом', 'Книги'])
+
+
+class TestCategoryMask:
+    """Test class for the dictionary-encoded category filter."""
+
+    @pytest.mark.parametrize("selected", [[], ['Дом'], ['Дом', 'Книги'], ['Нет такой'], ['Одежда', 'Нет такой']])
+    def test_matches_isin(self, categories, selected):
+        """Test that the code lookup gives the same rows as isin for both encodings."""
+        expected = categories.isin(selected).to_numpy()
+
+        np.testing.assert_array_equal(category_mask(categories, selected), expected)
+        np.testing.assert_array_equal(category_mask(categories.astype('category'), selected), expected)
+
+    def test_plain_column_is_not_factorized(self, categories, monkeypatch):
+        """Test that a non-categorical column is filtered without encoding it on every call."""
+        import encoding
+
+        monkeypatch.setattr(encoding, 'category_codes', lambda values: pytest.fail("column was factorized"))
+
+        assert category_mask(categories, ['Дом']).tolist() == [True, False, False, False, True, False]
+
+    def test_categorical_codes_are_reused(self, categories):
+        """Test that a categorical column is not re-encoded."""
+        encoded = categories.astype('category')
+
+        codes, uniques = category_codes(encoded)
+
+        np.testing.assert_array_equal(codes, encoded.cat.codes.to_numpy())
+        assert list(uniques) == list(encoded.cat.categories)
+
+    def test_lookup_maps_missing_to_false(self):
+        """Test that the trailing lookup entry used by code -1 is never selected."""
+        lookup = category_lookup(pd.Index(['a', 'b']), ['a', 'b'])
+
+        assert lookup.tolist() == [True, True, False]
+
+
+def test_category_filter_benchmark_runs():
+    """Test that the benchmark runs at a small size and reports every timing."""
+    timings = bench_category_filter(n_rows=10_000, n_categories=100, n_selected=3, repeat=1)
+
+    assert set(timings) == {
+        'filter_isin_strings', 'filter_isin_categorical', 'filter_code_lookup',
+        'groupby_strings', 'groupby_codes', 'bincount_codes',
+    }
+    assert all(seconds >= 0 for seconds in timings.values())
@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+import pytest
+from forecasting import TOTAL_SERIES, build_series_matrix, forecast_by_category, forecast_matrix, min_observations
+
+
+@pytest.fixture
+def multi_category_dataframe():
+    """Fixture that provides 8 weeks of sales for three categories."""
+    n_days = 56
+    rng = np.random.default_rng(42)
+    dates = pd.date_range(start="2023-01-01", periods=n_days, freq="D")
+    data = {
+        "date": np.repeat(dates, 3),
+        "category": ["Electronics", "Clothing", "Home"] * n_days,
+        "price": rng.uniform(50.0, 500.0, 3 * n_days).round(2),
+        "quantity": rng.integers(1, 10, 3 * n_days),
+    }
+    return pd.DataFrame(data)
+
+
+class TestBuildSeriesMatrix:
+    """Test class for build_series_matrix function."""
+
+    def test_build_series_matrix_fills_missing_dates(self):
+        """Test that category/date combinations without sales become zero."""
+        data = {
+            "date": pd.to_datetime(["2023-01-01", "2023-01-01", "2023-01-02"]),
+            "category": ["Electronics", "Clothing", "Electronics"],
+            "quantity": [2, 1, 3],
+        }
+        dates, labels, matrix = build_series_matrix(pd.DataFrame(data), ["quantity"])
+
+        assert list(dates) == list(pd.to_datetime(["2023-01-01", "2023-01-02"]))
+        assert labels == [("quantity", "Clothing"), ("quantity", "Electronics"), ("quantity", TOTAL_SERIES)]
+        np.testing.assert_array_equal(matrix, [[1, 2, 3], [0, 3, 3]])
+
+    @pytest.mark.parametrize("as_categorical", [False, True])
+    def test_rows_without_category_count_in_total(self, as_categorical):
+        """Test that rows with a missing category are part of the total but get no series."""
+        category = pd.Series(["Electronics", None, "Electronics", None])
+        data = pd.DataFrame({
+            "date": pd.to_datetime(["2023-01-01", "2023-01-01", "2023-01-02", "2023-01-03"]),
+            "category": category.astype("category") if as_categorical else category,
+            "quantity": [2, 5, 3, 4],
+        })
+        dates, labels, matrix = build_series_matrix(data, ["quantity"])
+
+        assert len(dates) == 3
+        assert labels == [("quantity", "Electronics"), ("quantity", TOTAL_SERIES)]
+        np.testing.assert_array_equal(matrix, [[2, 7], [3, 3], [0, 4]])
+
+
+class TestForecastMatrix:
+    """Test class for forecast_matrix function."""
+
+    def test_linear_matches_polyfit_per_column(self):
+        """Test that the batched linear fit equals a separate polyfit for every column."""
+        rng = np.random.default_rng(0)
+        values = rng.normal(100, 10, size=(30, 5)) + np.arange(30)[:, None] * 2
+
+        _, mean, lower, upper = forecast_matrix(values, horizon=7, model="linear")
+
+        for k in range(values.shape[1]):
+            coeffs = np.polyfit(np.arange(30), values[:, k], 1)
+            np.testing.assert_allclose(mean[:, k], np.polyval(coeffs, np.arange(30, 37)))
+        assert np.all(lower < mean) and np.all(mean < upper)
+
+    def test_seasonal_naive_repeats_last_week(self):
+        """Test that the seasonal naive forecast repeats the last season."""
+        week = np.array([1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0])
+        values = np.tile(week, 3)[:, None]
+
+        _, mean, lower, upper = forecast_matrix(values, horizon=10, model="seasonal_naive")
+
+        np.testing.assert_array_equal(mean[:, 0], np.concatenate([week, week[:3]]))
+        # A perfectly periodic series has zero-width intervals
+        np.testing.assert_array_equal(lower, upper)
+
+    def test_holt_winters_tracks_trend_and_season(self):
+        """Test that Holt-Winters extrapolates a clean trend plus weekly pattern."""
+        t = np.arange(70)
+        pattern = np.array([0.0, -10.0, -5.0, 0.0, 5.0, 15.0, 10.0])
+        values = (100 + 2 * t + pattern[t % 7])[:, None]
+
+        _, mean, _, _ = forecast_matrix(values, horizon=7, model="holt_winters")
+
+        future = np.arange(70, 77)
+        expected = 100 + 2 * future + pattern[future % 7]
+        np.testing.assert_allclose(mean[:, 0], expected, rtol=0.05)
+
+    def test_unknown_model_raises(self):
+        """Test that an unknown model name is rejected."""
+        with pytest.raises(ValueError):
+            forecast_matrix(np.ones((20, 1)), model="arima")
+
+    @pytest.mark.parametrize("model,required", [("linear", 2), ("seasonal_naive", 7), ("holt_winters", 14)])
+    def test_min_observations(self, model, required):
+        """Test that each model accepts exactly its minimum length and rejects one less."""
+        assert min_observations(model) == required
+
+        forecast_matrix(np.ones((required, 1)), model=model)
+        with pytest.raises(ValueError):
+            forecast_matrix(np.ones((required - 1, 1)), model=model)
+
+
+class TestForecastByCategory:
+    """Test class for forecast_by_category function."""
+
+    def test_forecast_by_category_all_series(self, multi_category_dataframe):
+        """Test that one call returns forecasts for every category and the total."""
+        result = forecast_by_category(multi_category_dataframe, horizon=7, model="holt_winters")
+
+        assert len(result.series) == 8  # 2 metrics x (3 categories + total)
+        assert result.mean.shape == (7, 8)
+        assert result.forecast_dates[0] == pd.Timestamp("2023-02-26")
+
+        revenue_categories = [result.column(f"revenue:{c}") for c in ["Clothing", "Electronics", "Home"]]
+        np.testing.assert_allclose(
+            result.history[:, revenue_categories].sum(axis=1),
+            result.history[:, result.column(f"revenue:{TOTAL_SERIES}")],
+        )
@@ -0,0 +1,30 @@
+import gc
+import pandas as pd
+from frame_cache import FrameCache
+
+
+class TestFrameCache:
+    """Test class for the per-frame cache."""
+
+    def test_built_once_per_frame(self):
+        """Test that a value is built on first use and reused for the same frame object only."""
+        built = []
+        cache = FrameCache(lambda df: built.append(len(df)) or len(built))
+        df = pd.DataFrame({'a': [1, 2]})
+
+        assert cache.peek(df) is None
+        assert cache.get(df) == cache.get(df) == 1
+        assert cache.get(df.copy()) == 2
+        assert built == [2, 2]
+
+    def test_entry_dropped_with_frame(self):
+        """Test that the cached value does not outlive its frame."""
+        cache = FrameCache(lambda df: object())
+        df = pd.DataFrame({'a': [1]})
+        cache.get(df)
+        assert len(cache._entries) == 1
+
+        del df
+        gc.collect()
+
+        assert not cache._entries
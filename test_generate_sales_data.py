@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+from data_loader import load_data_file
+from generate_sales_data import iter_sales_chunks, rows_per_day, write_sales_file, zipf_weights
+
+
+class TestGenerator:
+    """Test class for the streaming sales data generator."""
+
+    def test_row_count_and_columns(self):
+        """Test that the chunks add up to the requested rows in date order."""
+        chunks = list(iter_sales_chunks(10_000, n_categories=20, n_days=60, chunk_rows=1_500))
+        df = pd.concat(chunks, ignore_index=True)
+
+        assert len(chunks) > 1
+        assert len(df) == 10_000
+        assert list(df.columns) == ['date', 'category', 'price', 'quantity']
+        assert df['date'].is_monotonic_increasing
+        assert df['date'].nunique() == 60
+        assert df['category'].nunique() <= 20
+        assert (df['quantity'] >= 1).all() and (df['price'] > 0).all()
+
+    def test_output_does_not_depend_on_chunk_size(self):
+        """Test that the same seed gives the same data for any chunk size."""
+        small = pd.concat(iter_sales_chunks(5_000, n_days=30, chunk_rows=100, seed=7), ignore_index=True)
+        large = pd.concat(iter_sales_chunks(5_000, n_days=30, chunk_rows=10_000, seed=7), ignore_index=True)
+        other = pd.concat(iter_sales_chunks(5_000, n_days=30, chunk_rows=10_000, seed=8), ignore_index=True)
+
+        pd.testing.assert_frame_equal(small, large)
+        assert not other.equals(large)
+
+    def test_zipf_skew(self):
+        """Test that category popularity follows the Zipf ranks."""
+        df = pd.concat(iter_sales_chunks(50_000, n_categories=100, skew=1.2, n_days=10), ignore_index=True)
+        counts = df['category'].value_counts()
+
+        assert counts.iloc[0] > 5 * counts.iloc[20]
+        np.testing.assert_allclose(zipf_weights(4, 0.0), [0.25] * 4)
+
+    def test_rows_per_day_follow_seasonality(self):
+        """Test that daily row counts sum exactly and follow the trend."""
+        counts = rows_per_day(100_000, 365)
+
+        assert counts.sum() == 100_000
+        assert counts[-30:].mean() > counts[:30].mean()
+
+
+class TestWriteSalesFile:
+    """Test class for write_sales_file."""
+
+    @pytest.mark.parametrize("suffix", ['.csv', '.xlsx', '.parquet'])
+    def test_written_file_loads(self, tmp_path, suffix):
+        """Test that every output format is readable by the loader."""
+        if suffix == '.parquet':
+            pytest.importorskip('pyarrow')
+        path = str(tmp_path / f"sales{suffix}")
+
+        written = write_sales_file(path, 2_000, chunk_rows=500, n_days=20)
+        df = load_data_file(path)
+
+        assert written == 2_000
+        assert len(df) == 2_000
+        assert df['date'].nunique() == 20
+
+    def test_excel_row_limit(self, tmp_path):
+        """Test that more rows than an Excel sheet holds are rejected."""
+        with pytest.raises(ValueError):
+            write_sales_file(str(tmp_path / 'sales.xlsx'), 2_000_000)
+
+    def test_unknown_suffix(self, tmp_path):
+        """Test that an unsupported output format is rejected."""
+        with pytest.raises(ValueError):
+            write_sales_file(str(tmp_path / 'sales.json'), 10)
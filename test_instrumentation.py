@@ -0,0 +1,104 @@
+import json
+import threading
+import tracemalloc
+import numpy as np
+import pandas as pd
+from analysis import calculate_sales_kpis
+from instrumentation import current_recorder, instrumented, recording, stage
+
+
+@instrumented('test.work')
+def work(n):
+    with stage('test.inner'):
+        return np.ones(n).sum()
+
+
+class TestInstrumentation:
+    """Test class for the stage timers."""
+
+    def test_disabled_records_nothing(self):
+        """Test that stages outside a recording are no-ops."""
+        assert current_recorder() is None
+        assert work(10) == 10
+        with stage('test.outside') as value:
+            assert value is None
+
+    def test_nested_stages(self):
+        """Test that nested stages are recorded with their depth in start order."""
+        with recording() as recorder:
+            with stage('test.outer'):
+                work(10)
+
+        report = recorder.to_dict()
+        assert [(item['name'], item['depth']) for item in report['stages']] == [
+            ('test.outer', 0), ('test.work', 1), ('test.inner', 2)
+        ]
+        outer, inner_work = report['stages'][0], report['stages'][1]
+        assert outer['seconds'] >= inner_work['seconds'] > 0
+        assert report['total_seconds'] >= outer['seconds']
+        assert all(item['peak_bytes'] is None for item in report['stages'])
+
+    def test_memory_peaks(self):
+        """Test that peak memory includes the allocations of nested stages."""
+        with recording(trace_memory=True) as recorder:
+            with stage('test.outer'):
+                work(1_000_000)
+
+        peaks = {record.name: record.peak_bytes for record in recorder.records}
+        assert peaks['test.inner'] >= 8_000_000
+        assert peaks['test.outer'] >= peaks['test.inner']
+
+    def test_concurrent_memory_recordings(self):
+        """Test that overlapping recordings share tracing and skip peaks they cannot isolate."""
+        opened, release = threading.Event(), threading.Event()
+
+        def other_session():
+            with recording(trace_memory=True):
+                opened.set()
+                release.wait(10)
+
+        with recording(trace_memory=True) as recorder:
+            thread = threading.Thread(target=other_session)
+            thread.start()
+            assert opened.wait(10)
+            with stage('test.shared'):
+                work(1_000)
+            release.set()
+            thread.join()
+            # The other recording ended without stopping the tracing still in use here
+            assert tracemalloc.is_tracing()
+            with stage('test.alone'):
+                work(1_000_000)
+
+        peaks = {record.name: record.peak_bytes for record in recorder.records}
+        assert peaks['test.shared'] is None
+        assert peaks['test.alone'] >= 8_000_000
+        assert not tracemalloc.is_tracing()
+
+    def test_library_functions_are_instrumented(self):
+        """Test that analysis functions report themselves as stages."""
+        df = pd.DataFrame({'date': pd.to_datetime(['2023-01-01']), 'price': [1.0], 'quantity': [2]})
+
+        with recording() as recorder:
+            calculate_sales_kpis(df)
+
+        assert [record.name for record in recorder.records] == ['analysis.calculate_sales_kpis']
+
+    def test_recording_is_per_thread(self):
+        """Test that stages run by other threads do not land in the recording."""
+        with recording() as recorder:
+            thread = threading.Thread(target=work, args=(10,))
+            thread.start()
+            thread.join()
+
+        assert recorder.records == []
+
+    def test_json_export(self):
+        """Test that the report is exported as JSON with metadata."""
+        with recording() as recorder:
+            work(10)
+        recorder.metadata['rows'] = 10
+
+        document = json.loads(recorder.to_json())
+        assert document['metadata'] == {'rows': 10}
+        assert document['stages'][0]['name'] == 'test.work'
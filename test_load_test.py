@@ -0,0 +1,52 @@
+import json
+import pytest
+from load_test import check_streamlit_internals, main, run_load_test, summarize_latencies
+
+
+class TestLoadTest:
+    """Test class for the concurrent-session load harness."""
+
+    def test_summarize_latencies(self):
+        """Test the latency percentiles."""
+        summary = summarize_latencies([0.1 * i for i in range(1, 11)])
+
+        assert summary['count'] == 10
+        assert summary['p50'] == pytest.approx(0.55)
+        assert summary['max'] == pytest.approx(1.0)
+        assert summarize_latencies([]) == {'count': 0}
+
+    def test_concurrent_sessions(self):
+        """Test that concurrent sessions upload, interact and are reported per level."""
+        reports = run_load_test([1, 2], n_rows=2_000, n_actions=3)
+
+        assert [report['sessions'] for report in reports] == [1, 2]
+        for report in reports:
+            assert report['errors'] == []
+            # One upload and three widget changes per session
+            assert report['reruns'] == 4 * report['sessions']
+            assert set(report['actions']) == {'initial', 'upload', 'chart', 'categories', 'dates'}
+            assert report['throughput'] > 0
+            assert report['latency']['p50'] <= report['latency']['p99']
+
+    def test_cli(self, tmp_path, capsys):
+        """Test the command line with distinct files and a JSON report."""
+        output = tmp_path / 'load.json'
+
+        code = main(['--sessions', '2', '--rows', '1000', '--actions', '2', '--distinct-files',
+                     '--output', str(output)])
+
+        assert code == 0
+        assert json.loads(output.read_text(encoding='utf-8'))[0]['distinct_files'] is True
+        assert 'запуск/с' in capsys.readouterr().out
+
+    def test_unsupported_streamlit_fails_clearly(self, monkeypatch, capsys):
+        """Test that missing Streamlit internals stop the harness with a clear message."""
+        from streamlit.testing.v1 import local_script_runner
+
+        check_streamlit_internals()
+        monkeypatch.delattr(local_script_runner, 'ScriptCache')
+
+        with pytest.raises(RuntimeError, match='ScriptCache'):
+            check_streamlit_internals()
+        assert main(['--sessions', '1', '--rows', '100', '--actions', '1']) == 1
+        assert 'local_script_runner.ScriptCache' in capsys.readouterr().err
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+from datetime import date
+from pipeline import CHART_TYPES, build_chart, compute_kpis, filter_data
+
+
+@pytest.fixture
+def sample_dataframe():
+    """Fixture that provides three weeks of sales for three categories."""
+    n_days = 21
+    data = {
+        "date": np.repeat(pd.date_range("2023-01-01", periods=n_days, freq="D"), 3),
+        "category": ["Electronics", "Clothing", "Home"] * n_days,
+        "price": [100.0, 50.0, 150.0] * n_days,
+        "quantity": np.arange(3 * n_days) % 4 + 1,
+    }
+    return pd.DataFrame(data)
+
+
+class TestPipeline:
+    """Test class for the dashboard pipeline stages."""
+
+    def test_filter_data_by_dates_and_categories(self, sample_dataframe):
+        """Test that both filters are applied."""
+        result = filter_data(sample_dataframe, date(2023, 1, 2), date(2023, 1, 3), ["Home"])
+
+        assert len(result) == 2
+        assert set(result["category"]) == {"Home"}
+
+    def test_compute_kpis_matches_totals(self, sample_dataframe):
+        """Test KPIs computed through the pipeline."""
+        total_revenue, _, total_quantity, _ = compute_kpis(sample_dataframe)
+
+        revenue = (sample_dataframe["price"] * sample_dataframe["quantity"]).sum()
+        assert total_revenue == revenue
+        assert total_quantity == sample_dataframe["quantity"].sum()
+
+    @pytest.mark.parametrize("chart_type", CHART_TYPES)
+    @pytest.mark.parametrize("categories", [[], ["Home"], ["Home", "Clothing"]])
+    def test_build_every_chart(self, sample_dataframe, chart_type, categories):
+        """Test that every chart type builds for any category selection."""
+        filtered_df = filter_data(sample_dataframe, date(2023, 1, 1), date(2023, 1, 21), categories)
+
+        fig = build_chart(chart_type, filtered_df, categories)
+
+        assert len(fig.data) > 0
@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+import pytest
+from plotting import (count_facet_pages, create_category_small_multiples, create_distribution_plot,
+                      create_forecast_plot)
+
+
+@pytest.fixture
+def many_categories_dataframe():
+    """Fixture that provides 10 days of sales for 30 categories."""
+    n_days, n_categories = 10, 30
+    data = {
+        "date": np.repeat(pd.date_range("2023-01-01", periods=n_days, freq="D"), n_categories),
+        "category": np.tile([f"Category {i}" for i in range(n_categories)], n_days),
+        "price": [100.0] * (n_days * n_categories),
+        "quantity": [2] * (n_days * n_categories),
+    }
+    return pd.DataFrame(data)
+
+
+class TestCategorySmallMultiples:
+    """Test class for create_category_small_multiples function."""
+
+    def test_count_facet_pages(self):
+        """Test page count rounding."""
+        assert count_facet_pages(0, 12) == 1
+        assert count_facet_pages(12, 12) == 1
+        assert count_facet_pages(13, 12) == 2
+        assert count_facet_pages(200, 12) == 17
+
+    def test_one_trace_per_category_on_page(self, many_categories_dataframe):
+        """Test that only the categories of the requested page are drawn."""
+        categories = many_categories_dataframe["category"].unique().tolist()
+
+        fig = create_category_small_multiples(many_categories_dataframe, categories, page=2, facets_per_page=12)
+
+        assert [trace.name for trace in fig.data] == categories[24:30]
+        assert "страница 3 из 3" in fig.layout.title.text
+
+    def test_facet_values(self, many_categories_dataframe):
+        """Test revenue and quantity values of a facet."""
+        revenue_fig = create_category_small_multiples(many_categories_dataframe, ["Category 1"])
+        quantity_fig = create_category_small_multiples(many_categories_dataframe, ["Category 1"], metric="quantity")
+
+        assert list(revenue_fig.data[0].y) == [200.0] * 10
+        assert list(quantity_fig.data[0].y) == [2] * 10
+
+    def test_all_facets_share_one_y_scale(self, many_categories_dataframe):
+        """Test that facets in different rows of the grid use the same y axis range."""
+        categories = many_categories_dataframe["category"].unique().tolist()[:6]
+
+        fig = create_category_small_multiples(many_categories_dataframe, categories, n_cols=3)
+
+        matches = [fig.layout[name].matches for name in fig.layout if name.startswith("yaxis")]
+        assert len(matches) == 6
+        assert matches.count(None) == 1
+        assert len(set(matches) - {None}) == 1
+
+
+class TestForecastPlot:
+    """Test class for create_forecast_plot function."""
+
+    @pytest.fixture
+    def daily_dataframe(self):
+        """Fixture with two categories over 12 days."""
+        dates = pd.date_range("2023-01-01", periods=12, freq="D")
+        return pd.DataFrame({
+            "date": np.repeat(dates, 2),
+            "category": ["A", "B"] * 12,
+            "price": np.linspace(10, 20, 24),
+            "quantity": np.arange(24) % 5 + 1,
+        })
+
+    def test_forecast_drawn_when_data_suffices(self, daily_dataframe):
+        """Test that the linear model forecasts 12 days of data without a note."""
+        fig = create_forecast_plot(daily_dataframe, model="linear")
+
+        assert any(trace.name == "Выручка (прогноз)" for trace in fig.data)
+        assert not fig.layout.annotations
+
+    def test_short_data_explains_missing_forecast(self, daily_dataframe):
+        """Test that Holt-Winters on 12 days draws the history with a note instead of a forecast."""
+        fig = create_forecast_plot(daily_dataframe, model="holt_winters")
+
+        assert [trace.name for trace in fig.data] == ["Выручка (факт)", "Количество (факт)"]
+        assert "минимум 14 дней" in fig.layout.annotations[0].text
+
+
+class TestDistributionPlot:
+    """Test class for create_distribution_plot function."""
+
+    @pytest.fixture
+    def priced_dataframe(self):
+        """Fixture with log-normal prices spanning several decades."""
+        rng = np.random.default_rng(3)
+        return pd.DataFrame({
+            "category": ["A"] * 2_000,
+            "price": rng.lognormal(4, 1.5, 2_000),
+            "quantity": np.ones(2_000, dtype=int),
+        })
+
+    def test_log_bins_tile_a_log10_axis(self, priced_dataframe):
+        """Test that log bars are placed in log10 space, touching without overlap, with value ticks."""
+        fig = create_distribution_plot(priced_dataframe, bins=20, log=True)
+
+        bar = fig.data[0]
+        edges = np.log10(priced_dataframe["price"].agg(["min", "max"]).to_numpy())
+        np.testing.assert_allclose(np.asarray(bar.x) - np.asarray(bar.width) / 2, np.linspace(*edges, 21)[:-1])
+        np.testing.assert_allclose(bar.width, (edges[1] - edges[0]) / 20)
+        assert fig.layout.xaxis.type != "log"
+        assert "100" in fig.layout.xaxis.ticktext
+        np.testing.assert_allclose(fig.layout.xaxis.tickvals[list(fig.layout.xaxis.ticktext).index("100")], 2)
+
+    def test_linear_bins_keep_value_axis(self, priced_dataframe):
+        """Test that linear bins are drawn at their centers with their real widths."""
+        fig = create_distribution_plot(priced_dataframe, bins=20)
+
+        bar = fig.data[0]
+        np.testing.assert_allclose(bar.customdata[0][0], priced_dataframe["price"].min())
+        np.testing.assert_allclose(np.asarray(bar.width), np.diff(np.asarray(bar.customdata)).ravel())
+        assert fig.layout.xaxis.tickvals is None
@@ -0,0 +1,92 @@
+import threading
+import numpy as np
+import pandas as pd
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from pipeline import CHART_TYPES, default_chart_options, filter_key, options_key
+from prewarm import ensure_prewarm, start_prewarm
+from stage_cache import StageCache
+
+
+@pytest.fixture
+def sample_dataframe():
+    """Fixture that provides three weeks of sales for two categories."""
+    n_days = 21
+    data = {
+        "date": np.repeat(pd.date_range("2023-01-01", periods=n_days, freq="D"), 2),
+        "category": ["Electronics", "Clothing"] * n_days,
+        "price": [100.0, 50.0] * n_days,
+        "quantity": np.arange(2 * n_days) % 4 + 1,
+    }
+    return pd.DataFrame(data)
+
+
+CATEGORIES = ["Electronics", "Clothing"]
+START, END = date(2023, 1, 1), date(2023, 1, 21)
+
+
+class TestPrewarm:
+    """Test class for background pre-warming."""
+
+    def test_prewarm_fills_every_chart(self, sample_dataframe):
+        """Test that KPIs and all chart variants are cached under the page's keys."""
+        cache = StageCache(stage_limits={"figure": 24})
+        key = filter_key("dataset", START, END, CATEGORIES)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            job = start_prewarm(cache, sample_dataframe, key, START, END, CATEGORIES, executor)
+            for future in job.futures:
+                future.result()
+
+        assert cache.contains("kpis", key)
+        for chart_type in CHART_TYPES:
+            options = default_chart_options(chart_type, CATEGORIES)
+            assert cache.contains("figure", (key, chart_type, options_key(options)))
+
+    def test_cancel_skips_pending_tasks(self, sample_dataframe):
+        """Test that cancelling a job stops the tasks that have not started."""
+        cache = StageCache(stage_limits={"figure": 24})
+        key = filter_key("dataset", START, END, CATEGORIES)
+        release = threading.Event()
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(release.wait)  # keep the only worker busy
+            job = start_prewarm(cache, sample_dataframe, key, START, END, CATEGORIES, executor)
+            job.cancel()
+            release.set()
+
+        assert job.done()
+        assert not cache.contains("kpis", key)
+
+    def test_page_waits_for_pending_stage(self, sample_dataframe):
+        """Test that the page reuses a stage computed in the background."""
+        cache = StageCache()
+        key = filter_key("dataset", START, END, CATEGORIES)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            start_prewarm(cache, sample_dataframe, key, START, END, CATEGORIES, executor)
+            kpis = cache.get_or_compute("kpis", key, lambda: pytest.fail("must reuse the background result"))
+
+        assert kpis[2] == sample_dataframe["quantity"].sum()
+
+    def test_ensure_prewarm_cancels_on_filter_change(self, sample_dataframe, monkeypatch):
+        """Test that changing the filters cancels an unfinished job."""
+        session_state = {}
+        cache = StageCache()
+        default = filter_key("dataset", START, END, CATEGORIES)
+        changed = filter_key("dataset", START, date(2023, 1, 10), CATEGORIES)
+        release = threading.Event()
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(release.wait)
+            monkeypatch.setattr("prewarm.get_prewarm_executor", lambda: executor)
+
+            job = ensure_prewarm(session_state, cache, "dataset", sample_dataframe, default, default,
+                                 START, END, CATEGORIES)
+            ensure_prewarm(session_state, cache, "dataset", sample_dataframe, default, changed,
+                           START, END, CATEGORIES)
+            release.set()
+
+        assert job.cancelled.is_set()
+        assert not cache.contains("kpis", default)
@@ -0,0 +1,131 @@
+import ast
+import cProfile
+import json
+import os
+import pstats
+import time
+import pytest
+from collections import Counter
+from generate_sales_data import write_sales_file
+from profile_session import (
+    SamplingProfiler, collapse_pstats, collapse_samples, main, run_profile, sample_hotspots
+)
+
+
+@pytest.fixture(scope="module")
+def sales_file(tmp_path_factory):
+    """Fixture writing a small generated sales file."""
+    path = str(tmp_path_factory.mktemp('profile') / 'sales.csv')
+    write_sales_file(path, 3_000, n_categories=8, n_days=40)
+    return path
+
+
+def busy(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def outer():
+    busy(0.05)
+    inner()
+
+
+def inner():
+    busy(0.1)
+
+
+class TestSamplingProfiler:
+    """Test class for the stack sampler."""
+
+    def test_samples_current_thread(self):
+        """Test that samples contain the nested calls of the profiled thread."""
+        with SamplingProfiler(interval=0.002) as sampler:
+            outer()
+
+        stacks = [stack for stack in sampler.samples if 'test_profile_session:outer' in stack]
+        assert stacks
+        assert any(stack[-2:] == ('test_profile_session:inner', 'test_profile_session:busy') for stack in stacks)
+
+    def test_collapse_and_hotspots(self):
+        """Test the collapsed stack format and self/inclusive counts."""
+        samples = Counter({('main', 'a', 'b'): 3, ('main', 'a'): 2, ('main', 'c'): 1})
+
+        assert collapse_samples(samples) == ['main;a 2', 'main;a;b 3', 'main;c 1']
+        assert sample_hotspots(samples, top=2) == [('b', 3, 3), ('a', 2, 5)]
+
+
+class TestCollapsePstats:
+    """Test class for the cProfile to collapsed stacks conversion."""
+
+    def test_paths_and_total_time(self):
+        """Test that cProfile time is attributed to the call paths."""
+        profile = cProfile.Profile()
+        profile.runcall(outer)
+        stats = pstats.Stats(profile)
+
+        lines = collapse_pstats(stats)
+        totals = {line.rsplit(' ', 1)[0]: int(line.rsplit(' ', 1)[1]) for line in lines}
+        inner_busy = [count for path, count in totals.items()
+                      if path.endswith('test_profile_session:inner;test_profile_session:busy')]
+
+        assert inner_busy and sum(inner_busy) >= 50_000
+        assert sum(totals.values()) == pytest.approx(1e6 * stats.total_tt, rel=0.05)
+
+
+class TestRunProfile:
+    """Test class for the replayed session."""
+
+    @pytest.mark.parametrize("profiler", ['sampling', 'cprofile'])
+    def test_outputs(self, sales_file, tmp_path, profiler):
+        """Test that every profiler writes stacks, hotspots and step timings."""
+        steps = [{'chart': "Анализ по категориям"}, {'categories': 'top2'}, {'start': 'half'}]
+
+        result = run_profile(sales_file, steps, profiler, str(tmp_path), top=5, interval=0.001)
+
+        timings = json.loads(open(result['paths']['steps'], encoding='utf-8').read())
+        assert [timing['step'] for timing in timings] == ['load', 0, 1, 2]
+        assert timings[2]['categories'] == 2
+        assert timings[3]['rows'] < timings[2]['rows']
+        assert os.path.getsize(result['paths']['stacks']) > 0
+        assert len(result['hotspots']) <= 6
+        if profiler == 'cprofile':
+            assert os.path.exists(result['paths']['profile'])
+
+    def test_unknown_profiler(self, sales_file, tmp_path):
+        """Test that an unknown profiler is rejected."""
+        with pytest.raises(ValueError):
+            run_profile(sales_file, [], 'perf', str(tmp_path))
+
+    def test_cli_with_script(self, sales_file, tmp_path, capsys):
+        """Test the command line with a JSON script."""
+        script = tmp_path / 'steps.json'
+        script.write_text(json.dumps([{'chart': "Распределение цен и выручки"}]), encoding='utf-8')
+
+        code = main([sales_file, '--script', str(script), '--output-dir', str(tmp_path / 'out'), '--no-cache'])
+
+        assert code == 0
+        assert os.path.exists(tmp_path / 'out' / 'hotspots.txt')
+        assert 'Результаты' in capsys.readouterr().out
+
+
+def pipeline_calls(path, function_names):
+    """Returns the names imported from pipeline that the given functions of a file call."""
+    tree = ast.parse(open(path, encoding='utf-8').read())
+    imported = {alias.name for node in ast.walk(tree)
+                if isinstance(node, ast.ImportFrom) and node.module == 'pipeline' for alias in node.names}
+    functions = [node for node in ast.walk(tree)
+                 if isinstance(node, ast.FunctionDef) and node.name in function_names]
+    return {node.func.id for function in functions for node in ast.walk(function)
+            if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in imported}
+
+
+def test_replay_calls_what_the_page_calls():
+    """Test that the replay loads and queries data through the same pipeline functions as the dashboard."""
+    here = os.path.dirname(__file__)
+
+    page = pipeline_calls(os.path.join(here, 'pages', 'home.py'), {'_load_indexed', 'render_dashboard'})
+    replayed = pipeline_calls(os.path.join(here, 'profile_session.py'), {'replay', 'run_profile'})
+
+    assert {'index_dataset', 'compute_aggregate_kpis', 'filter_data', 'build_chart'} <= page
+    assert replayed == page
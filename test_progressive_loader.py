@@ -0,0 +1,196 @@
+import os
+import threading
+import pandas as pd
+import pytest
+import progressive_loader
+from aggregates import get_sales_aggregate
+from analysis import calculate_sales_kpis
+from benchmarks import BenchmarkUpload
+from data_loader import load_uploaded_data, prepare_loaded_chunk
+from dataset_store import get_dataset_store
+from generate_sales_data import write_sales_file
+from progressive_loader import (
+    PROGRESSIVE_LOAD_KEY, ProgressiveLoad, cancel_progressive_load, ensure_progressive_load, iter_raw_chunks,
+    progressive_load_pending
+)
+
+XLSX_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+@pytest.fixture(scope="module")
+def sales_files(tmp_path_factory):
+    """Fixture writing the same generated sales data as CSV and xlsx."""
+    directory = tmp_path_factory.mktemp('progressive')
+    paths = {}
+    for suffix in ('.csv', '.xlsx'):
+        paths[suffix] = str(directory / f"sales{suffix}")
+        write_sales_file(paths[suffix], 5_000, n_categories=12, n_days=50)
+    return paths
+
+
+def upload(path, file_type="text/csv"):
+    uploaded = BenchmarkUpload(open(path, 'rb').read(), name=path.rsplit('/', 1)[-1])
+    uploaded.type = file_type
+    return uploaded
+
+
+class TestProgressiveLoad:
+    """Test class for the background chunked loader."""
+
+    @pytest.mark.parametrize("suffix,file_type", [('.csv', "text/csv"), ('.xlsx', XLSX_TYPE)])
+    def test_result_matches_one_shot_load(self, sales_files, suffix, file_type):
+        """Test that the finished frame equals load_uploaded_data of the whole file."""
+        job = ProgressiveLoad('key', upload(sales_files[suffix], file_type), chunk_rows=700).start()
+
+        assert job.wait(60)
+        assert job.error is None
+        assert job.version == 8
+        assert job.rows_loaded == 5_000
+        result = job.take_result()
+        pd.testing.assert_frame_equal(result, load_uploaded_data(upload(sales_files[suffix], file_type)))
+        assert job.finalized
+        assert job.progress().preview is None
+
+    def test_chunks_report_progress(self, sales_files):
+        """Test that CSV chunks report a growing fraction of the file."""
+        fractions = [fraction for _, fraction in iter_raw_chunks(upload(sales_files['.csv']), chunk_rows=1_000)]
+
+        assert len(fractions) == 5
+        assert fractions == sorted(fractions)
+        assert fractions[-1] == 1.0
+
+    def test_progress_before_completion(self, sales_files, monkeypatch):
+        """Test that the first chunk and running KPIs are available while the rest is still being read."""
+        release = threading.Event()
+        chunks = list(iter_raw_chunks(upload(sales_files['.csv']), chunk_rows=2_000))
+
+        def gated_chunks(uploaded_file, chunk_rows):
+            yield chunks[0]
+            release.wait(10)
+            yield from chunks[1:]
+
+        monkeypatch.setattr(progressive_loader, 'iter_raw_chunks', gated_chunks)
+        job = ProgressiveLoad('key', upload(sales_files['.csv']), chunk_rows=2_000).start()
+        try:
+            while job.version == 0 and not job.done():
+                job.wait(0.01)
+            progress = job.progress()
+
+            assert not job.done()
+            assert (progress.version, progress.rows) == (1, 2_000)
+            assert len(progress.preview) == 2_000
+            assert pd.api.types.is_datetime64_any_dtype(progress.preview['date'])
+            first_chunk = prepare_loaded_chunk(chunks[0][0])
+            assert progress.aggregate.kpis() == pytest.approx(calculate_sales_kpis(first_chunk))
+            assert job.take_result() is None
+        finally:
+            release.set()
+        assert job.wait(10)
+        assert job.progress().preview is progress.preview
+        assert job.progress().aggregate.n_rows == 5_000
+        assert len(job.take_result()) == 5_000
+
+    def test_running_aggregate_becomes_final(self, sales_files):
+        """Test that the finished frame reuses the running aggregate, which matches its exact KPIs."""
+        job = ProgressiveLoad('key', upload(sales_files['.csv']), chunk_rows=700).start()
+        assert job.wait(60)
+        aggregate = job.progress().aggregate
+
+        result = job.take_result()
+
+        assert get_sales_aggregate(result) is aggregate
+        assert aggregate.kpis() == pytest.approx(calculate_sales_kpis(result))
+
+    def test_missing_date_column(self, tmp_path):
+        """Test that a file without dates ends the load with an error."""
+        path = tmp_path / 'bad.csv'
+        path.write_text("category,price\nA,1\n", encoding='utf-8')
+
+        job = ProgressiveLoad('key', upload(str(path))).start()
+
+        assert job.wait(10)
+        assert job.error == "Колонка 'date' не найдена в данных."
+        assert job.take_result() is None
+
+
+class TestSessionLoad:
+    """Test class for the per-session load management."""
+
+    def test_ensure_and_cancel(self, sales_files):
+        """Test that a session keeps one load per file and replaces it for another file."""
+        session_state = {}
+
+        first = ensure_progressive_load(session_state, 'a', upload(sales_files['.csv']))
+        assert ensure_progressive_load(session_state, 'a', upload(sales_files['.csv'])) is first
+        second = ensure_progressive_load(session_state, 'b', upload(sales_files['.csv']))
+
+        assert second is not first
+        assert first.cancelled.is_set()
+        assert second.wait(30)
+        assert progressive_load_pending(session_state)
+        second.take_result()
+        assert not progressive_load_pending(session_state)
+
+        cancel_progressive_load(session_state)
+        assert PROGRESSIVE_LOAD_KEY not in session_state
+
+    def test_dashboard_finishes_progressive_upload(self, sales_files, monkeypatch):
+        """Test that the page follows a background load to the final KPIs."""
+        from streamlit.testing.v1 import AppTest
+
+        monkeypatch.setattr(progressive_loader, 'PROGRESSIVE_MIN_BYTES', 0)
+        monkeypatch.setattr(progressive_loader, 'DEFAULT_CHUNK_ROWS', 1_000)
+        monkeypatch.setattr(progressive_loader, 'POLL_SECONDS', 0.01)
+        data = open(sales_files['.csv'], 'rb').read()
+
+        at = AppTest.from_file(os.path.join(os.path.dirname(__file__), 'pages', 'home.py'), default_timeout=60)
+        at.run()
+        at.sidebar.file_uploader[0].upload('sales.csv', data, 'text/csv').run()
+
+        total_revenue = calculate_sales_kpis(load_uploaded_data(upload(sales_files['.csv'])))[0]
+        assert not at.exception
+        assert at.metric[0].value == f"{total_revenue:,.0f} руб."
+        assert at.sidebar.success[0].value == "Файл успешно загружен!"
+        assert not progressive_load_pending(at.session_state)
+
+    def test_dashboard_preview_while_loading(self, sales_files, monkeypatch):
+        """Test that the page shows running KPIs, a chart and the first rows while the file is read."""
+        from streamlit.testing.v1 import AppTest
+
+        release = threading.Event()
+        original = progressive_loader.iter_raw_chunks
+
+        def gated_chunks(uploaded_file, chunk_rows):
+            chunks = original(uploaded_file, chunk_rows)
+            yield next(chunks)
+            release.wait(30)
+            yield from chunks
+
+        monkeypatch.setattr(progressive_loader, 'PROGRESSIVE_MIN_BYTES', 0)
+        monkeypatch.setattr(progressive_loader, 'DEFAULT_CHUNK_ROWS', 1_000)
+        monkeypatch.setattr(progressive_loader, 'iter_raw_chunks', gated_chunks)
+        # Render single reruns instead of following the load
+        monkeypatch.setattr(progressive_loader, 'progressive_load_pending', lambda session_state: False)
+        data = open(sales_files['.csv'], 'rb').read()
+        # The same upload may already be in the process-wide store from an earlier test
+        get_dataset_store().clear()
+
+        at = AppTest.from_file(os.path.join(os.path.dirname(__file__), 'pages', 'home.py'), default_timeout=60)
+        at.run()
+        try:
+            at.sidebar.file_uploader[0].upload('sales.csv', data, 'text/csv').run()
+            job = at.session_state[PROGRESSIVE_LOAD_KEY]
+            while job.version == 0 and not job.done():
+                job.wait(0.01)
+            at.run()
+
+            first_rows = pd.read_csv(sales_files['.csv'], nrows=1_000)
+            assert not at.exception
+            assert not job.done()
+            assert "прочитано 1,000 строк" in at.get('progress')[0].proto.text
+            assert len(at.get('plotly_chart')) == 1
+            assert len(at.dataframe[0].value) == 100
+            assert at.metric[2].value == f"{first_rows['quantity'].sum():,}"
+        finally:
+            release.set()
+        assert job.wait(30)
@@ -0,0 +1,167 @@
+import asyncio
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from datetime import date
+from urllib.parse import parse_qs, urlencode, urlsplit
+from analysis import calculate_sales_kpis, get_filtered_data
+from query_service import AggregateStore, QueryService, default_targets, run_load
+
+
+@pytest.fixture
+def sample_dataframe():
+    """Fixture that provides two weeks of sales with several rows per day and category."""
+    rng = np.random.default_rng(9)
+    n_rows = 300
+    data = {
+        "date": pd.to_datetime("2023-01-01") + pd.to_timedelta(rng.integers(0, 14, n_rows), unit="D"),
+        "category": rng.choice(["Electronics", "Clothing", "Home"], n_rows),
+        "price": rng.uniform(10.0, 100.0, n_rows).round(2),
+        "quantity": rng.integers(1, 5, n_rows),
+    }
+    return pd.DataFrame(data).sort_values("date").reset_index(drop=True)
+
+
+class TestAggregateStore:
+    """Test class for AggregateStore."""
+
+    def test_kpis_match_calculate_sales_kpis(self, sample_dataframe):
+        """Test that KPIs from the aggregate equal the row-level computation."""
+        store = AggregateStore(sample_dataframe)
+
+        result = store.kpis(date(2023, 1, 3), date(2023, 1, 9), ["Home", "Clothing"])
+
+        filtered = get_filtered_data(sample_dataframe, date(2023, 1, 3), date(2023, 1, 9))
+        filtered = filtered[filtered["category"].isin(["Home", "Clothing"])]
+        expected = calculate_sales_kpis(filtered)
+        assert result["total_revenue"] == pytest.approx(expected[0])
+        assert result["avg_daily_revenue"] == pytest.approx(expected[1])
+        assert result["total_quantity"] == expected[2]
+        assert result["avg_daily_quantity"] == pytest.approx(expected[3])
+
+    def test_daily_series(self, sample_dataframe):
+        """Test daily series against a groupby over the raw rows."""
+        store = AggregateStore(sample_dataframe)
+
+        result = store.daily(categories=["Electronics"])
+
+        subset = sample_dataframe[sample_dataframe["category"] == "Electronics"]
+        expected = subset.groupby("date")["quantity"].sum()
+        assert result["quantity"] == expected.tolist()
+        assert result["date"][0] == str(expected.index[0].date())
+
+    def test_summary_rows(self, sample_dataframe):
+        """Test row counts per category."""
+        summary = AggregateStore(sample_dataframe).summary()
+
+        assert summary["rows"] == len(sample_dataframe)
+        assert sum(c["rows"] for c in summary["categories"].values()) == len(sample_dataframe)
+
+
+class TestQueryService:
+    """Test class for QueryService."""
+
+    def test_identical_requests_are_cached(self, sample_dataframe):
+        """Test request-level caching regardless of parameter order."""
+        service = QueryService(AggregateStore(sample_dataframe))
+
+        status, first = service.handle("/kpis?start=2023-01-02&categories=Home")
+        _, second = service.handle("/kpis?categories=Home&start=2023-01-02")
+
+        assert status == 200
+        assert first == second
+        assert service.cache_hits == 1
+
+    def test_errors(self, sample_dataframe):
+        """Test unknown paths and invalid dates."""
+        service = QueryService(AggregateStore(sample_dataframe))
+
+        assert service.handle("/unknown")[0] == 404
+        assert service.handle("/kpis?start=not-a-date")[0] == 400
+
+    def test_unexpected_error_is_500(self, sample_dataframe, monkeypatch):
+        """Test that an unexpected failure is answered with 500 instead of dropping the connection."""
+        service = QueryService(AggregateStore(sample_dataframe))
+        monkeypatch.setattr(service.store, "kpis", lambda **filters: 1 / 0)
+
+        status, body = service.handle("/kpis")
+
+        assert status == 500
+        assert "error" in json.loads(body)
+
+    def test_targets_without_categories(self):
+        """Test that targets can be built for a dataset without categories."""
+        targets = default_targets([], date(2023, 1, 1), date(2023, 1, 10), n_targets=5)
+
+        assert len(targets) == 6
+        assert all("category" not in target for target in targets)
+
+    def test_targets_encode_category_names(self):
+        """Test that category names with separators and non-ASCII characters survive the query string."""
+        names = ["Дом & сад", "Одежда, обувь"]
+
+        targets = default_targets(names, date(2023, 1, 1), date(2023, 1, 10), n_targets=20)
+
+        for target in targets[1:]:
+            assert target.isascii()
+            assert set(parse_qs(urlsplit(target).query)["category"]) <= set(names)
+
+    def test_non_ascii_categories_over_http(self, sample_dataframe):
+        """Test that encoded and raw UTF-8 category names select the same rows over the socket as in-process."""
+        names = {"Electronics": "Электроника", "Clothing": "Одежда, обувь", "Home": "Дом & сад"}
+        df = sample_dataframe.assign(category=sample_dataframe["category"].map(names))
+        service = QueryService(AggregateStore(df))
+        expected = {name: service.store.kpis(categories=[name]) for name in names.values()}
+
+        async def fetch(port, target):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"GET " + target + b" HTTP/1.1\r\nConnection: close\r\n\r\n")
+            response = await reader.read()
+            writer.close()
+            head, body = response.split(b"\r\n\r\n", 1)
+            return int(head.split()[1]), json.loads(body)
+
+        async def scenario():
+            server = await service.start("127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                encoded = {}
+                for name in names.values():
+                    encoded[name] = await fetch(port, f"/kpis?{urlencode({'category': name})}".encode())
+                raw = await fetch(port, "/kpis?category=Электроника".encode("utf-8"))
+                invalid = await fetch(port, b"/kpis?category=\xff")
+            return encoded, raw, invalid
+
+        encoded, raw, invalid = asyncio.run(scenario())
+
+        for name, (status, body) in encoded.items():
+            assert status == 200
+            assert body == pytest.approx(expected[name])
+            assert body["total_revenue"] > 0
+        assert raw == (200, pytest.approx(expected["Электроника"]))
+        assert invalid[0] == 400
+
+    def test_server_and_load_generator(self, sample_dataframe):
+        """Test the HTTP server end to end with the bundled load generator."""
+        service = QueryService(AggregateStore(sample_dataframe))
+        store = service.store
+
+        async def scenario():
+            server = await service.start("127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            async with server:
+                targets = default_targets(store.all_categories, store.min_date, store.max_date, n_targets=20)
+                load = await run_load("127.0.0.1", port, targets, n_requests=200, concurrency=4)
+
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.write(b"GET /stats HTTP/1.1\r\nConnection: close\r\n\r\n")
+                response = await reader.read()
+                writer.close()
+            return load, json.loads(response.split(b"\r\n\r\n", 1)[1])
+
+        load, stats = asyncio.run(scenario())
+
+        assert load["count"] == 200
+        assert load["p99_ms"] >= load["p50_ms"]
+        assert stats["count"] == 200
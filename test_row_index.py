@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+import pytest
+from datetime import date
+from analysis import get_filtered_data
+from benchmarks import bench_row_index
+from row_index import RowIndex, get_row_index
+
+
+@pytest.fixture
+def sales_df():
+    """Date-sorted sales frame with a categorical category column."""
+    rng = np.random.default_rng(1)
+    n_rows = 3000
+    dates = np.sort(np.datetime64('2023-01-01') + rng.integers(0, 120, n_rows).astype('timedelta64[D]'))
+    return pd.DataFrame({
+        'date': pd.to_datetime(dates),
+        'category': pd.Categorical(rng.choice(['A', 'B', 'C', 'D', 'E'], n_rows)),
+        'price': rng.random(n_rows),
+        'quantity': rng.integers(1, 5, n_rows),
+    })
+
+
+def reference_filter(df, start, end, categories):
+    filtered = get_filtered_data(df, start, end)
+    if categories:
+        filtered = filtered[filtered['category'].isin(categories)]
+    return filtered
+
+
+class TestRowIndex:
+    """Test class for RowIndex."""
+
+    @pytest.mark.parametrize("start,end,categories", [
+        (date(2023, 1, 1), date(2023, 4, 30), []),
+        (date(2023, 2, 1), date(2023, 2, 15), ['B']),
+        (date(2023, 1, 10), date(2023, 3, 1), ['A', 'E', 'C']),
+        (date(2023, 3, 1), date(2023, 2, 1), ['A']),
+        (date(2023, 1, 1), date(2023, 4, 30), ['нет']),
+    ])
+    def test_select_matches_masks(self, sales_df, start, end, categories):
+        """Test that the index selects exactly the rows of the date and category masks."""
+        expected = reference_filter(sales_df, start, end, categories)
+
+        result = RowIndex(sales_df).select(sales_df, start, end, categories)
+
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_unsorted_frame_falls_back_to_masks(self, sales_df):
+        """Test that a frame not sorted by date still gives the same rows."""
+        shuffled = sales_df.sample(frac=1, random_state=0)
+        index = RowIndex(shuffled)
+        expected = reference_filter(shuffled, date(2023, 2, 1), date(2023, 3, 1), ['A', 'D'])
+
+        assert not index.dates_sorted
+        pd.testing.assert_frame_equal(index.select(shuffled, date(2023, 2, 1), date(2023, 3, 1), ['A', 'D']), expected)
+
+    def test_object_categories_with_missing_values(self, sales_df):
+        """Test that string categories with missing values are indexed."""
+        df = sales_df.assign(category=sales_df['category'].astype(object))
+        df.loc[::7, 'category'] = None
+        expected = reference_filter(df, date(2023, 1, 1), date(2023, 4, 30), ['A', 'B'])
+
+        pd.testing.assert_frame_equal(RowIndex(df).select(df, date(2023, 1, 1), date(2023, 4, 30), ['A', 'B']), expected)
+
+    def test_all_categories_selected_is_a_date_slice(self, sales_df):
+        """Test that selecting every category returns the date slice itself, without merging postings."""
+        index = RowIndex(sales_df)
+        lo, hi = index.date_slice(date(2023, 1, 20), date(2023, 3, 10))
+
+        rows = index.rows(date(2023, 1, 20), date(2023, 3, 10), ['A', 'B', 'C', 'D', 'E'])
+
+        np.testing.assert_array_equal(rows, np.arange(lo, hi))
+
+    def test_all_categories_exclude_missing(self, sales_df):
+        """Test that selecting every category still drops rows without a category, like isin."""
+        df = sales_df.assign(category=sales_df['category'].astype(object))
+        df.loc[::7, 'category'] = None
+        categories = ['A', 'B', 'C', 'D', 'E']
+        expected = reference_filter(df, date(2023, 1, 20), date(2023, 3, 10), categories)
+
+        pd.testing.assert_frame_equal(RowIndex(df).select(df, date(2023, 1, 20), date(2023, 3, 10), categories),
+                                      expected)
+
+    def test_posting_lists_are_ascending(self, sales_df):
+        """Test that every posting list holds the category's rows in ascending order."""
+        index = RowIndex(sales_df)
+
+        for code, category in enumerate(index.categories):
+            postings = index.posting_list(code + 1)
+            assert np.all(np.diff(postings) > 0)
+            assert (sales_df['category'].iloc[postings] == category).all()
+
+    def test_index_is_built_once_per_frame(self, sales_df):
+        """Test that get_row_index reuses the index of the same frame object."""
+        assert get_row_index(sales_df) is get_row_index(sales_df)
+        assert get_row_index(sales_df.copy()) is not get_row_index(sales_df)
+
+
+def test_row_index_benchmark_runs():
+    """Test that the benchmark runs at a small size."""
+    timings = bench_row_index(n_rows=20_000, n_categories=50, repeat=1)
+
+    assert {'index_build', 'filter_masks', 'filter_row_index'} <= set(timings)
@@ -0,0 +1,61 @@
+import pytest
+from stage_cache import StageCache, get_stage_cache
+
+
+class TestStageCache:
+    """Test class for StageCache."""
+
+    def test_get_or_compute_runs_once_per_key(self):
+        """Test that a stage is computed only when its key changes."""
+        cache = StageCache()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return len(calls)
+
+        assert cache.get_or_compute("kpis", ("a", 1), compute) == 1
+        assert cache.get_or_compute("kpis", ("a", 1), compute) == 1
+        assert cache.get_or_compute("kpis", ("a", 2), compute) == 2
+        assert len(calls) == 2
+
+    def test_stages_are_independent(self):
+        """Test that the same key in different stages holds different values."""
+        cache = StageCache()
+        cache.put("filter", "key", "filtered")
+        cache.put("figure", "key", "figure")
+
+        cache.invalidate("figure")
+
+        assert cache.get("filter", "key") == "filtered"
+        assert not cache.contains("figure", "key")
+
+    def test_lru_eviction_per_stage(self):
+        """Test that the least recently used entry of a stage is evicted."""
+        cache = StageCache(max_entries=2)
+        cache.put("figure", 1, "one")
+        cache.put("figure", 2, "two")
+        cache.get("figure", 1)
+        cache.put("figure", 3, "three")
+
+        assert cache.contains("figure", 1)
+        assert not cache.contains("figure", 2)
+        assert cache.contains("figure", 3)
+
+    def test_rerun_events(self):
+        """Test that hits and misses of a rerun are recorded and logged."""
+        cache = StageCache()
+        cache.put("load", "data", "df")
+
+        started = cache.start_rerun()
+        cache.get_or_compute("load", "data", lambda: pytest.fail("must not recompute"))
+        cache.get_or_compute("filter", "f", lambda: "filtered")
+
+        assert [(stage, hit) for stage, hit, _ in cache.events] == [("load", True), ("filter", False)]
+        assert cache.log_rerun(started) >= 0
+
+    def test_get_stage_cache_is_stored_in_session(self):
+        """Test that the session keeps a single cache instance."""
+        session_state = {}
+
+        assert get_stage_cache(session_state) is get_stage_cache(session_state)
@@ -0,0 +1,165 @@
+import io
+import os
+import tracemalloc
+import numpy as np
+import pandas as pd
+import pytest
+import table_export
+from openpyxl import load_workbook
+from generate_sales_data import write_sales_file
+from table_export import export_table, iter_table_chunks, write_table_csv, write_table_xlsx
+from table_view import TABLE_COLUMNS, table_rows, table_sort_order
+
+
+@pytest.fixture
+def sample_df():
+    """Fixture with a small loaded-like frame, including characters that need escaping."""
+    return pd.DataFrame({
+        'date': pd.to_datetime(['2023-01-01', '2023-01-02', '2023-01-02', '2023-01-03', '2023-01-05']),
+        'category': pd.Categorical(['Электроника', 'A & B <дом>', 'Одежда', 'Электроника', 'Книги\x01']),
+        'price': [100.5, 200.0, np.nan, 50.25, 10.0],
+        'quantity': np.array([2, 1, 3, 4, 5], dtype=np.int16),
+    })
+
+
+class CountingSink(io.RawIOBase):
+    """Binary sink keeping only the number of bytes written."""
+
+    def __init__(self):
+        super().__init__()
+        self.size = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.size += len(data)
+        return len(data)
+
+
+class TestTableChunks:
+    """Test class for the chunked table rows."""
+
+    def test_chunks_follow_order(self, sample_df):
+        """Test that the chunks cover the sorted table with derived revenue."""
+        order = table_sort_order(sample_df, 'quantity', ascending=False)
+
+        chunks = list(iter_table_chunks(sample_df, order, chunk_rows=2))
+
+        assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+        pd.testing.assert_frame_equal(pd.concat(chunks), table_rows(sample_df, order))
+        assert list(chunks[0].columns) == TABLE_COLUMNS
+
+    def test_empty_table(self, sample_df):
+        """Test that an empty table still yields its header."""
+        chunks = list(iter_table_chunks(sample_df.iloc[:0]))
+
+        assert len(chunks) == 1 and chunks[0].empty
+
+
+class TestCsvExport:
+    """Test class for the streaming CSV export."""
+
+    def test_round_trip(self, sample_df):
+        """Test that the CSV holds every row once, with one header, in table order."""
+        order = table_sort_order(sample_df, 'revenue', ascending=True)
+        buffer = io.BytesIO()
+
+        assert write_table_csv(sample_df, buffer, order, chunk_rows=2) == 5
+
+        back = pd.read_csv(io.BytesIO(buffer.getvalue()), parse_dates=['date'])
+        expected = table_rows(sample_df, order).reset_index(drop=True)
+        pd.testing.assert_frame_equal(back, expected, check_dtype=False, check_categorical=False)
+        assert not buffer.closed
+
+    def test_memory_bounded_by_chunk(self, tmp_path):
+        """Test that the traced memory depends on the chunk size, not on the size of the table."""
+        path = tmp_path / 'sales.csv'
+        write_sales_file(str(path), 30_000, n_categories=20, n_days=30)
+        df = pd.read_csv(path, parse_dates=['date'])
+
+        peaks, sizes = [], []
+        for n_rows in (6_000, 30_000):
+            sink = CountingSink()
+            tracemalloc.start()
+            try:
+                write_table_csv(df.iloc[:n_rows], sink, chunk_rows=1_000)
+                peaks.append(tracemalloc.get_traced_memory()[1])
+            finally:
+                tracemalloc.stop()
+            sizes.append(sink.size)
+
+        assert sizes[1] > 4 * sizes[0]
+        assert peaks[1] < 1.5 * peaks[0]
+
+
+class TestExcelExport:
+    """Test class for the streaming Excel export."""
+
+    def test_round_trip(self, sample_df):
+        """Test that Excel reads back the same table, with dates, numbers and empty cells."""
+        buffer = io.BytesIO()
+
+        assert write_table_xlsx(sample_df, buffer, chunk_rows=2) == 5
+
+        back = pd.read_excel(io.BytesIO(buffer.getvalue()))
+        expected = table_rows(sample_df, slice(None)).reset_index(drop=True)
+        expected['category'] = expected['category'].astype(str).str.replace('\x01', '')
+        pd.testing.assert_frame_equal(back, expected, check_dtype=False, check_categorical=False)
+
+        sheet = load_workbook(io.BytesIO(buffer.getvalue())).worksheets[0]
+        assert [cell.value for cell in sheet[1]] == TABLE_COLUMNS
+        assert sheet['A2'].is_date and sheet['A2'].number_format == 'yyyy-mm-dd'
+        assert sheet['C4'].value is None
+        assert sheet['B3'].value == 'A & B <дом>'
+
+    def test_timestamps_keep_time(self, sample_df):
+        """Test that dates with a time of day get a date-time format."""
+        df = sample_df.assign(date=sample_df['date'] + pd.Timedelta(hours=13, minutes=30))
+        buffer = io.BytesIO()
+        write_table_xlsx(df, buffer)
+
+        sheet = load_workbook(io.BytesIO(buffer.getvalue())).worksheets[0]
+        assert sheet['A2'].value == pd.Timestamp('2023-01-01 13:30').to_pydatetime()
+        assert sheet['A2'].number_format == 'yyyy-mm-dd hh:mm:ss'
+
+    def test_row_limit(self, sample_df, monkeypatch):
+        """Test that tables longer than an Excel sheet are refused."""
+        monkeypatch.setattr(table_export, 'EXCEL_MAX_ROWS', 4)
+
+        with pytest.raises(ValueError):
+            write_table_xlsx(sample_df, io.BytesIO())
+
+    def test_export_formats(self, sample_df):
+        """Test that export_table returns a temporary file the download button accepts, in both formats."""
+        from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+
+        with export_table(sample_df, 'csv') as exported:
+            assert isinstance(exported, io.RawIOBase)
+            assert exported.read().startswith(b'date,category,price,quantity,revenue')
+        with export_table(sample_df, 'xlsx') as exported:
+            data, _ = convert_data_to_bytes_and_infer_mime(exported, unsupported_error=TypeError())
+            assert data[:2] == b'PK'
+            assert len(load_workbook(io.BytesIO(data)).worksheets[0]['A']) == 6
+        with pytest.raises(ValueError):
+            export_table(sample_df, 'pdf')
+
+
+def test_dashboard_download_buttons(tmp_path, monkeypatch):
+    """Test that the dashboard offers both downloads and disables Excel beyond the sheet limit."""
+    from streamlit.testing.v1 import AppTest
+
+    path = tmp_path / 'sales.csv'
+    write_sales_file(str(path), 2_000, n_categories=5, n_days=30)
+    at = AppTest.from_file(os.path.join(os.path.dirname(__file__), 'pages', 'home.py'), default_timeout=60)
+    at.run()
+    at.sidebar.file_uploader[0].upload('sales.csv', path.read_bytes(), 'text/csv').run()
+
+    buttons = at.get('download_button')
+    assert not at.exception
+    assert [button.proto.label for button in buttons] == ["Скачать CSV", "Скачать Excel"]
+    assert not buttons[1].proto.disabled
+
+    monkeypatch.setattr(table_export, 'EXCEL_MAX_ROWS', 1_000)
+    at.run()
+    assert at.get('download_button')[1].proto.disabled
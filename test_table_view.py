@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+from table_view import count_table_pages, get_table_page, table_sort_order
+
+
+@pytest.fixture
+def sample_dataframe():
+    """Fixture that provides a small date-sorted sales table."""
+    data = {
+        "date": pd.to_datetime(["2023-01-01", "2023-01-01", "2023-01-02", "2023-01-03", "2023-01-04"]),
+        "category": ["Home", "Clothing", "Electronics", "Home", "Books"],
+        "price": [150.0, 50.0, 200.0, 10.0, 30.0],
+        "quantity": [2, 1, 3, 2, 4],
+    }
+    return pd.DataFrame(data)
+
+
+class TestTableView:
+    """Test class for the paginated table helpers."""
+
+    def test_count_table_pages(self):
+        """Test page count rounding."""
+        assert count_table_pages(0, 100) == 1
+        assert count_table_pages(100, 100) == 1
+        assert count_table_pages(101, 100) == 2
+
+    def test_default_order_pages(self, sample_dataframe):
+        """Test that pages slice the table in date order and keep numeric types."""
+        order = table_sort_order(sample_dataframe)
+
+        page = get_table_page(sample_dataframe, order, 1, 2)
+
+        assert list(page.columns) == ["date", "category", "price", "quantity", "revenue"]
+        assert list(page["category"]) == ["Electronics", "Home"]
+        assert list(page["revenue"]) == [600.0, 20.0]
+        assert page["revenue"].dtype == np.float64
+
+    def test_sort_by_derived_revenue_descending(self, sample_dataframe):
+        """Test server-side sort on the derived revenue column."""
+        order = table_sort_order(sample_dataframe, "revenue", ascending=False)
+
+        page = get_table_page(sample_dataframe, order, 0, 3)
+
+        assert list(page["revenue"]) == [600.0, 300.0, 120.0]
+
+    def test_sort_by_category(self, sample_dataframe):
+        """Test sorting a text column."""
+        order = table_sort_order(sample_dataframe, "category")
+
+        page = get_table_page(sample_dataframe, order, 0, 5)
+
+        assert list(page["category"]) == ["Books", "Clothing", "Electronics", "Home", "Home"]
+
+    def test_page_is_clamped(self, sample_dataframe):
+        """Test that a page past the end returns the last page."""
+        order = table_sort_order(sample_dataframe)
+
+        page = get_table_page(sample_dataframe, order, 10, 2)
+
+        assert list(page["category"]) == ["Books"]